@@ -0,0 +1,30 @@
+"""add composite index historiales(paciente_id, fecha) for the patient timeline
+
+Revision ID: 14edd5bcd01e
+Revises: 8cb066244f69
+Create Date: 2026-10-19 10:03:15.502117
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "14edd5bcd01e"
+down_revision = "8cb066244f69"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # El timeline pagina por (paciente_id, fecha) en orden descendente
+    op.create_index(
+        "ix_historiales_paciente_fecha",
+        "historiales",
+        ["paciente_id", "fecha"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_historiales_paciente_fecha", table_name="historiales")
@@ -0,0 +1,102 @@
+"""create historiales, terapias, terapias_historial and notifications
+
+Revision ID: 3a7d5c9e1b24
+Revises: 6c3e7fdfc435
+Create Date: 2026-10-19 19:40:12.604913
+
+Estas tablas sólo las creaba `Base.metadata.create_all` al arrancar la app.
+Ahora que el esquema lo gestiona únicamente Alembic, se crean aquí, antes de
+las migraciones que les añaden índices. Las bases ya creadas por `create_all`
+conservan sus tablas: sólo se crean las que falten.
+"""
+
+from alembic import context, op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "3a7d5c9e1b24"
+down_revision = "6c3e7fdfc435"
+branch_labels = None
+depends_on = None
+
+
+def _existing_tables() -> set:
+    # En modo offline (`--sql`) no hay conexión: se asume una base vacía
+    if context.is_offline_mode():
+        return set()
+    return set(sa.inspect(op.get_bind()).get_table_names())
+
+
+def upgrade() -> None:
+    existing = _existing_tables()
+
+    if "terapias" not in existing:
+        op.create_table(
+            "terapias",
+            sa.Column("id", sa.Integer(), nullable=False),
+            sa.Column("name", sa.String(), nullable=False),
+            sa.Column("description", sa.String(), nullable=True),
+            sa.Column("is_active", sa.Boolean(), nullable=True),
+            sa.PrimaryKeyConstraint("id"),
+        )
+        op.create_index(op.f("ix_terapias_id"), "terapias", ["id"], unique=False)
+
+    if "historiales" not in existing:
+        op.create_table(
+            "historiales",
+            sa.Column("id", sa.Integer(), nullable=False),
+            sa.Column("diagnostico", sa.String(), nullable=False),
+            sa.Column("notas", sa.String(), nullable=True),
+            sa.Column("fecha", sa.Date(), nullable=False),
+            sa.Column("paciente_id", sa.Integer(), nullable=False),
+            sa.ForeignKeyConstraint(["paciente_id"], ["patients.id"]),
+            sa.PrimaryKeyConstraint("id"),
+        )
+        op.create_index(op.f("ix_historiales_id"), "historiales", ["id"], unique=False)
+
+    if "terapias_historial" not in existing:
+        op.create_table(
+            "terapias_historial",
+            sa.Column("id", sa.Integer(), nullable=False),
+            sa.Column("tipo", sa.String(), nullable=False),
+            sa.Column("observaciones", sa.String(), nullable=True),
+            sa.Column("duracion", sa.Integer(), nullable=False),
+            sa.Column("historial_id", sa.Integer(), nullable=False),
+            sa.ForeignKeyConstraint(["historial_id"], ["historiales.id"]),
+            sa.PrimaryKeyConstraint("id"),
+        )
+        op.create_index(
+            op.f("ix_terapias_historial_id"),
+            "terapias_historial",
+            ["id"],
+            unique=False,
+        )
+
+    if "notifications" not in existing:
+        op.create_table(
+            "notifications",
+            sa.Column("id", sa.Integer(), nullable=False),
+            sa.Column("type", sa.String(), nullable=False),
+            sa.Column("message", sa.String(), nullable=False),
+            sa.Column("user_id", sa.Integer(), nullable=False),
+            sa.Column("is_read", sa.Boolean(), nullable=True),
+            sa.Column("created_at", sa.DateTime(), nullable=True),
+            sa.Column("related_appointment_id", sa.Integer(), nullable=True),
+            sa.ForeignKeyConstraint(["user_id"], ["users.id"]),
+            sa.ForeignKeyConstraint(["related_appointment_id"], ["appointments.id"]),
+            sa.PrimaryKeyConstraint("id"),
+        )
+        op.create_index(
+            op.f("ix_notifications_id"), "notifications", ["id"], unique=False
+        )
+
+
+def downgrade() -> None:
+    op.drop_index(op.f("ix_notifications_id"), table_name="notifications")
+    op.drop_table("notifications")
+    op.drop_index(op.f("ix_terapias_historial_id"), table_name="terapias_historial")
+    op.drop_table("terapias_historial")
+    op.drop_index(op.f("ix_historiales_id"), table_name="historiales")
+    op.drop_table("historiales")
+    op.drop_index(op.f("ix_terapias_id"), table_name="terapias")
+    op.drop_table("terapias")
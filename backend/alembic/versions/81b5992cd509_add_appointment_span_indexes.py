@@ -0,0 +1,43 @@
+"""add partial (fisio|patient, start_time, end_time) indexes for EXISTS overlap checks
+
+Revision ID: 81b5992cd509
+Revises: 9d41c7e2b8a6
+Create Date: 2026-10-19 14:31:12.904417
+
+end_time ya se rellenó en 9d41c7e2b8a6; aquí sólo se crean los índices que
+permiten resolver las comprobaciones de solape sin leer la tabla.
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "81b5992cd509"
+down_revision = "9d41c7e2b8a6"
+branch_labels = None
+depends_on = None
+
+ACTIVE = sa.text("status <> 'cancelada'")
+
+INDEXES = {
+    "ix_appointments_fisio_span": ["fisio_id", "start_time", "end_time"],
+    "ix_appointments_patient_span": ["patient_id", "start_time", "end_time"],
+    "ix_appointments_active_span": ["start_time", "end_time"],
+}
+
+
+def upgrade() -> None:
+    for name, columns in INDEXES.items():
+        op.create_index(
+            name,
+            "appointments",
+            columns,
+            unique=False,
+            postgresql_where=ACTIVE,
+            sqlite_where=ACTIVE,
+        )
+
+
+def downgrade() -> None:
+    for name in INDEXES:
+        op.drop_index(name, table_name="appointments")
@@ -0,0 +1,40 @@
+"""add indexes on historiales.paciente_id and terapias_historial.historial_id
+
+Revision ID: 8cb066244f69
+Revises: 3a7d5c9e1b24
+Create Date: 2026-10-19 09:12:41.318204
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "8cb066244f69"
+down_revision = "3a7d5c9e1b24"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Las consultas de historial filtran/join por estas FKs; sin índice
+    # PostgreSQL recorre la tabla completa por cada paciente
+    op.create_index(
+        op.f("ix_historiales_paciente_id"),
+        "historiales",
+        ["paciente_id"],
+        unique=False,
+    )
+    op.create_index(
+        op.f("ix_terapias_historial_historial_id"),
+        "terapias_historial",
+        ["historial_id"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(
+        op.f("ix_terapias_historial_historial_id"), table_name="terapias_historial"
+    )
+    op.drop_index(op.f("ix_historiales_paciente_id"), table_name="historiales")
@@ -0,0 +1,110 @@
+"""add appointments.end_time and EXCLUDE constraint against fisio overlaps
+
+Revision ID: 9d41c7e2b8a6
+Revises: e0a23abce374
+Create Date: 2026-10-19 14:05:41.730215
+
+En Postgres la restricción rechaza de forma atómica dos citas activas del mismo
+fisio que se solapan (sin lectura previa). Si ya existen solapes la migración
+falla: hay que cancelarlos o moverlos antes de aplicarla. En SQLite sólo se
+añade y rellena la columna; la comprobación sigue haciéndose en Python.
+
+Tras aplicarla en Postgres, activar APPOINTMENT_OVERLAP_CONSTRAINT.
+"""
+
+from datetime import timedelta
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "9d41c7e2b8a6"
+down_revision = "e0a23abce374"
+branch_labels = None
+depends_on = None
+
+
+def _backfill_end_time(bind) -> None:
+    if bind.dialect.name == "postgresql":
+        op.execute(
+            "UPDATE appointments "
+            "SET end_time = start_time + make_interval(mins => duration_minutes)"
+        )
+        return
+    appointments = sa.table(
+        "appointments",
+        sa.column("id", sa.Integer),
+        sa.column("start_time", sa.DateTime(timezone=True)),
+        sa.column("duration_minutes", sa.Integer),
+        sa.column("end_time", sa.DateTime(timezone=True)),
+    )
+    rows = bind.execute(
+        sa.select(
+            appointments.c.id,
+            appointments.c.start_time,
+            appointments.c.duration_minutes,
+        )
+    ).all()
+    for ap_id, start, duration in rows:
+        bind.execute(
+            appointments.update()
+            .where(appointments.c.id == ap_id)
+            .values(end_time=start + timedelta(minutes=duration))
+        )
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    op.add_column(
+        "appointments",
+        sa.Column("end_time", sa.DateTime(timezone=True), nullable=True),
+    )
+    _backfill_end_time(bind)
+    with op.batch_alter_table("appointments") as batch:
+        batch.alter_column("end_time", nullable=False)
+
+    if bind.dialect.name != "postgresql":
+        return
+
+    # Mantener end_time también para escrituras que no pasan por el ORM
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION appointments_set_end_time() RETURNS trigger AS $$
+        BEGIN
+            NEW.end_time := NEW.start_time + make_interval(mins => NEW.duration_minutes);
+            RETURN NEW;
+        END;
+        $$ LANGUAGE plpgsql
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER appointments_set_end_time
+        BEFORE INSERT OR UPDATE OF start_time, duration_minutes ON appointments
+        FOR EACH ROW EXECUTE FUNCTION appointments_set_end_time()
+        """
+    )
+    # btree_gist permite combinar igualdad de texto (fisio_id) con rangos en GiST
+    op.execute("CREATE EXTENSION IF NOT EXISTS btree_gist")
+    op.execute(
+        """
+        ALTER TABLE appointments
+        ADD CONSTRAINT appointments_fisio_no_overlap
+        EXCLUDE USING gist (
+            fisio_id WITH =,
+            tstzrange(start_time, end_time) WITH &&
+        ) WHERE (status <> 'cancelada')
+        """
+    )
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name == "postgresql":
+        op.execute(
+            "ALTER TABLE appointments "
+            "DROP CONSTRAINT IF EXISTS appointments_fisio_no_overlap"
+        )
+        op.execute("DROP TRIGGER IF EXISTS appointments_set_end_time ON appointments")
+        op.execute("DROP FUNCTION IF EXISTS appointments_set_end_time()")
+    with op.batch_alter_table("appointments") as batch:
+        batch.drop_column("end_time")
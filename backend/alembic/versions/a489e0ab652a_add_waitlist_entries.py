@@ -0,0 +1,73 @@
+"""add waitlist_entries
+
+Revision ID: a489e0ab652a
+Revises: e7cc232edcc4
+Create Date: 2026-10-19 17:02:13.551870
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = "a489e0ab652a"
+down_revision = "e7cc232edcc4"
+branch_labels = None
+depends_on = None
+
+waitlist_status = sa.Enum("en_espera", "asignada", "cancelada", name="waitlist_status")
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name == "postgresql":
+        # El tipo appointment_type ya existe (tabla appointments)
+        appointment_type = postgresql.ENUM(name="appointment_type", create_type=False)
+    else:
+        appointment_type = sa.String(length=32)
+    op.create_table(
+        "waitlist_entries",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("patient_id", sa.String(length=64), nullable=False),
+        sa.Column("fisio_id", sa.String(length=64), nullable=True),
+        sa.Column("window_start", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("window_end", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("duration_minutes", sa.Integer(), nullable=False),
+        sa.Column("appointment_type", appointment_type, nullable=False),
+        sa.Column("status", waitlist_status, nullable=False),
+        sa.Column("appointment_id", sa.Integer(), nullable=True),
+        sa.Column(
+            "created_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        op.f("ix_waitlist_entries_id"), "waitlist_entries", ["id"], unique=False
+    )
+    op.create_index(
+        op.f("ix_waitlist_entries_patient_id"),
+        "waitlist_entries",
+        ["patient_id"],
+        unique=False,
+    )
+    # Matcher: sólo entradas en espera, por ventana
+    op.create_index(
+        "ix_waitlist_waiting_window",
+        "waitlist_entries",
+        ["window_start", "window_end"],
+        unique=False,
+        postgresql_where=sa.text("status = 'en_espera'"),
+        sqlite_where=sa.text("status = 'en_espera'"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_waitlist_waiting_window", table_name="waitlist_entries")
+    op.drop_index(op.f("ix_waitlist_entries_patient_id"), table_name="waitlist_entries")
+    op.drop_index(op.f("ix_waitlist_entries_id"), table_name="waitlist_entries")
+    op.drop_table("waitlist_entries")
+    waitlist_status.drop(op.get_bind(), checkfirst=True)
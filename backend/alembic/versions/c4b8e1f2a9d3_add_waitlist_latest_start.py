@@ -0,0 +1,83 @@
+"""add waitlist_entries.latest_start for the backfill matcher
+
+Revision ID: c4b8e1f2a9d3
+Revises: a489e0ab652a
+Create Date: 2026-10-19 18:12:40.318774
+
+latest_start = window_end - duration_minutes: último inicio que cabe en la
+ventana. Persistido para que el matcher filtre y ordene en SQL (antes el ajuste
+se comprobaba en Python tras un LIMIT). El índice parcial pasa a
+(window_start, latest_start).
+"""
+
+from datetime import timedelta
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "c4b8e1f2a9d3"
+down_revision = "a489e0ab652a"
+branch_labels = None
+depends_on = None
+
+WAITING = sa.text("status = 'en_espera'")
+
+
+def _backfill_latest_start(bind) -> None:
+    if bind.dialect.name == "postgresql":
+        op.execute(
+            "UPDATE waitlist_entries "
+            "SET latest_start = window_end - make_interval(mins => duration_minutes)"
+        )
+        return
+    entries = sa.table(
+        "waitlist_entries",
+        sa.column("id", sa.Integer),
+        sa.column("window_end", sa.DateTime(timezone=True)),
+        sa.column("duration_minutes", sa.Integer),
+        sa.column("latest_start", sa.DateTime(timezone=True)),
+    )
+    rows = bind.execute(
+        sa.select(entries.c.id, entries.c.window_end, entries.c.duration_minutes)
+    ).all()
+    for entry_id, window_end, duration in rows:
+        bind.execute(
+            entries.update()
+            .where(entries.c.id == entry_id)
+            .values(latest_start=window_end - timedelta(minutes=duration))
+        )
+
+
+def upgrade() -> None:
+    op.add_column(
+        "waitlist_entries",
+        sa.Column("latest_start", sa.DateTime(timezone=True), nullable=True),
+    )
+    _backfill_latest_start(op.get_bind())
+    with op.batch_alter_table("waitlist_entries") as batch:
+        batch.alter_column("latest_start", nullable=False)
+
+    op.drop_index("ix_waitlist_waiting_window", table_name="waitlist_entries")
+    op.create_index(
+        "ix_waitlist_waiting_window",
+        "waitlist_entries",
+        ["window_start", "latest_start"],
+        unique=False,
+        postgresql_where=WAITING,
+        sqlite_where=WAITING,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_waitlist_waiting_window", table_name="waitlist_entries")
+    op.create_index(
+        "ix_waitlist_waiting_window",
+        "waitlist_entries",
+        ["window_start", "window_end"],
+        unique=False,
+        postgresql_where=WAITING,
+        sqlite_where=WAITING,
+    )
+    with op.batch_alter_table("waitlist_entries") as batch:
+        batch.drop_column("latest_start")
@@ -0,0 +1,32 @@
+"""add waitlist_status 'caducada'
+
+Revision ID: d7e2f4a1b6c8
+Revises: c4b8e1f2a9d3
+Create Date: 2026-10-19 20:05:31.927415
+
+Entradas en espera cuya ventana pasó sin hueco (ver
+`app.services.waitlist.expire_waitlist`).
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "d7e2f4a1b6c8"
+down_revision = "c4b8e1f2a9d3"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Sólo Postgres tiene el tipo enum nativo; en SQLite es una columna de texto
+    if op.get_bind().dialect.name == "postgresql":
+        op.execute("ALTER TYPE waitlist_status ADD VALUE IF NOT EXISTS 'caducada'")
+
+
+def downgrade() -> None:
+    # No podemos eliminar valores de un enum en PostgreSQL fácilmente: las
+    # entradas caducadas se pasan a 'cancelada' y el valor queda sin uso
+    op.execute(
+        "UPDATE waitlist_entries SET status = 'cancelada' WHERE status = 'caducada'"
+    )
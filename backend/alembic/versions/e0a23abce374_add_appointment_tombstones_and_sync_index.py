@@ -0,0 +1,53 @@
+"""add appointment_tombstones and (updated_at, id) index for delta sync
+
+Revision ID: e0a23abce374
+Revises: 14edd5bcd01e
+Create Date: 2026-10-19 13:45:02.118304
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "e0a23abce374"
+down_revision = "14edd5bcd01e"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # GET /appointments/changes recorre las citas por (updated_at, id)
+    op.create_index(
+        "ix_appointments_updated_id",
+        "appointments",
+        ["updated_at", "id"],
+        unique=False,
+    )
+    op.create_table(
+        "appointment_tombstones",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("appointment_id", sa.Integer(), nullable=False),
+        sa.Column(
+            "deleted_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        op.f("ix_appointment_tombstones_deleted_at"),
+        "appointment_tombstones",
+        ["deleted_at"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(
+        op.f("ix_appointment_tombstones_deleted_at"),
+        table_name="appointment_tombstones",
+    )
+    op.drop_table("appointment_tombstones")
+    op.drop_index("ix_appointments_updated_id", table_name="appointments")
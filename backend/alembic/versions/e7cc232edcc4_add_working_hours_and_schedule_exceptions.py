@@ -0,0 +1,66 @@
+"""add working_hours and schedule_exceptions
+
+Revision ID: e7cc232edcc4
+Revises: 81b5992cd509
+Create Date: 2026-10-19 16:20:37.904512
+
+Sin filas en `working_hours` la disponibilidad usa el horario por defecto
+(CLINIC_DEFAULT_OPEN_HOUR - CLINIC_DEFAULT_CLOSE_HOUR), igual que antes.
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "e7cc232edcc4"
+down_revision = "81b5992cd509"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "working_hours",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("fisio_id", sa.String(length=64), nullable=True),
+        sa.Column("weekday", sa.Integer(), nullable=False),
+        sa.Column("start_time", sa.Time(), nullable=False),
+        sa.Column("end_time", sa.Time(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(op.f("ix_working_hours_id"), "working_hours", ["id"], unique=False)
+    op.create_index(
+        "ix_working_hours_fisio_weekday",
+        "working_hours",
+        ["fisio_id", "weekday"],
+        unique=False,
+    )
+    op.create_table(
+        "schedule_exceptions",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("fisio_id", sa.String(length=64), nullable=True),
+        sa.Column("date", sa.Date(), nullable=False),
+        sa.Column("start_time", sa.Time(), nullable=True),
+        sa.Column("end_time", sa.Time(), nullable=True),
+        sa.Column("is_open", sa.Boolean(), nullable=False),
+        sa.Column("reason", sa.String(length=255), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        op.f("ix_schedule_exceptions_id"), "schedule_exceptions", ["id"], unique=False
+    )
+    op.create_index(
+        "ix_schedule_exceptions_date_fisio",
+        "schedule_exceptions",
+        ["date", "fisio_id"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_schedule_exceptions_date_fisio", table_name="schedule_exceptions")
+    op.drop_index(op.f("ix_schedule_exceptions_id"), table_name="schedule_exceptions")
+    op.drop_table("schedule_exceptions")
+    op.drop_index("ix_working_hours_fisio_weekday", table_name="working_hours")
+    op.drop_index(op.f("ix_working_hours_id"), table_name="working_hours")
+    op.drop_table("working_hours")
@@ -1,28 +1,41 @@
-from __future__ import annotations
 from datetime import datetime, timezone
 from typing import Optional
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
 from pydantic import BaseModel
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 import logging
 
-from app.db.session import get_db
+from app.core.etag import etag_matches, make_etag, not_modified, set_etag
+from app.core.responses import json_list_response
+from app.db.session import get_async_read_db, get_db, get_read_db
+from app.limiter import availability_limit, limiter
 from app.schemas.appointments import (
+    AppointmentChanges,
+    AssignmentResult,
     AppointmentCreate,
+    AppointmentSeriesCreate,
     AppointmentUpdate,
     AppointmentRead,
 )
 from app.services.appointments import (
+    CONFLICT_MESSAGE,
+    appointments_version,
     create_appointment,
+    create_appointment_series,
+    list_appointment_changes,
     list_appointments,
     update_appointment,
     get_appointment,
     cancel_appointment,
     delete_appointment,
     is_time_slot_available,
+    is_time_slot_available_async,
+    free_calendar_async,
 )
-from app.services.auth import get_current_user
+from app.services.assignment import assign_pending_appointments
+from app.services.auth import get_current_user, get_current_user_async, require_roles
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
@@ -37,10 +50,12 @@ class CheckAvailabilityRequest(BaseModel):
 
 
 @router.post("/check-availability")
-def check_availability(
+@limiter.limit(availability_limit)
+async def check_availability(
+    request: Request,
     payload: CheckAvailabilityRequest,
-    db: Session = Depends(get_db),
-    user: dict = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_read_db),
+    user: dict = Depends(get_current_user_async),
 ):
     try:
         payload_dump = payload.model_dump()
@@ -56,7 +71,7 @@ def check_availability(
         start_time = start_time.replace(tzinfo=bogota)
         logger.debug(f"Interpreted naive start_time as Bogotá {start_time.isoformat()}")
 
-    available = is_time_slot_available(
+    available = await is_time_slot_available_async(
         db,
         start_time=start_time,
         duration_minutes=payload.duration_minutes,
@@ -68,7 +83,9 @@ def check_availability(
 
 
 @router.get("/availability")
-def availability(
+@limiter.limit(availability_limit)
+async def availability(
+    request: Request,
     date: Optional[datetime] = Query(
         None,
         description="Fecha a consultar (usa la parte de fecha, formato YYYY-MM-DD)",
@@ -80,15 +97,21 @@ def availability(
     fisio_id: Optional[str] = Query(
         None, description="ID del fisioterapeuta (opcional)"
     ),
-    start_hour: int = Query(8, description="Hora inicial del rango (0-23)"),
-    end_hour: int = Query(18, description="Hora final del rango (0-23, exclusivo)"),
-    step_minutes: int = Query(30, description="Paso entre franjas en minutos"),
-    db: Session = Depends(get_db),
-    user: dict = Depends(get_current_user),
+    start_hour: Optional[int] = Query(
+        None, ge=0, le=23, description="Restringe el inicio de la ventana (0-23)"
+    ),
+    end_hour: Optional[int] = Query(
+        None, ge=1, le=24, description="Restringe el fin de la ventana (exclusivo)"
+    ),
+    step_minutes: int = Query(30, ge=5, description="Paso entre franjas en minutos"),
+    db: AsyncSession = Depends(get_async_read_db),
+    user: dict = Depends(get_current_user_async),
 ):
     """
-    Devuelve una lista consolidada de franjas disponibles para una fecha dada.
-    Las franjas se devuelven como datetime ISO en UTC (ej: 2025-08-27T09:00:00Z).
+    Devuelve las franjas disponibles de una fecha: horario abierto de la clínica
+    (o del fisio) menos las citas ocupadas, ver `/schedules/calendar`.
+    Las franjas se devuelven en ISO con el offset de la clínica
+    (ej: 2025-08-27T09:00:00-05:00), junto con los tramos libres.
     """
     if date is None:
         raise HTTPException(
@@ -98,53 +121,40 @@ def availability(
     # Normalizar a la parte de fecha (ignoramos hora del parámetro si la trae)
     target_date = date.date() if hasattr(date, "date") else date
 
-    from datetime import datetime, timezone, timedelta
-
-    candidates: list[datetime] = []
-    # Use Bogotá timezone (UTC-5)
-    bogota_tz = timezone(timedelta(hours=-5))
-    for hour in range(start_hour, end_hour):
-        # crear slots por step dentro de la hora
-        minute = 0
-        while minute < 60:
-            slot_dt = datetime(
-                target_date.year,
-                target_date.month,
-                target_date.day,
-                hour,
-                minute,
-                0,
-                tzinfo=bogota_tz,
-            )
-            candidates.append(slot_dt)
-            minute += step_minutes
-            # si el siguiente minuto cruza la hora y supera end_hour, se parará por range
+    hours = None
+    if start_hour is not None or end_hour is not None:
+        hours = (start_hour or 0, end_hour or 24)
 
-    available_slots: list[str] = []
     logger.debug(
         f"availability requested date={target_date} duration={duration_minutes} patient_id={patient_id}"
     )
-    for cand in candidates:
-        try:
-            ok = is_time_slot_available(
-                db,
-                start_time=cand,
-                duration_minutes=duration_minutes,
-                patient_id=patient_id,
-                fisio_id=fisio_id,
-            )
-        except Exception:
-            ok = False
-        if ok:
-            # devolver en ISO con offset -05:00 (Bogotá) para que el cliente pueda parsearlo en zona local
-            available_slots.append(cand.isoformat())
-
-    return {"available_slots": available_slots}
+    # Los intervalos ocupados del día se cargan una sola vez
+    (day,) = await free_calendar_async(
+        db,
+        date_from=target_date,
+        date_to=target_date,
+        duration_minutes=duration_minutes,
+        step_minutes=step_minutes,
+        fisio_id=fisio_id,
+        hours=hours,
+    )
+    return {
+        "available_slots": [slot.isoformat() for slot in day["slots"]],
+        "free_intervals": [
+            {"start": span["start"].isoformat(), "end": span["end"].isoformat()}
+            for span in day["free"]
+        ],
+    }
 
 
 quote_not_found_message = "Cita no encontrada"
 
 
+def _value_error_status(e: ValueError) -> int:
+    # Solape con otra cita (comprobación previa o restricción EXCLUDE): 409
+    return 409 if str(e) == CONFLICT_MESSAGE else 400
+
+
 @router.post("/", response_model=AppointmentRead, status_code=status.HTTP_201_CREATED)
 def create_cita(
     payload: AppointmentCreate,
@@ -181,19 +191,20 @@ def create_cita(
                 },
             )
 
-        # 2. Validar disponibilidad de horario (no hay otra cita en ese rango para el paciente/fisio)
-        from app.services.appointments import is_time_slot_available
+        # Permitir citas sin fisioterapeuta asignado (pendientes de asignación)
+        fisio_id = payload.fisio_id
+        if not (fisio_id and fisio_id not in ["current_user", "string", ""]):
+            fisio_id = None
 
+        # 2. Validar disponibilidad de horario (no hay otra cita en ese rango
+        # para el paciente/fisio). La restricción EXCLUDE sólo cubre solapes
+        # del mismo fisio: esta comprobación global sigue protegiendo al paciente
         slot_available = is_time_slot_available(
             db,
             start_time=payload_start_time,
             duration_minutes=payload.duration_minutes,
             patient_id=payload.patient_id,
-            fisio_id=(
-                payload.fisio_id
-                if payload.fisio_id not in ["current_user", "string", ""]
-                else None
-            ),
+            fisio_id=fisio_id,
         )
         if not slot_available:
             raise HTTPException(
@@ -217,11 +228,6 @@ def create_cita(
                 },
             )
 
-        # Permitir citas sin fisioterapeuta asignado (pendientes de asignación)
-        fisio_id = payload.fisio_id
-        if not (fisio_id and fisio_id not in ["current_user", "string", ""]):
-            fisio_id = None
-
         ap = create_appointment(
             db,
             start_time=payload_start_time,
@@ -233,28 +239,135 @@ def create_cita(
         return ap
     except ValueError as e:
         logger.error(f"ValueError creating appointment: {str(e)}")
-        raise HTTPException(status_code=400, detail={"message": str(e)})
+        raise HTTPException(
+            status_code=_value_error_status(e), detail={"message": str(e)}
+        )
+
+
+@router.post(
+    "/series",
+    response_model=list[AppointmentRead],
+    status_code=status.HTTP_201_CREATED,
+)
+def create_serie_citas(
+    payload: AppointmentSeriesCreate,
+    db: Session = Depends(get_db),
+    user: dict = Depends(get_current_user),
+):
+    """
+    Crea un plan de terapia recurrente (ej: 10 sesiones semanales) en una sola
+    transacción. Si alguna ocurrencia no está disponible no se crea ninguna.
+    """
+    from datetime import timedelta
+
+    bogota = timezone(timedelta(hours=-5))
+    start_time = payload.start_time
+    if start_time.tzinfo is None:
+        start_time = start_time.replace(tzinfo=bogota)
+
+    if start_time < datetime.now(timezone.utc):
+        raise HTTPException(
+            status_code=400,
+            detail={"message": "La fecha/hora de la cita no puede ser en el pasado."},
+        )
+
+    fisio_id = payload.fisio_id
+    if not (fisio_id and fisio_id not in ["current_user", "string", ""]):
+        fisio_id = None
+
+    rule = payload.recurrence
+    try:
+        return create_appointment_series(
+            db,
+            start_time=start_time,
+            duration_minutes=payload.duration_minutes,
+            patient_id=payload.patient_id,
+            fisio_id=fisio_id,
+            appointment_type=payload.appointment_type,
+            frequency=rule.frequency,
+            interval=rule.interval,
+            count=rule.count,
+        )
+    except ValueError as e:
+        logger.error(f"ValueError creating appointment series: {str(e)}")
+        raise HTTPException(status_code=409, detail={"message": str(e)})
+
+
+@router.post(
+    "/assign-pending",
+    response_model=AssignmentResult,
+    dependencies=[Depends(require_roles("admin"))],
+)
+def assign_pending(
+    date_from: Optional[datetime] = Query(
+        None, description="Inicio de la ventana (por defecto, ahora)"
+    ),
+    date_to: Optional[datetime] = Query(
+        None, description="Fin de la ventana (por defecto, 31 días después)"
+    ),
+    dry_run: bool = Query(False, description="Solo calcular el plan, sin guardar"),
+    db: Session = Depends(get_db),
+):
+    """
+    Asigna fisio a las citas pendientes de la ventana equilibrando la carga y
+    respetando horarios y solapes. Las que no caben quedan en `unassigned`.
+    """
+    try:
+        return assign_pending_appointments(
+            db, window_start=date_from, window_end=date_to, dry_run=dry_run
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=409, detail={"message": str(e)})
 
 
 @router.get("/", response_model=list[AppointmentRead])
 def list_citas(
+    request: Request,
     date: Optional[datetime] = Query(
         None, description="Filtrar por día (usa cualquier hora de ese día)"
     ),
     user_id: Optional[str] = Query(
         None, description="Filtrar por usuario (paciente o fisio)"
     ),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     user: dict = Depends(get_current_user),
 ):
+    etag = make_etag(request, appointments_version(db, date=date, user_id=user_id))
+    if etag_matches(request, etag):
+        return not_modified(etag)
     items = list_appointments(db, date=date, user_id=user_id)
-    return items
+    # Modelos ya construidos por el servicio: se serializan sin revalidar
+    return set_etag(json_list_response(AppointmentRead, items), etag)
+
+
+@router.get("/changes", response_model=AppointmentChanges)
+def list_cambios_citas(
+    since: Optional[str] = Query(
+        None,
+        description="Cursor devuelto por la llamada anterior (o fecha ISO 8601)",
+    ),
+    limit: int = Query(500, ge=1, le=5000, description="Máximo de cambios por tipo"),
+    # Primario: con el lag de una réplica el cursor podría saltarse cambios
+    db: Session = Depends(get_db),
+    user: dict = Depends(get_current_user),
+):
+    """
+    Sincronización incremental: citas creadas, modificadas o eliminadas desde
+    `since`. Sin `since` se devuelven todas. Si `has_more` es true, repetir con
+    el `cursor` recibido.
+    """
+    try:
+        return list_appointment_changes(db, since=since, limit=limit)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail={"message": str(e)})
 
 
 @router.get("/{cita_id}", response_model=AppointmentRead)
 def get_cita(
     cita_id: int,
-    db: Session = Depends(get_db),
+    request: Request,
+    response: Response,
+    db: Session = Depends(get_read_db),
     user: dict = Depends(get_current_user),
 ):
     ap = get_appointment(db, cita_id)
@@ -262,6 +375,10 @@ def get_cita(
         raise HTTPException(
             status_code=404, detail={"message": quote_not_found_message}
         )
+    etag = make_etag(request, ap.updated_at)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    set_etag(response, etag)
     return ap
 
 
@@ -290,7 +407,9 @@ def update_cita(
         )
         return ap
     except ValueError as e:
-        raise HTTPException(status_code=400, detail={"message": str(e)})
+        raise HTTPException(
+            status_code=_value_error_status(e), detail={"message": str(e)}
+        )
 
 
 @router.patch("/{cita_id}/cancel", response_model=AppointmentRead)
@@ -1,10 +1,12 @@
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
 from sqlalchemy.orm import Session
 from datetime import date, datetime, timedelta
 from typing import Optional
 
-from app.db.session import get_db
+from app.core.etag import etag_matches, make_etag, not_modified, set_etag
+from app.db.session import get_read_db
 from app.services.dashboard import (
+    dashboard_version,
     get_dashboard_summary,
     get_today_appointments,
     get_appointments_by_status,
@@ -29,10 +31,16 @@ router = APIRouter()
     status_code=status.HTTP_200_OK,
 )
 def get_dashboard_resumen(
-    db: Session = Depends(get_db),
+    request: Request,
+    response: Response,
+    db: Session = Depends(get_read_db),
     user: dict = Depends(get_current_user),
 ):
     """Obtener resumen general del dashboard"""
+    etag = make_etag(request, dashboard_version(db))
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    set_etag(response, etag)
     try:
         summary = get_dashboard_summary(db)
         return summary
@@ -46,10 +54,17 @@ def get_dashboard_resumen(
     status_code=status.HTTP_200_OK,
 )
 def get_citas_hoy(
-    db: Session = Depends(get_db),
+    request: Request,
+    response: Response,
+    db: Session = Depends(get_read_db),
     user: dict = Depends(get_current_user),
 ):
     """Obtener todas las citas del día actual"""
+    # `time_until` de la próxima cita depende de la hora: revalidar cada minuto
+    etag = make_etag(request, dashboard_version(db), datetime.now().strftime("%H:%M"))
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    set_etag(response, etag)
     try:
         today_appointments = get_today_appointments(db)
         return today_appointments
@@ -63,15 +78,21 @@ def get_citas_hoy(
     status_code=status.HTTP_200_OK,
 )
 def get_citas_por_estado(
+    request: Request,
+    response: Response,
     status_filter: Optional[str] = Query(
         None, description="Filtrar por estado específico"
     ),
     fecha_desde: Optional[date] = Query(None, description="Fecha desde"),
     fecha_hasta: Optional[date] = Query(None, description="Fecha hasta"),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     user: dict = Depends(get_current_user),
 ):
     """Obtener citas agrupadas por estado"""
+    etag = make_etag(request, dashboard_version(db))
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    set_etag(response, etag)
     try:
         appointments_by_status = get_appointments_by_status(
             db, status_filter, fecha_desde, fecha_hasta
@@ -87,11 +108,17 @@ def get_citas_por_estado(
     status_code=status.HTTP_200_OK,
 )
 def get_estadisticas_semanales(
+    request: Request,
+    response: Response,
     semanas: int = Query(4, description="Número de semanas atrás", ge=1, le=12),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     user: dict = Depends(get_current_user),
 ):
     """Obtener estadísticas de las últimas semanas"""
+    etag = make_etag(request, dashboard_version(db))
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    set_etag(response, etag)
     try:
         weekly_stats = get_weekly_stats(db, semanas)
         return weekly_stats
@@ -105,11 +132,17 @@ def get_estadisticas_semanales(
     status_code=status.HTTP_200_OK,
 )
 def get_estadisticas_mensuales(
+    request: Request,
+    response: Response,
     meses: int = Query(6, description="Número de meses atrás", ge=1, le=12),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     user: dict = Depends(get_current_user),
 ):
     """Obtener estadísticas de los últimos meses"""
+    etag = make_etag(request, dashboard_version(db))
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    set_etag(response, etag)
     try:
         monthly_stats = get_monthly_stats(db, meses)
         return monthly_stats
@@ -123,7 +156,7 @@ def get_estadisticas_mensuales(
     status_code=status.HTTP_200_OK,
 )
 def get_metricas_tiempo_real(
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     user: dict = Depends(get_current_user),
 ):
     """Obtener métricas en tiempo real para el dashboard"""
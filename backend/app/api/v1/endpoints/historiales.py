@@ -1,16 +1,22 @@
-from fastapi import APIRouter, Depends, HTTPException
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
 from app.db.session import get_db
 from app.schemas.historiales import (
     HistorialCreate,
     HistorialResponse,
+    PacienteHistorialResponse,
     TerapiaCreate,
     TerapiaResponse,
+    TimelinePage,
 )
 from app.services.historiales import (
     create_historial,
     create_terapia,
+    get_historial_completo,
     get_historiales_by_paciente,
+    get_patient_timeline,
     get_terapias_by_paciente,
 )
 
@@ -47,3 +53,29 @@ def list_terapias(paciente_id: int, db: Session = Depends(get_db)):
             status_code=404, detail="No se encontraron terapias para este paciente."
         )
     return terapias
+
+
+@router.get(
+    "/pacientes/{paciente_id}/historial-completo",
+    response_model=PacienteHistorialResponse,
+)
+def get_historial_paciente(paciente_id: int, db: Session = Depends(get_db)):
+    paciente = get_historial_completo(db, paciente_id)
+    if not paciente:
+        raise HTTPException(status_code=404, detail="Paciente no encontrado.")
+    return paciente
+
+
+@router.get("/pacientes/{paciente_id}/timeline", response_model=TimelinePage)
+def get_timeline_paciente(
+    paciente_id: int,
+    limit: int = Query(20, ge=1, le=100, description="Elementos por página"),
+    cursor: Optional[str] = Query(
+        None, description="Cursor devuelto en `next_cursor` de la página anterior"
+    ),
+    db: Session = Depends(get_db),
+):
+    try:
+        return get_patient_timeline(db, paciente_id, limit=limit, cursor=cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail={"message": str(e)})
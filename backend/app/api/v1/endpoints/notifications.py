@@ -1,12 +1,15 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request
 from sqlalchemy.orm import Session
 
+from app.core.etag import etag_matches, make_etag, not_modified, set_etag
+from app.core.responses import json_list_response
 from app.db.session import get_db
 from app.schemas.notifications import NotificationRead
 from app.services.notifications import (
     list_notifications,
     mark_notification_as_read,
     get_notifications_by_cita,
+    notifications_version,
 )
 from app.services.auth import get_current_user
 
@@ -15,19 +18,38 @@ router = APIRouter()
 
 @router.get("/notifications", response_model=list[NotificationRead])
 def get_notifications(
-    db: Session = Depends(get_db), user: dict = Depends(get_current_user)
+    request: Request,
+    db: Session = Depends(get_db),
+    user: dict = Depends(get_current_user),
 ):
-    return list_notifications(db, user_id=user["id"])
+    # El usuario forma parte de la versión: misma URL, distinto contenido
+    version = (user["id"], *notifications_version(db, user_id=user["id"]))
+    etag = make_etag(request, *version)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    notifications = list_notifications(db, user_id=user["id"])
+    response = json_list_response(
+        NotificationRead, notifications, from_attributes=True
+    )
+    return set_etag(response, etag)
 
 
 @router.get("/notifications/by-cita/{cita_id}", response_model=list[NotificationRead])
 def get_notifications_by_cita_id(
     cita_id: int,
+    request: Request,
     db: Session = Depends(get_db),
     user: dict = Depends(get_current_user),
 ):
     # Opcional: podrías validar que el usuario tenga acceso a la cita
-    return get_notifications_by_cita(db, cita_id)
+    etag = make_etag(request, notifications_version(db, cita_id=cita_id))
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    notifications = get_notifications_by_cita(db, cita_id)
+    response = json_list_response(
+        NotificationRead, notifications, from_attributes=True
+    )
+    return set_etag(response, etag)
 
 
 @router.patch("/notifications/{id}", response_model=NotificationRead)
@@ -1,26 +1,37 @@
 from __future__ import annotations
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import (
+    APIRouter,
+    Depends,
+    HTTPException,
+    Query,
+    Request,
+    Response,
+    status,
+)
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from app.db.session import get_db
+from app.core.etag import etag_matches, make_etag, not_modified, set_etag
+from app.core.responses import json_list_response
+from app.db.session import get_async_read_db, get_db
 from app.schemas.patients import PatientCreate, PatientUpdate, PatientRead
 from app.services.patients import (
     create_patient,
-    list_patients,
     get_patient,
     update_patient,
     delete_patient,
-    search_patients,
+    list_patients_async,
+    get_patient_async,
+    patients_version_async,
+    search_patients_async,
 )
-from app.services.auth import get_current_user
+from app.services.auth import get_current_user, get_current_user_async
 
 router = APIRouter()
 
 patient_not__found_message = "Paciente no encontrado"
 
 
-
-
 @router.post("/", response_model=PatientRead, status_code=status.HTTP_201_CREATED)
 def create_paciente(
     payload: PatientCreate,
@@ -32,35 +43,54 @@ def create_paciente(
 
 
 @router.get("/", response_model=list[PatientRead])
-def list_pacientes(
-    db: Session = Depends(get_db), user: dict = Depends(get_current_user)
+async def list_pacientes(
+    request: Request,
+    db: AsyncSession = Depends(get_async_read_db),
+    user: dict = Depends(get_current_user_async),
 ):
-    return list_patients(db)
+    etag = make_etag(request, await patients_version_async(db))
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    patients = await list_patients_async(db)
+    response = json_list_response(PatientRead, patients, from_attributes=True)
+    return set_etag(response, etag)
 
 
 @router.get("/search", response_model=list[PatientRead])
-def search_pacientes(
+async def search_pacientes(
+    request: Request,
     search: str = Query(
         ..., min_length=2, description="Término de búsqueda (nombre, email o DNI)"
     ),
-    db: Session = Depends(get_db),
-    user: dict = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_read_db),
+    user: dict = Depends(get_current_user_async),
 ):
     """Buscar pacientes por nombre, email o DNI"""
-    return search_patients(db, search)
+    etag = make_etag(request, await patients_version_async(db))
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    patients = await search_patients_async(db, search)
+    response = json_list_response(PatientRead, patients, from_attributes=True)
+    return set_etag(response, etag)
 
 
 @router.get("/{patient_id}", response_model=PatientRead)
-def get_paciente(
+async def get_paciente(
     patient_id: int,
-    db: Session = Depends(get_db),
-    user: dict = Depends(get_current_user),
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_async_read_db),
+    user: dict = Depends(get_current_user_async),
 ):
-    obj = get_patient(db, patient_id)
+    obj = await get_patient_async(db, patient_id)
     if not obj:
         raise HTTPException(
-            status_code=404, detail={"message":patient_not__found_message}
+            status_code=404, detail={"message": patient_not__found_message}
         )
+    etag = make_etag(request, obj.updated_at)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    set_etag(response, etag)
     return obj
 
 
@@ -74,7 +104,7 @@ def update_paciente(
     obj = get_patient(db, patient_id)
     if not obj:
         raise HTTPException(
-            status_code=404, detail={"message":patient_not__found_message}
+            status_code=404, detail={"message": patient_not__found_message}
         )
     obj = update_patient(db, obj, data=payload.model_dump(exclude_unset=True))
     return obj
@@ -89,7 +119,7 @@ def delete_paciente(
     obj = get_patient(db, patient_id)
     if not obj:
         raise HTTPException(
-            status_code=404, detail={"message":patient_not__found_message}
+            status_code=404, detail={"message": patient_not__found_message}
         )
     delete_patient(db, obj)
     return None
@@ -0,0 +1,130 @@
+from datetime import date, timedelta
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.db.session import get_async_read_db, get_db, get_read_db
+from app.limiter import availability_limit, limiter
+from app.schemas.schedules import (
+    CalendarDay,
+    ScheduleExceptionCreate,
+    ScheduleExceptionRead,
+    WorkingHoursRead,
+    WorkingHoursReplace,
+)
+from app.services.appointments import free_calendar_async
+from app.services.auth import get_current_user, get_current_user_async, require_roles
+from app.services.working_hours import (
+    create_schedule_exception,
+    delete_schedule_exception,
+    list_schedule_exceptions,
+    list_working_hours,
+    replace_working_hours,
+)
+
+router = APIRouter()
+
+# Tope del rango de GET /calendar (una consulta de ocupados para todo el rango)
+MAX_CALENDAR_DAYS = 31
+
+
+@router.get("/working-hours", response_model=list[WorkingHoursRead])
+def get_working_hours(
+    fisio_id: Optional[str] = Query(
+        None, description="Fisioterapeuta; sin él, horario de la clínica"
+    ),
+    db: Session = Depends(get_read_db),
+    user: dict = Depends(get_current_user),
+):
+    return list_working_hours(db, fisio_id)
+
+
+@router.put(
+    "/working-hours",
+    response_model=list[WorkingHoursRead],
+    dependencies=[Depends(require_roles("admin"))],
+)
+def put_working_hours(payload: WorkingHoursReplace, db: Session = Depends(get_db)):
+    """Sustituye el horario semanal completo (clínica o fisio)."""
+    return replace_working_hours(
+        db,
+        fisio_id=payload.fisio_id,
+        slots=[slot.model_dump() for slot in payload.slots],
+    )
+
+
+@router.get("/exceptions", response_model=list[ScheduleExceptionRead])
+def get_schedule_exceptions(
+    date_from: Optional[date] = Query(None),
+    date_to: Optional[date] = Query(None),
+    fisio_id: Optional[str] = Query(
+        None, description="Incluye también las excepciones de la clínica"
+    ),
+    db: Session = Depends(get_read_db),
+    user: dict = Depends(get_current_user),
+):
+    return list_schedule_exceptions(
+        db, date_from=date_from, date_to=date_to, fisio_id=fisio_id
+    )
+
+
+@router.post(
+    "/exceptions",
+    response_model=ScheduleExceptionRead,
+    status_code=status.HTTP_201_CREATED,
+    dependencies=[Depends(require_roles("admin"))],
+)
+def post_schedule_exception(
+    payload: ScheduleExceptionCreate, db: Session = Depends(get_db)
+):
+    return create_schedule_exception(db, **payload.model_dump())
+
+
+@router.delete(
+    "/exceptions/{exception_id}",
+    status_code=status.HTTP_204_NO_CONTENT,
+    dependencies=[Depends(require_roles("admin"))],
+)
+def remove_schedule_exception(exception_id: int, db: Session = Depends(get_db)):
+    if not delete_schedule_exception(db, exception_id):
+        raise HTTPException(
+            status_code=404, detail={"message": "Excepción no encontrada"}
+        )
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
+
+
+@router.get("/calendar", response_model=list[CalendarDay])
+@limiter.limit(availability_limit)
+async def get_calendar(
+    request: Request,
+    date_from: date = Query(..., description="Primer día (YYYY-MM-DD)"),
+    date_to: Optional[date] = Query(
+        None, description="Último día; por defecto date_from"
+    ),
+    duration_minutes: int = Query(60, ge=1, le=24 * 60),
+    step_minutes: int = Query(30, ge=5, le=24 * 60),
+    fisio_id: Optional[str] = Query(None, description="Horario de este fisio"),
+    db: AsyncSession = Depends(get_async_read_db),
+    user: dict = Depends(get_current_user_async),
+):
+    """
+    Calendario de tiempo libre: horario abierto menos citas ocupadas, con los
+    inicios de franja donde cabe `duration_minutes`. Permite pintar varios días
+    en una llamada en lugar de sondear `/appointments/availability`.
+    """
+    date_to = date_to or date_from
+    if date_to < date_from or date_to - date_from >= timedelta(days=MAX_CALENDAR_DAYS):
+        raise HTTPException(
+            status_code=400,
+            detail={"message": f"Rango inválido (máximo {MAX_CALENDAR_DAYS} días)"},
+        )
+    return await free_calendar_async(
+        db,
+        date_from=date_from,
+        date_to=date_to,
+        duration_minutes=duration_minutes,
+        step_minutes=step_minutes,
+        fisio_id=fisio_id,
+    )
@@ -0,0 +1,110 @@
+from __future__ import annotations
+from datetime import datetime, timedelta, timezone
+from typing import Optional, Set
+import logging
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.orm import Session
+
+from app.db.session import get_db, get_read_db
+from app.models.patient import Patient
+from app.schemas.waitlist import WaitlistCreate, WaitlistRead, WaitlistStatusEnum
+from app.services.auth import get_current_user
+from app.services.waitlist import (
+    add_to_waitlist,
+    cancel_waitlist_entry,
+    get_waitlist_entry,
+    list_waitlist,
+)
+from app.services.working_hours import clinic_tz
+
+router = APIRouter()
+logger = logging.getLogger(__name__)
+
+
+# El personal gestiona la lista de cualquier paciente; el resto, sólo la suya
+STAFF_ROLES = ("admin", "fisioterapeuta")
+FORBIDDEN = {"message": "No puede gestionar la lista de espera de otro paciente"}
+
+
+def _own_patient_ids(db: Session, user: dict) -> Optional[Set[str]]:
+    """None para el personal; para un paciente, los ids con los que se le cita."""
+    if (user.get("user_metadata") or {}).get("role") in STAFF_ROLES:
+        return None
+    user_id = str(user.get("id"))
+    linked = db.query(Patient.id).filter(Patient.auth_user_id == user_id)
+    return {user_id, *(str(patient_id) for (patient_id,) in linked)}
+
+
+def _clinic_time(value: datetime) -> datetime:
+    # Interpretar datetimes naive en la zona de la clínica (CLINIC_TIMEZONE)
+    if value.tzinfo is None:
+        return value.replace(tzinfo=clinic_tz())
+    return value
+
+
+@router.post("/", response_model=WaitlistRead, status_code=status.HTTP_201_CREATED)
+def create_waitlist_entry(
+    payload: WaitlistCreate,
+    db: Session = Depends(get_db),
+    user: dict = Depends(get_current_user),
+):
+    """
+    Apunta al paciente en la lista de espera. Cuando se cancele o elimine una
+    cita que deje un hueco dentro de su ventana, se le reservará
+    automáticamente y recibirá la notificación de cita asignada.
+    """
+    own = _own_patient_ids(db, user)
+    if own is not None and payload.patient_id not in own:
+        raise HTTPException(status_code=403, detail=FORBIDDEN)
+    window_start = _clinic_time(payload.window_start)
+    if window_start < datetime.now(timezone.utc) - timedelta(minutes=1):
+        window_start = datetime.now(timezone.utc)
+    try:
+        return add_to_waitlist(
+            db,
+            patient_id=payload.patient_id,
+            fisio_id=payload.fisio_id,
+            window_start=window_start,
+            window_end=_clinic_time(payload.window_end),
+            duration_minutes=payload.duration_minutes,
+            appointment_type=payload.appointment_type,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail={"message": str(e)})
+
+
+@router.get("/", response_model=list[WaitlistRead])
+def get_waitlist(
+    patient_id: Optional[str] = Query(None),
+    status: Optional[WaitlistStatusEnum] = Query(None),
+    db: Session = Depends(get_read_db),
+    user: dict = Depends(get_current_user),
+):
+    """Entradas de la lista de espera: todas para el personal, las propias para el resto."""
+    patient_ids = _own_patient_ids(db, user)
+    if patient_id:
+        if patient_ids is not None and patient_id not in patient_ids:
+            raise HTTPException(status_code=403, detail=FORBIDDEN)
+        patient_ids = {patient_id}
+    return list_waitlist(db, patient_ids=patient_ids, status=status)
+
+
+@router.delete("/{entry_id}", response_model=WaitlistRead)
+def leave_waitlist(
+    entry_id: int,
+    db: Session = Depends(get_db),
+    user: dict = Depends(get_current_user),
+):
+    entry = get_waitlist_entry(db, entry_id)
+    if entry is None:
+        raise HTTPException(
+            status_code=404, detail={"message": "Entrada no encontrada"}
+        )
+    own = _own_patient_ids(db, user)
+    if own is not None and entry.patient_id not in own:
+        raise HTTPException(status_code=403, detail=FORBIDDEN)
+    try:
+        return cancel_waitlist_entry(db, entry)
+    except ValueError as e:
+        raise HTTPException(status_code=409, detail={"message": str(e)})
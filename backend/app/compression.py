@@ -0,0 +1,218 @@
+"""
+Compresión gzip/brotli de las respuestas según `Accept-Encoding`.
+
+Sustituye a `starlette.middleware.gzip.GZipMiddleware` para poder:
+
+- negociar brotli (si el paquete `brotli` está instalado) o gzip respetando
+  los pesos `q` del cliente (`gzip;q=0` desactiva gzip);
+- fijar el tamaño mínimo y el nivel de compresión desde la configuración;
+- en respuestas en streaming, vaciar el compresor tras cada chunk
+  (`flush_streaming`) para que el cliente reciba datos a medida que se generan
+  en lugar de esperar a que se llene el buffer interno de zlib.
+"""
+
+from __future__ import annotations
+
+import zlib
+from typing import Dict, Optional, Sequence
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - dependencia opcional
+    brotli = None
+
+DEFAULT_EXCLUDED_CONTENT_TYPES = (
+    "text/event-stream",
+    "image/",
+    "video/",
+    "audio/",
+    "application/zip",
+    "application/gzip",
+)
+
+
+class GzipEncoder:
+    encoding = "gzip"
+
+    def __init__(self, level: int) -> None:
+        # wbits=31: formato gzip (cabecera + CRC)
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush(zlib.Z_FINISH)
+
+
+class BrotliEncoder:
+    encoding = "br"
+
+    def __init__(self, quality: int) -> None:
+        self._compressor = brotli.Compressor(quality=quality)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.process(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.flush()
+
+    def finish(self) -> bytes:
+        return self._compressor.finish()
+
+
+def parse_accept_encoding(header: str) -> Dict[str, float]:
+    """`"br;q=1.0, gzip;q=0.8, *;q=0"` -> `{"br": 1.0, "gzip": 0.8, "*": 0.0}`."""
+    weights: Dict[str, float] = {}
+    for part in header.split(","):
+        coding, _, params = part.strip().partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        weights[coding] = q
+    return weights
+
+
+def choose_encoding(header: str, supported: Sequence[str]) -> Optional[str]:
+    """Codificación aceptada con mayor `q`; a igualdad, el orden de `supported`."""
+    weights = parse_accept_encoding(header)
+    best, best_q = None, 0.0
+    for coding in supported:
+        q = weights.get(coding, weights.get("*", 0.0))
+        if q > best_q:
+            best, best_q = coding, q
+    return best
+
+
+class CompressionMiddleware:
+    """Middleware ASGI de compresión gzip/brotli."""
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        *,
+        minimum_size: int = 1024,
+        gzip_level: int = 6,
+        brotli_quality: int = 4,
+        flush_streaming: bool = True,
+        excluded_content_types: Sequence[str] = DEFAULT_EXCLUDED_CONTENT_TYPES,
+    ) -> None:
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self.flush_streaming = flush_streaming
+        self.excluded_content_types = tuple(excluded_content_types)
+        self.supported = ("br", "gzip") if brotli is not None else ("gzip",)
+
+    def _encoder(self, encoding: str):
+        if encoding == "br":
+            return BrotliEncoder(self.brotli_quality)
+        return GzipEncoder(self.gzip_level)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        accept = Headers(scope=scope).get("accept-encoding", "")
+        encoding = choose_encoding(accept, self.supported) if accept else None
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+        await _Responder(self, encoding)(scope, receive, send)
+
+
+class _Responder:
+    """Estado de compresión de una única respuesta."""
+
+    def __init__(self, middleware: CompressionMiddleware, encoding: str) -> None:
+        self.middleware = middleware
+        self.encoding = encoding
+        self.send: Send
+        self.start_message: Optional[Message] = None
+        self.encoder = None
+        self.passthrough = False
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        self.send = send
+        await self.middleware.app(scope, receive, self.send_compressed)
+
+    def _skip(self, message: Message) -> bool:
+        headers = Headers(raw=message["headers"])
+        content_type = headers.get("content-type", "")
+        return (
+            "content-encoding" in headers
+            or message["status"] in (204, 304)
+            or content_type.startswith(self.middleware.excluded_content_types)
+        )
+
+    async def send_compressed(self, message: Message) -> None:
+        message_type = message["type"]
+        if message_type == "http.response.start":
+            # Las cabeceras se envían al ver el primer chunk del cuerpo
+            self.start_message = message
+            self.passthrough = self._skip(message)
+            return
+        if message_type != "http.response.body":
+            # p. ej. http.response.pathsend: sin compresión
+            if self.start_message is not None:
+                await self.send(self.start_message)
+                self.start_message = None
+            await self.send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if self.start_message is not None:
+            start, self.start_message = self.start_message, None
+            headers = MutableHeaders(raw=start["headers"])
+            if not self.passthrough:
+                headers.add_vary_header("Accept-Encoding")
+            if self.passthrough or (
+                not more_body and len(body) < self.middleware.minimum_size
+            ):
+                self.passthrough = True
+                await self.send(start)
+                await self.send(message)
+                return
+            self.encoder = self.middleware._encoder(self.encoding)
+            headers["Content-Encoding"] = self.encoding
+            if more_body:
+                del headers["Content-Length"]
+                message["body"] = self._chunk(body)
+            else:
+                message["body"] = self.encoder.compress(body) + self.encoder.finish()
+                headers["Content-Length"] = str(len(message["body"]))
+            await self.send(start)
+            await self.send(message)
+            return
+
+        if self.passthrough:
+            await self.send(message)
+            return
+        message["body"] = (
+            self._chunk(body)
+            if more_body
+            else self.encoder.compress(body) + self.encoder.finish()
+        )
+        await self.send(message)
+
+    def _chunk(self, body: bytes) -> bytes:
+        data = self.encoder.compress(body)
+        if self.middleware.flush_streaming:
+            data += self.encoder.flush()
+        return data
@@ -2,7 +2,7 @@ from pathlib import Path
 from functools import lru_cache
 from pydantic_settings import BaseSettings, SettingsConfigDict
 from pydantic import AnyHttpUrl, PostgresDsn, field_validator, AliasChoices, Field
-from typing import List, Optional, Any
+from typing import List, Literal, Optional, Any
 import os
 
 
@@ -32,6 +32,91 @@ class Settings(BaseSettings):
     # Database (puede omitirse si no se usa)
     DATABASE_URL: Optional[PostgresDsn | str] = None
 
+    # Pool de conexiones (sólo Postgres). Conexiones máximas por worker =
+    # DB_POOL_SIZE + DB_MAX_OVERFLOW; multiplicar por el número de workers de
+    # uvicorn y mantenerlo por debajo de `max_connections` de Postgres.
+    DB_POOL_SIZE: int = Field(default=5, ge=1)
+    DB_MAX_OVERFLOW: int = Field(default=10, ge=0)
+    DB_POOL_TIMEOUT: float = Field(default=30.0, gt=0)
+    DB_POOL_RECYCLE: int = -1  # segundos; -1 desactiva el reciclado
+    # always | idle | never (ver app.db.pool_metrics.instrument_pool)
+    DB_POOL_PRE_PING: Literal["always", "idle", "never"] = "always"
+    DB_POOL_PRE_PING_IDLE_SECONDS: float = Field(default=30.0, ge=0)
+
+    # Réplica de lectura opcional para dashboard, disponibilidad y listados.
+    # Tras escribir, el mismo cliente lee del primario durante esta ventana
+    # (debe cubrir el lag de replicación esperado). Con varios workers la marca
+    # de escritura debe compartirse (redis://).
+    DATABASE_READ_URL: Optional[PostgresDsn | str] = None
+    READ_AFTER_WRITE_SECONDS: float = Field(default=5.0, ge=0)
+    READ_AFTER_WRITE_STORAGE_URI: str = "memory://"  # memory:// | redis://host:6379/0
+
+    # Perfilado SQL por request (cabecera Server-Timing + log estructurado).
+    # Sin valor explícito sólo se activa con ENV=development: la cabecera
+    # expone nº de consultas y tiempos a cualquier cliente.
+    QUERY_PROFILING_ENABLED: Optional[bool] = Field(default=None, validate_default=True)
+    QUERY_PROFILING_TOP_N: int = Field(default=3, ge=1)
+    SLOW_QUERY_MS: float = 100.0
+    # Nº máximo de sentencias por request antes de avisar en el log (0 = sin límite)
+    QUERY_BUDGET: int = Field(default=0, ge=0)
+
+    # GET /appointments/changes sólo devuelve cambios con al menos esta
+    # antigüedad: debe superar la duración de la transacción de escritura más
+    # larga para que el cursor no deje atrás filas confirmadas tarde.
+    CHANGES_SAFETY_LAG_SECONDS: float = Field(default=5.0, ge=0)
+
+    # True cuando la BD tiene la restricción EXCLUDE de solapes por fisio
+    # (migración 9d41c7e2b8a6, sólo Postgres): se omite la comprobación previa
+    # por fisio en Python y el conflicto lo rechaza el índice de forma atómica.
+    # La comprobación global (que cubre al paciente) se mantiene. Se ignora en
+    # otros dialectos (ver `overlap_constraint_enforced`).
+    APPOINTMENT_OVERLAP_CONSTRAINT: bool = False
+
+    # Asignar fisio automáticamente (app.services.assignment) al crear una cita
+    # sin fisio, en lugar de notificar a todos los admins y fisios
+    AUTO_ASSIGN_FISIO: bool = False
+
+    # Reservar los huecos liberados (cancelación/eliminación) a pacientes de la
+    # lista de espera
+    WAITLIST_BACKFILL_ENABLED: bool = True
+
+    # Zona horaria de la clínica y horario por defecto (si no hay filas en
+    # `working_hours`) para el cálculo de disponibilidad
+    CLINIC_TIMEZONE: str = "America/Bogota"
+    CLINIC_DEFAULT_OPEN_HOUR: int = Field(default=8, ge=0, le=23)
+    CLINIC_DEFAULT_CLOSE_HOUR: int = Field(default=18, ge=1, le=24)
+
+    # `Idempotency-Key` en las escrituras de citas (app.idempotency). Con
+    # varios workers usar Redis para que un reintento vea la clave de otro.
+    IDEMPOTENCY_ENABLED: bool = True
+    IDEMPOTENCY_STORAGE_URI: str = "memory://"  # memory:// | redis://host:6379/0
+    IDEMPOTENCY_TTL_SECONDS: float = Field(default=24 * 60 * 60, gt=0)
+    IDEMPOTENCY_PENDING_TTL_SECONDS: float = Field(default=60.0, gt=0)
+    IDEMPOTENCY_MAX_ENTRIES: int = Field(default=10_000, ge=1)
+
+    # Rate limiting (app.limiter). Con varios workers usar Redis para compartir
+    # los contadores; si Redis cae se cuenta en memoria local.
+    RATE_LIMIT_ENABLED: bool = True
+    RATE_LIMIT_STORAGE_URI: str = "memory://"  # memory:// | redis://host:6379/0
+    RATE_LIMIT_STRATEGY: Literal["moving-window", "fixed-window"] = "moving-window"
+    # Por usuario en los endpoints caros de disponibilidad y calendario
+    AVAILABILITY_RATE_LIMIT: str = "60/minute"
+
+    # Métricas Prometheus en /metrics. Desactivadas por defecto: exponen rutas,
+    # latencias y estado del pool. En producción activarlas junto con
+    # METRICS_TOKEN (bearer token del scraper) o dejar /metrics sólo en la red
+    # interna.
+    METRICS_ENABLED: bool = False
+    METRICS_TOKEN: Optional[str] = None
+
+    # Compresión de respuestas (gzip, y brotli si el paquete está instalado)
+    COMPRESSION_ENABLED: bool = True
+    COMPRESSION_MINIMUM_SIZE: int = Field(default=1024, ge=0)
+    COMPRESSION_GZIP_LEVEL: int = Field(default=6, ge=1, le=9)
+    COMPRESSION_BROTLI_QUALITY: int = Field(default=4, ge=0, le=11)
+    # Vaciar el compresor tras cada chunk de las respuestas en streaming
+    COMPRESSION_STREAMING_FLUSH: bool = True
+
     # Security
     # Security
     # IMPORTANT: This default is insecure. Always set SECRET_KEY via environment
@@ -69,6 +154,13 @@ class Settings(BaseSettings):
     DEV_BYPASS_EMAIL_CONFIRM: bool = False
     DEV_BYPASS_EMAILS: str = ""
 
+    @field_validator("QUERY_PROFILING_ENABLED")
+    @classmethod
+    def default_profiling_to_development(cls, v: Optional[bool], info) -> bool:
+        if v is None:
+            return info.data.get("ENV") == "development"
+        return v
+
     @field_validator("CORS_ORIGINS", mode="before")
     @classmethod
     def assemble_cors_origins(cls, v: Any) -> List[str]:
@@ -0,0 +1,79 @@
+"""
+ETag y GET condicional (`If-None-Match` -> 304) para los endpoints de lectura.
+
+El ETag no se calcula sobre el cuerpo: se deriva de una "versión" barata de los
+datos (número de filas y `max(updated_at)` de las tablas implicadas, obtenidos
+en una sola consulta) junto con la ruta y los parámetros de la petición. Así,
+si el cliente ya tiene la versión actual, se responde 304 sin cargar filas ni
+serializar nada.
+
+Uso típico en un endpoint:
+
+    etag = make_etag(request, appointments_version(db, date=date))
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    response = json_list_response(...)
+    return set_etag(response, etag)
+"""
+
+from __future__ import annotations
+
+import hashlib
+from typing import Any, Tuple
+
+from starlette.requests import Request
+from starlette.responses import Response
+from sqlalchemy import func, select
+
+# El cliente siempre revalida; `private` evita que proxies compartidos guarden
+# respuestas de usuarios autenticados.
+CACHE_CONTROL = "private, no-cache"
+
+
+def version_columns(model, *criteria, column=None) -> Tuple[Any, Any]:
+    """
+    Subconsultas escalares `count(*)` y `max(column)` de `model` filtrado por
+    `criteria`; `column` es `model.updated_at` por defecto.
+
+    Se combinan varias en un único `select(...)` para obtener la versión de
+    todas las tablas de un endpoint en una consulta.
+    """
+    column = column if column is not None else model.updated_at
+    count = select(func.count()).select_from(model).where(*criteria)
+    latest = select(func.max(column)).where(*criteria)
+    return count.scalar_subquery(), latest.scalar_subquery()
+
+
+def make_etag(request: Request, *version: Any) -> str:
+    """ETag débil a partir de la ruta, los parámetros y la versión de los datos."""
+    query = sorted(request.query_params.multi_items())
+    key = repr((request.url.path, query, version)).encode()
+    return f'W/"{hashlib.blake2b(key, digest_size=12).hexdigest()}"'
+
+
+def _opaque(tag: str) -> str:
+    tag = tag.strip()
+    return tag[2:] if tag.startswith("W/") else tag
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """Comparación débil de `If-None-Match` (RFC 9110 §13.1.2)."""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    current = _opaque(etag)
+    return any(_opaque(tag) == current for tag in header.split(","))
+
+
+def not_modified(etag: str) -> Response:
+    return Response(
+        status_code=304, headers={"ETag": etag, "Cache-Control": CACHE_CONTROL}
+    )
+
+
+def set_etag(response: Response, etag: str) -> Response:
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = CACHE_CONTROL
+    return response
@@ -0,0 +1,46 @@
+"""
+Serialización rápida de listas para los endpoints de listado.
+
+FastAPI valida de nuevo el valor devuelto contra `response_model`, lo convierte
+a tipos JSON en Python y después lo codifica. Para listas grandes de modelos
+que ya son válidos (construidos por los servicios) eso es trabajo duplicado:
+`json_list_response` los codifica directamente a bytes con pydantic-core. El
+`response_model` del endpoint se mantiene para la documentación OpenAPI.
+"""
+
+from __future__ import annotations
+
+from functools import lru_cache
+from typing import Any, Iterable, Type
+
+from fastapi.responses import Response
+from pydantic import BaseModel, TypeAdapter
+
+
+@lru_cache(maxsize=None)
+def _list_adapter(model: Type[BaseModel]) -> TypeAdapter:
+    return TypeAdapter(list[model])
+
+
+def json_list_response(
+    model: Type[BaseModel],
+    items: Iterable[Any],
+    *,
+    from_attributes: bool = False,
+    status_code: int = 200,
+) -> Response:
+    """
+    Respuesta JSON con `items` serializados como `list[model]`.
+
+    `items` deben ser instancias de `model`; con `from_attributes=True` pueden
+    ser objetos ORM, que se validan una sola vez antes de serializar.
+    """
+    adapter = _list_adapter(model)
+    items = list(items)
+    if from_attributes:
+        items = adapter.validate_python(items, from_attributes=True)
+    return Response(
+        adapter.dump_json(items),
+        status_code=status_code,
+        media_type="application/json",
+    )
@@ -0,0 +1,174 @@
+"""
+Instrumentación del pool de conexiones de SQLAlchemy.
+
+Registra el tiempo de espera en checkout y el coste del pre-ping para poder
+dimensionar el pool frente al número de workers de uvicorn y el
+`max_connections` de Postgres.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from sqlalchemy import event, exc
+from sqlalchemy.pool import Pool, QueuePool
+
+PRE_PING_STRATEGIES = ("always", "idle", "never")
+
+
+class PoolMetrics:
+    """Contadores acumulados del pool (thread-safe)."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.checkouts = 0
+            self.checkout_wait_total = 0.0
+            self.checkout_wait_max = 0.0
+            self.checkout_timeouts = 0
+            self.pre_pings = 0
+            self.pre_ping_total = 0.0
+            self.pre_ping_failures = 0
+
+    def record_checkout_wait(self, seconds: float, *, timed_out: bool = False) -> None:
+        with self._lock:
+            if timed_out:
+                self.checkout_timeouts += 1
+                return
+            self.checkouts += 1
+            self.checkout_wait_total += seconds
+            self.checkout_wait_max = max(self.checkout_wait_max, seconds)
+
+    def record_pre_ping(self, seconds: float, *, ok: bool) -> None:
+        with self._lock:
+            self.pre_pings += 1
+            self.pre_ping_total += seconds
+            if not ok:
+                self.pre_ping_failures += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "checkouts": self.checkouts,
+                "checkout_wait_total_ms": round(self.checkout_wait_total * 1000, 3),
+                "checkout_wait_avg_ms": round(
+                    self.checkout_wait_total * 1000 / self.checkouts, 3
+                )
+                if self.checkouts
+                else 0.0,
+                "checkout_wait_max_ms": round(self.checkout_wait_max * 1000, 3),
+                "checkout_timeouts": self.checkout_timeouts,
+                "pre_pings": self.pre_pings,
+                "pre_ping_total_ms": round(self.pre_ping_total * 1000, 3),
+                "pre_ping_avg_ms": round(
+                    self.pre_ping_total * 1000 / self.pre_pings, 3
+                )
+                if self.pre_pings
+                else 0.0,
+                "pre_ping_failures": self.pre_ping_failures,
+            }
+
+
+pool_metrics = PoolMetrics()
+
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool que mide cuánto espera cada checkout (incluye abrir conexión nueva)."""
+
+    metrics: Optional[PoolMetrics] = None
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            conn = super()._do_get()
+        except exc.TimeoutError:
+            if self.metrics is not None:
+                self.metrics.record_checkout_wait(
+                    time.perf_counter() - start, timed_out=True
+                )
+            raise
+        if self.metrics is not None:
+            self.metrics.record_checkout_wait(time.perf_counter() - start)
+        return conn
+
+    def recreate(self) -> "InstrumentedQueuePool":
+        new_pool = super().recreate()
+        new_pool.metrics = self.metrics
+        return new_pool
+
+
+def _ping(dbapi_connection) -> None:
+    cursor = dbapi_connection.cursor()
+    try:
+        cursor.execute("SELECT 1")
+    finally:
+        cursor.close()
+
+
+def instrument_pool(
+    pool: Pool,
+    *,
+    metrics: PoolMetrics = pool_metrics,
+    pre_ping: str = "always",
+    pre_ping_idle_seconds: float = 30.0,
+) -> None:
+    """
+    Conecta las métricas al pool e instala la estrategia de pre-ping:
+
+    - "always": ping en cada checkout (equivale a `pool_pre_ping=True`).
+    - "idle": ping sólo si la conexión estuvo ociosa más de `pre_ping_idle_seconds`.
+    - "never": sin ping; se confía en `pool_recycle` para descartar conexiones viejas.
+    """
+    if pre_ping not in PRE_PING_STRATEGIES:
+        raise ValueError(f"Estrategia de pre-ping desconocida: {pre_ping}")
+
+    if isinstance(pool, InstrumentedQueuePool):
+        pool.metrics = metrics
+
+    @event.listens_for(pool, "checkin")
+    def _on_checkin(dbapi_connection, connection_record):
+        if connection_record is not None:
+            connection_record.info["last_checkin"] = time.monotonic()
+
+    if pre_ping == "never":
+        return
+
+    threshold = 0.0 if pre_ping == "always" else pre_ping_idle_seconds
+
+    @event.listens_for(pool, "checkout")
+    def _on_checkout(dbapi_connection, connection_record, connection_proxy):
+        last_checkin = connection_record.info.get("last_checkin")
+        # Conexión recién abierta: no hace falta comprobarla
+        if last_checkin is None or time.monotonic() - last_checkin < threshold:
+            return
+        start = time.perf_counter()
+        try:
+            _ping(dbapi_connection)
+        except Exception:
+            metrics.record_pre_ping(time.perf_counter() - start, ok=False)
+            # El pool descarta esta conexión y reintenta con una nueva
+            raise exc.DisconnectionError()
+        metrics.record_pre_ping(time.perf_counter() - start, ok=True)
+
+
+def pool_status(pool: Pool, metrics: PoolMetrics = pool_metrics) -> Dict[str, Any]:
+    """Estado actual del pool más las métricas acumuladas."""
+    status: Dict[str, Any] = {"pool_class": type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        status.update(
+            {
+                "size": pool.size(),
+                "checked_out": pool.checkedout(),
+                "checked_in": pool.checkedin(),
+                "overflow": max(pool.overflow(), 0),
+                "max_overflow": pool._max_overflow,
+                "timeout_seconds": pool.timeout(),
+            }
+        )
+    status.update(metrics.snapshot())
+    return status
@@ -0,0 +1,187 @@
+"""
+Perfilado de SQL por request.
+
+Cuenta las sentencias y el tiempo de BD de cada request mediante los eventos
+`before_cursor_execute`/`after_cursor_execute` de SQLAlchemy, lo expone en la
+cabecera `Server-Timing` y deja un log estructurado con las sentencias más
+lentas. Por defecto sólo en desarrollo (`QUERY_PROFILING_ENABLED`): la
+cabecera muestra detalles internos a cualquier cliente.
+`count_queries`/`assert_max_queries` permiten fijar presupuestos de consultas
+en los tests.
+"""
+
+from __future__ import annotations
+
+import heapq
+import json
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Iterator, List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+logger = logging.getLogger(__name__)
+
+_MAX_SQL_CHARS = 300
+
+
+@dataclass
+class QueryStats:
+    count: int = 0
+    total_seconds: float = 0.0
+    # min-heap (segundos, sql) con las N sentencias más lentas
+    slowest: List[Tuple[float, str]] = field(default_factory=list)
+    top_n: int = 3
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def record(self, statement: str, seconds: float) -> None:
+        with self._lock:
+            self.count += 1
+            self.total_seconds += seconds
+            item = (seconds, statement[:_MAX_SQL_CHARS])
+            if len(self.slowest) < self.top_n:
+                heapq.heappush(self.slowest, item)
+            elif seconds > self.slowest[0][0]:
+                heapq.heapreplace(self.slowest, item)
+
+    def slowest_sorted(self) -> List[Tuple[float, str]]:
+        return sorted(self.slowest, reverse=True)
+
+
+_request_stats: ContextVar[Optional[QueryStats]] = ContextVar(
+    "fisiomove_request_query_stats", default=None
+)
+_counters: List[QueryStats] = []
+_counters_lock = threading.Lock()
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    starts = conn.info.get("query_start_time")
+    if not starts:
+        return
+    elapsed = time.perf_counter() - starts.pop()
+    stats = _request_stats.get()
+    if stats is not None:
+        stats.record(statement, elapsed)
+    if _counters:
+        with _counters_lock:
+            for counter in _counters:
+                counter.record(statement, elapsed)
+
+
+def server_timing_header(stats: QueryStats, total_seconds: float) -> str:
+    return (
+        f'db;dur={stats.total_seconds * 1000:.2f};desc="{stats.count} queries", '
+        f"app;dur={total_seconds * 1000:.2f}"
+    )
+
+
+class QueryProfilingMiddleware:
+    """Middleware ASGI: estadísticas SQL del request en `Server-Timing` y en el log."""
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        *,
+        top_n: int = 3,
+        slow_query_ms: float = 100.0,
+        query_budget: int = 0,
+    ) -> None:
+        self.app = app
+        self.top_n = top_n
+        self.slow_query_ms = slow_query_ms
+        # Nº máximo de sentencias antes de avisar en el log (0 = sin límite)
+        self.query_budget = query_budget
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = QueryStats(top_n=self.top_n)
+        start = time.perf_counter()
+        status = 500
+
+        async def send_with_timing(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                headers = MutableHeaders(scope=message)
+                headers["Server-Timing"] = server_timing_header(
+                    stats, time.perf_counter() - start
+                )
+            await send(message)
+
+        token = _request_stats.set(stats)
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _request_stats.reset(token)
+            self._log(scope, status, stats, time.perf_counter() - start)
+
+    def _log(self, scope: Scope, status: int, stats: QueryStats, total: float) -> None:
+        slowest = stats.slowest_sorted()
+        slow = bool(slowest) and slowest[0][0] * 1000 >= self.slow_query_ms
+        over_budget = 0 < self.query_budget < stats.count
+        level = logging.WARNING if slow or over_budget else logging.DEBUG
+        if not logger.isEnabledFor(level):
+            return
+        logger.log(
+            level,
+            json.dumps(
+                {
+                    "event": "request_db_profile",
+                    "method": scope["method"],
+                    "path": scope["path"],
+                    "status": status,
+                    "queries": stats.count,
+                    "db_ms": round(stats.total_seconds * 1000, 2),
+                    "total_ms": round(total * 1000, 2),
+                    "over_budget": over_budget,
+                    "slowest": [
+                        {"ms": round(sec * 1000, 2), "sql": sql} for sec, sql in slowest
+                    ],
+                },
+                ensure_ascii=False,
+            ),
+        )
+
+
+@contextmanager
+def count_queries(top_n: int = 10) -> Iterator[QueryStats]:
+    """Cuenta todas las sentencias ejecutadas dentro del bloque (cualquier hilo)."""
+    stats = QueryStats(top_n=top_n)
+    with _counters_lock:
+        _counters.append(stats)
+    try:
+        yield stats
+    finally:
+        with _counters_lock:
+            _counters.remove(stats)
+
+
+@contextmanager
+def assert_max_queries(budget: int) -> Iterator[QueryStats]:
+    """Falla si el bloque ejecuta más de `budget` sentencias SQL."""
+    with count_queries() as stats:
+        yield stats
+    if stats.count > budget:
+        detail = "\n".join(
+            f"  {sec * 1000:.2f} ms  {sql}" for sec, sql in stats.slowest_sorted()
+        )
+        raise AssertionError(
+            f"Presupuesto de consultas excedido: {stats.count} > {budget}\n{detail}"
+        )
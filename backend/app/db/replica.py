@@ -0,0 +1,190 @@
+"""
+Enrutado de lecturas a la réplica (DATABASE_READ_URL) con fallback al primario.
+
+Tras una escritura, el mismo cliente lee del primario durante
+READ_AFTER_WRITE_SECONDS para no ver datos atrasados por el lag de replicación.
+Una "escritura" es cualquier flush de una sesión SQLAlchemy durante su request,
+así los POST de sólo lectura (p. ej. check-availability) no fuerzan el primario.
+
+La marca de escritura vive en un almacén según READ_AFTER_WRITE_STORAGE_URI:
+en proceso (`memory://`, sólo vale con un worker) o Redis (`redis://...`,
+compartido: con `--workers N` la siguiente lectura suele caer en otro worker).
+`ClientTrackingMiddleware` consulta el almacén una vez al empezar el request y
+guarda la marca antes de enviar la respuesta, así que las dependencias de
+sesión no hacen E/S.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import threading
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Callable, Dict, Optional
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+
+@dataclass
+class _ClientRequest:
+    key: str
+    # El cliente escribió dentro de la ventana (antes de este request)
+    wrote_recently: bool = False
+    # Este request ha escrito (algún flush)
+    wrote: bool = False
+
+
+_current_client: ContextVar[Optional[_ClientRequest]] = ContextVar(
+    "fisiomove_current_client", default=None
+)
+
+
+class MemoryWriteTracker:
+    """Último instante de escritura por cliente (en memoria, por worker)."""
+
+    def __init__(
+        self, window_seconds: float, clock: Callable[[], float] = time.monotonic
+    ) -> None:
+        self.window_seconds = window_seconds
+        self._clock = clock
+        self._last_write: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    async def mark(self, key: str) -> None:
+        now = self._clock()
+        with self._lock:
+            self._last_write[key] = now
+            if len(self._last_write) > 10_000:
+                cutoff = now - self.window_seconds
+                self._last_write = {
+                    k: t for k, t in self._last_write.items() if t >= cutoff
+                }
+
+    async def wrote_recently(self, key: str) -> bool:
+        with self._lock:
+            last = self._last_write.get(key)
+        return last is not None and self._clock() - last < self.window_seconds
+
+    def clear(self) -> None:
+        with self._lock:
+            self._last_write.clear()
+
+
+class RedisWriteTracker:
+    """Marca compartida en Redis (`SET PX`); el cliente síncrono corre en el threadpool."""
+
+    def __init__(
+        self, url: str, window_seconds: float, prefix: str = "read-after-write:"
+    ) -> None:
+        import redis
+
+        self._client = redis.Redis.from_url(url)
+        self.window_ms = max(1, int(window_seconds * 1000))
+        self.prefix = prefix
+
+    async def mark(self, key: str) -> None:
+        await run_in_threadpool(
+            self._client.set, self.prefix + key, b"1", px=self.window_ms
+        )
+
+    async def wrote_recently(self, key: str) -> bool:
+        return bool(await run_in_threadpool(self._client.exists, self.prefix + key))
+
+
+def build_write_tracker(uri: str, window_seconds: float):
+    """Almacén de marcas según la URI: `memory://` o `redis://` / `rediss://`."""
+    if uri.startswith(("redis://", "rediss://")):
+        return RedisWriteTracker(uri, window_seconds)
+    if uri.startswith("memory://"):
+        return MemoryWriteTracker(window_seconds)
+    raise ValueError(f"READ_AFTER_WRITE_STORAGE_URI no soportada: {uri}")
+
+
+def _client_key(authorization: Optional[str], client) -> str:
+    """Identifica al cliente por su token (hash) o, sin token, por IP."""
+    if authorization:
+        return "tok:" + hashlib.sha256(authorization.encode()).hexdigest()[:24]
+    return "ip:" + (client[0] if client else "unknown")
+
+
+class ClientTrackingMiddleware:
+    """Middleware ASGI: decide réplica/primario por cliente y registra sus escrituras.
+
+    Sólo hace falta con réplica (`DATABASE_READ_URL`); sin ella no se registra.
+    """
+
+    def __init__(self, app: ASGIApp, *, tracker) -> None:
+        self.app = app
+        self.tracker = tracker
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        current = _ClientRequest(
+            _client_key(Headers(scope=scope).get("authorization"), scope.get("client"))
+        )
+        current.wrote_recently = await self.tracker.wrote_recently(current.key)
+
+        async def send_marked(message: Message) -> None:
+            # Antes de que el cliente vea la respuesta: su siguiente lectura,
+            # en cualquier worker, ya encuentra la marca
+            if message["type"] == "http.response.start" and current.wrote:
+                await self.tracker.mark(current.key)
+            await send(message)
+
+        token = _current_client.set(current)
+        try:
+            await self.app(scope, receive, send_marked)
+        finally:
+            _current_client.reset(token)
+
+
+@event.listens_for(Session, "after_flush")
+def _mark_client_write(session, flush_context):
+    current = _current_client.get()
+    if current is not None:
+        current.wrote = True
+
+
+def reads_from_primary() -> bool:
+    """True si el cliente del request actual escribió hace poco (o en este request)."""
+    current = _current_client.get()
+    return current is not None and (current.wrote_recently or current.wrote)
+
+
+def make_read_db(
+    primary_factory: Callable[[], Session],
+    replica_factory: Optional[Callable[[], Session]],
+):
+    """Dependencia sync: réplica salvo que no exista o el cliente acabe de escribir."""
+
+    def get_read_db():
+        factory = replica_factory
+        if factory is None or reads_from_primary():
+            factory = primary_factory
+        db = factory()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    return get_read_db
+
+
+def make_async_read_db(get_primary_factory: Callable, get_replica_factory: Callable):
+    """Dependencia async equivalente; las factorías se resuelven perezosamente."""
+
+    async def get_async_read_db():
+        factory = get_replica_factory()
+        if factory is None or reads_from_primary():
+            factory = get_primary_factory()
+        async with factory() as db:
+            yield db
+
+    return get_async_read_db
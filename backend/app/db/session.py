@@ -1,24 +1,138 @@
+from functools import lru_cache
+
 from sqlalchemy import create_engine
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
 from sqlalchemy.orm import sessionmaker
 
 from app.core.config import settings
+from app.db.pool_metrics import InstrumentedQueuePool, instrument_pool, pool_status
+from app.db.replica import make_async_read_db, make_read_db
+
+
+def create_db_engine(db_url: str) -> Engine:
+    if db_url.startswith("sqlite"):
+        engine = create_engine(db_url, connect_args={"check_same_thread": False})
+    else:
+        if db_url.startswith("postgresql") and "sslmode=" not in db_url:
+            sep = "&" if "?" in db_url else "?"
+            db_url = f"{db_url}{sep}sslmode=require"
+        engine = create_engine(
+            db_url,
+            poolclass=InstrumentedQueuePool,
+            pool_size=settings.DB_POOL_SIZE,
+            max_overflow=settings.DB_MAX_OVERFLOW,
+            pool_timeout=settings.DB_POOL_TIMEOUT,
+            pool_recycle=settings.DB_POOL_RECYCLE,
+        )
+        # El pre-ping lo instala instrument_pool según DB_POOL_PRE_PING para
+        # poder medir su coste (en lugar de pool_pre_ping=True)
+        instrument_pool(
+            engine.pool,
+            pre_ping=settings.DB_POOL_PRE_PING,
+            pre_ping_idle_seconds=settings.DB_POOL_PRE_PING_IDLE_SECONDS,
+        )
+    return engine
 
-_db_url = str(settings.DATABASE_URL)
 
-if _db_url.startswith("sqlite"):
-    engine = create_engine(_db_url, connect_args={"check_same_thread": False})
-else:
-    if _db_url.startswith("postgresql") and "sslmode=" not in _db_url:
-        sep = "&" if "?" in _db_url else "?"
-        _db_url = f"{_db_url}{sep}sslmode=require"
-    engine = create_engine(_db_url, pool_pre_ping=True)
+engine = create_db_engine(str(settings.DATABASE_URL))
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 
+read_engine = (
+    create_db_engine(str(settings.DATABASE_READ_URL))
+    if settings.DATABASE_READ_URL
+    else None
+)
+ReadSessionLocal = (
+    sessionmaker(autocommit=False, autoflush=False, bind=read_engine)
+    if read_engine is not None
+    else None
+)
+
+
 def get_db():
     db = SessionLocal()
     try:
         yield db
     finally:
         db.close()
+
+
+# Lecturas: réplica si está configurada, primario tras una escritura del cliente
+get_read_db = make_read_db(SessionLocal, ReadSessionLocal)
+
+
+def create_async_db_engine(db_url: str) -> AsyncEngine:
+    """Engine async equivalente: asyncpg para Postgres, aiosqlite para SQLite."""
+    url = make_url(db_url)
+    if url.get_backend_name() == "sqlite":
+        return create_async_engine(url.set(drivername="sqlite+aiosqlite"))
+    # asyncpg no entiende `sslmode`; se traduce a su argumento `ssl`
+    sslmode = url.query.get("sslmode", "require")
+    url = url.set(drivername="postgresql+asyncpg").difference_update_query(["sslmode"])
+    return create_async_engine(
+        url,
+        connect_args={"ssl": sslmode},
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+        pool_pre_ping=settings.DB_POOL_PRE_PING != "never",
+    )
+
+
+@lru_cache()
+def get_async_sessionmaker() -> async_sessionmaker[AsyncSession]:
+    # Perezoso: el driver async sólo se importa si algún endpoint lo usa
+    async_engine = create_async_db_engine(str(settings.DATABASE_URL))
+    return async_sessionmaker(async_engine, expire_on_commit=False)
+
+
+async def get_async_db():
+    async with get_async_sessionmaker()() as db:
+        yield db
+
+
+@lru_cache()
+def get_async_read_sessionmaker() -> async_sessionmaker[AsyncSession] | None:
+    if not settings.DATABASE_READ_URL:
+        return None
+    read_async_engine = create_async_db_engine(str(settings.DATABASE_READ_URL))
+    return async_sessionmaker(read_async_engine, expire_on_commit=False)
+
+
+get_async_read_db = make_async_read_db(
+    get_async_sessionmaker, get_async_read_sessionmaker
+)
+
+
+async def dispose_engines() -> None:
+    """Cierra los pools (sync y los async ya creados) al apagar el worker."""
+    for factory in (get_async_sessionmaker, get_async_read_sessionmaker):
+        if factory.cache_info().currsize:
+            maker = factory()
+            if maker is not None:
+                await maker.kw["bind"].dispose()
+    for sync_engine in (engine, read_engine):
+        if sync_engine is not None:
+            sync_engine.dispose()
+
+
+def get_pool_status() -> dict:
+    """Conexiones en uso, overflow, espera en checkout y coste del pre-ping."""
+    status = pool_status(engine.pool)
+    status["configured"] = {
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "timeout_seconds": settings.DB_POOL_TIMEOUT,
+        "recycle_seconds": settings.DB_POOL_RECYCLE,
+        "pre_ping": settings.DB_POOL_PRE_PING,
+    }
+    return status
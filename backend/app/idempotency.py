@@ -0,0 +1,281 @@
+"""
+Cabecera `Idempotency-Key` para las escrituras de citas.
+
+Los clientes reintentan `POST /appointments/` cuando la respuesta tarda; sin
+clave, cada reintento vuelve a comprobar disponibilidad, crea otra cita y envía
+otra notificación. Con la cabecera:
+
+- la primera petición reserva la clave (marca "en curso") y, si termina con
+  éxito (< 400), se guarda su respuesta durante `ttl_seconds`;
+- un reintento con la misma clave y el mismo cuerpo recibe la respuesta
+  guardada (cabecera `Idempotent-Replayed: true`) tras una sola lectura del
+  almacén, sin tocar la BD;
+- mientras la primera sigue en curso, el reintento recibe 409 (`Retry-After`);
+- la misma clave con otro cuerpo es un error del cliente: 422.
+
+Las respuestas de error no se guardan (se libera la clave) para que el cliente
+pueda corregir y reintentar con la misma clave. La clave se acota por método,
+ruta y credenciales (`Authorization`), así que dos usuarios no comparten claves.
+
+Almacenes: en proceso (`memory://`, por worker) o Redis (`redis://...`,
+compartido entre workers) según `IDEMPOTENCY_STORAGE_URI`.
+"""
+
+from __future__ import annotations
+
+import base64
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers
+from starlette.responses import JSONResponse, Response
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+HEADER = "idempotency-key"
+REPLAYED_HEADER = "Idempotent-Replayed"
+UNSAFE_METHODS = ("POST", "PUT", "PATCH", "DELETE")
+MAX_KEY_LENGTH = 255
+# Cabeceras de la respuesta original que se reproducen
+REPLAYED_HEADERS = ("content-type", "etag", "location")
+
+# Registro guardado: {"fingerprint", "status", "headers", "body"}; sin "status"
+# mientras la primera petición está en curso
+Record = dict
+
+
+class MemoryIdempotencyStore:
+    """Almacén en proceso con caducidad por TTL y un máximo de entradas."""
+
+    def __init__(
+        self, max_entries: int = 10_000, clock: Callable[[], float] = time.monotonic
+    ) -> None:
+        self.max_entries = max_entries
+        self._clock = clock
+        self._entries: "OrderedDict[str, Tuple[float, Record]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _purge(self, now: float) -> None:
+        # Orden de inserción ~ orden de caducidad: basta mirar las primeras
+        while self._entries:
+            key, (expires_at, _) = next(iter(self._entries.items()))
+            if expires_at > now and len(self._entries) <= self.max_entries:
+                break
+            del self._entries[key]
+
+    async def reserve(self, key: str, record: Record, ttl: float) -> Optional[Record]:
+        """Guarda `record` si la clave no existe; si existe, devuelve el guardado."""
+        now = self._clock()
+        with self._lock:
+            self._purge(now)
+            current = self._entries.get(key)
+            if current is not None:
+                return current[1]
+            self._entries[key] = (now + ttl, record)
+            return None
+
+    async def save(self, key: str, record: Record, ttl: float) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+            self._entries[key] = (self._clock() + ttl, record)
+            self._purge(self._clock())
+
+    async def release(self, key: str) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class RedisIdempotencyStore:
+    """Almacén compartido en Redis (`SET NX EX`); el cliente síncrono corre en el threadpool."""
+
+    def __init__(self, url: str, prefix: str = "idempotency:") -> None:
+        import redis
+
+        self._client = redis.Redis.from_url(url)
+        self.prefix = prefix
+
+    async def reserve(self, key: str, record: Record, ttl: float) -> Optional[Record]:
+        name = self.prefix + key
+        created = await run_in_threadpool(
+            self._client.set, name, json.dumps(record), nx=True, ex=max(1, int(ttl))
+        )
+        if created:
+            return None
+        raw = await run_in_threadpool(self._client.get, name)
+        # Caducó entre SET y GET: se trata como en curso
+        return json.loads(raw) if raw else dict(record)
+
+    async def save(self, key: str, record: Record, ttl: float) -> None:
+        await run_in_threadpool(
+            self._client.set,
+            self.prefix + key,
+            json.dumps(record),
+            ex=max(1, int(ttl)),
+        )
+
+    async def release(self, key: str) -> None:
+        await run_in_threadpool(self._client.delete, self.prefix + key)
+
+
+def build_store(uri: str, max_entries: int = 10_000):
+    """Almacén según la URI: `memory://` o `redis://` / `rediss://`."""
+    if uri.startswith(("redis://", "rediss://")):
+        return RedisIdempotencyStore(uri)
+    if uri.startswith("memory://"):
+        return MemoryIdempotencyStore(max_entries=max_entries)
+    raise ValueError(f"IDEMPOTENCY_STORAGE_URI no soportada: {uri}")
+
+
+def _error(status_code: int, message: str, headers: Optional[dict] = None) -> Response:
+    return JSONResponse(
+        {"detail": {"message": message}}, status_code=status_code, headers=headers
+    )
+
+
+class IdempotencyMiddleware:
+    """Middleware ASGI: reproduce la respuesta de una escritura ya hecha con la misma clave."""
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        *,
+        store,
+        ttl_seconds: float = 24 * 60 * 60,
+        pending_ttl_seconds: float = 60,
+        paths: Sequence[str] = ("/",),
+    ) -> None:
+        self.app = app
+        self.store = store
+        self.ttl_seconds = ttl_seconds
+        # Una petición que muere sin liberar la clave no la bloquea para siempre
+        self.pending_ttl_seconds = pending_ttl_seconds
+        self.paths = tuple(paths)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if (
+            scope["type"] != "http"
+            or scope["method"] not in UNSAFE_METHODS
+            or not scope["path"].startswith(self.paths)
+        ):
+            await self.app(scope, receive, send)
+            return
+        headers = Headers(scope=scope)
+        idempotency_key = headers.get(HEADER)
+        if idempotency_key is None:
+            await self.app(scope, receive, send)
+            return
+        if not idempotency_key or len(idempotency_key) > MAX_KEY_LENGTH:
+            await _error(400, "Idempotency-Key inválida")(scope, receive, send)
+            return
+
+        body = await _read_body(receive)
+        key = hashlib.sha256(
+            "\0".join(
+                (
+                    scope["method"],
+                    scope["path"],
+                    headers.get("authorization", ""),
+                    idempotency_key,
+                )
+            ).encode()
+        ).hexdigest()
+        fingerprint = hashlib.sha256(body).hexdigest()
+
+        stored = await self.store.reserve(
+            key, {"fingerprint": fingerprint}, self.pending_ttl_seconds
+        )
+        if stored is not None:
+            if stored["fingerprint"] != fingerprint:
+                response = _error(422, "La Idempotency-Key ya se usó con otra petición")
+            elif "status" not in stored:
+                response = _error(
+                    409,
+                    "Hay una petición en curso con la misma Idempotency-Key",
+                    headers={"Retry-After": "1"},
+                )
+            else:
+                response = _replay(stored)
+            await response(scope, receive, send)
+            return
+
+        capture = _Capture(send)
+        try:
+            await self.app(scope, _replay_body(body, receive), capture)
+        except BaseException:
+            await self.store.release(key)
+            raise
+        if capture.status is not None and capture.status < 400:
+            await self.store.save(key, capture.record(fingerprint), self.ttl_seconds)
+        else:
+            await self.store.release(key)
+
+
+async def _read_body(receive: Receive) -> bytes:
+    chunks: List[bytes] = []
+    more_body = True
+    while more_body:
+        message = await receive()
+        if message["type"] != "http.request":
+            break
+        chunks.append(message.get("body", b""))
+        more_body = message.get("more_body", False)
+    return b"".join(chunks)
+
+
+def _replay_body(body: bytes, receive: Receive) -> Receive:
+    sent = False
+
+    async def replay() -> Message:
+        nonlocal sent
+        if sent:
+            return await receive()
+        sent = True
+        return {"type": "http.request", "body": body, "more_body": False}
+
+    return replay
+
+
+def _replay(record: Record) -> Response:
+    response = Response(
+        base64.b64decode(record["body"]),
+        status_code=record["status"],
+        headers=record["headers"],
+    )
+    response.headers[REPLAYED_HEADER] = "true"
+    return response
+
+
+class _Capture:
+    """Reenvía la respuesta al cliente y guarda una copia para reproducirla."""
+
+    def __init__(self, send: Send) -> None:
+        self.send = send
+        self.status: Optional[int] = None
+        self.headers: Dict[str, str] = {}
+        self.chunks: List[bytes] = []
+
+    async def __call__(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            self.status = message["status"]
+            headers = Headers(raw=message["headers"])
+            self.headers = {
+                name: headers[name] for name in REPLAYED_HEADERS if name in headers
+            }
+        elif message["type"] == "http.response.body":
+            self.chunks.append(message.get("body", b""))
+        await self.send(message)
+
+    def record(self, fingerprint: str) -> Record:
+        return {
+            "fingerprint": fingerprint,
+            "status": self.status,
+            "headers": self.headers,
+            "body": base64.b64encode(b"".join(self.chunks)).decode("ascii"),
+        }
@@ -1,7 +1,51 @@
+"""
+Limiter central de la aplicación (slowapi). Importarlo desde aquí evita
+imports circulares con app.main.
+
+- Almacén configurable (`RATE_LIMIT_STORAGE_URI`): `memory://` cuenta por
+  worker; con varios workers de uvicorn usar Redis (`redis://host:6379/0`) para
+  que los contadores sean compartidos. Si Redis no responde se cuenta en
+  memoria local (`in_memory_fallback_enabled`) en lugar de fallar el request.
+- Estrategia `moving-window` por defecto: sin el pico doble en el cambio de
+  ventana de `fixed-window`.
+- Clave por usuario autenticado (ver `rate_limit_key`), no por IP: detrás de un
+  proxy todos los clientes comparten IP.
+"""
+
+import hashlib
+
 from slowapi import Limiter
 from slowapi.util import get_remote_address
+from starlette.requests import Request
+
+from app.core.config import settings
+
+
+def rate_limit_key(request: Request) -> str:
+    """
+    Usuario verificado por `get_current_user`/`get_current_user_async` (los
+    límites de los endpoints se comprueban tras resolver las dependencias); si
+    no lo hay, hash del token y, sin token, IP del cliente.
+    """
+    user_id = getattr(request.state, "user_id", None)
+    if user_id:
+        return f"user:{user_id}"
+    auth = request.headers.get("authorization")
+    if auth:
+        return "tok:" + hashlib.sha256(auth.encode()).hexdigest()[:24]
+    return "ip:" + get_remote_address(request)
+
+
+def availability_limit() -> str:
+    # Se evalúa en cada request: permite ajustar el límite en caliente (tests)
+    return settings.AVAILABILITY_RATE_LIMIT
+
 
-# Central limiter instance used by the application. Import this from
-# other modules to avoid circular imports with app.main.
-# For production, set storage_uri to a Redis URL via environment or config.
-limiter = Limiter(key_func=get_remote_address)
+limiter = Limiter(
+    key_func=rate_limit_key,
+    storage_uri=settings.RATE_LIMIT_STORAGE_URI,
+    strategy=settings.RATE_LIMIT_STRATEGY,
+    in_memory_fallback_enabled=True,
+    key_prefix="fisiomove",
+    enabled=settings.RATE_LIMIT_ENABLED,
+)
@@ -1,4 +1,9 @@
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+
+import hmac
+
+from fastapi import Depends, FastAPI, HTTPException
+from fastapi.responses import ORJSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 
 # Rate limiting
@@ -10,22 +15,55 @@ from starlette.responses import JSONResponse
 
 from app.core.config import settings
 from app.routers.api_v1 import api_router
-from app.db.session import engine
-from app.db.base import Base
+from app.db.session import dispose_engines, get_pool_status
+from app.db.replica import ClientTrackingMiddleware, build_write_tracker
+from app.db.profiling import QueryProfilingMiddleware
+from app.metrics import HTTPMetricsMiddleware, metrics_response
+from app.compression import CompressionMiddleware
+from app.idempotency import IdempotencyMiddleware, build_store
+from app.services.auth import require_roles
+from supabase_utils.gotrue import aclose as close_gotrue_client
 import app.models  # noqa: F401 ensure models are imported
 
-app = FastAPI(title="FisioMove API", version="1.0.0")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # El esquema lo gestiona sólo Alembic (`alembic upgrade head` antes de
+    # arrancar): el arranque de cada worker no consulta la BD. Los clientes
+    # externos (Supabase, cliente HTTP async de GoTrue, engines async) se crean
+    # y las conexiones (BD, Redis) se abren en su primer uso.
+    yield
+    await dispose_engines()
+    await close_gotrue_client()
+
+
+app = FastAPI(
+    title="FisioMove API",
+    version="1.0.0",
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan,
+)
 
 # Limiter is configured in app.limiter to avoid circular imports and centralize
-# the storage configuration. For production, update the limiter to use
-# storage_uri="redis://..." (e.g. via environment variable).
+# the storage configuration (RATE_LIMIT_STORAGE_URI, e.g. redis://...).
 app.state.limiter = limiter
 app.add_exception_handler(429, _rate_limit_exceeded_handler)
 app.add_middleware(SlowAPIMiddleware)
-try:
-    Base.metadata.create_all(bind=engine)
-except Exception:
-    pass
+
+# Reintentos con la misma Idempotency-Key reciben la respuesta ya guardada.
+# Se registra antes que CORS para quedar dentro: las respuestas que contesta
+# el propio middleware (replay, 409, 422) también llevan las cabeceras CORS
+if settings.IDEMPOTENCY_ENABLED:
+    app.add_middleware(
+        IdempotencyMiddleware,
+        store=build_store(
+            settings.IDEMPOTENCY_STORAGE_URI,
+            max_entries=settings.IDEMPOTENCY_MAX_ENTRIES,
+        ),
+        ttl_seconds=settings.IDEMPOTENCY_TTL_SECONDS,
+        pending_ttl_seconds=settings.IDEMPOTENCY_PENDING_TTL_SECONDS,
+        paths=(f"{settings.API_V1_STR}/appointments",),
+    )
 
 app.add_middleware(
     CORSMiddleware,
@@ -36,9 +74,63 @@ app.add_middleware(
     expose_headers=["*"],
 )
 
+# Identifica al cliente de cada request para el enrutado read-after-write a réplica
+if settings.DATABASE_READ_URL:
+    app.add_middleware(
+        ClientTrackingMiddleware,
+        tracker=build_write_tracker(
+            settings.READ_AFTER_WRITE_STORAGE_URI, settings.READ_AFTER_WRITE_SECONDS
+        ),
+    )
+# Nº de consultas y tiempo de BD por request (Server-Timing + log estructurado)
+if settings.QUERY_PROFILING_ENABLED:
+    app.add_middleware(
+        QueryProfilingMiddleware,
+        top_n=settings.QUERY_PROFILING_TOP_N,
+        slow_query_ms=settings.SLOW_QUERY_MS,
+        query_budget=settings.QUERY_BUDGET,
+    )
+if settings.METRICS_ENABLED:
+    app.add_middleware(HTTPMetricsMiddleware)
+# La más externa: comprime la respuesta final con todas sus cabeceras
+if settings.COMPRESSION_ENABLED:
+    app.add_middleware(
+        CompressionMiddleware,
+        minimum_size=settings.COMPRESSION_MINIMUM_SIZE,
+        gzip_level=settings.COMPRESSION_GZIP_LEVEL,
+        brotli_quality=settings.COMPRESSION_BROTLI_QUALITY,
+        flush_streaming=settings.COMPRESSION_STREAMING_FLUSH,
+    )
+
 app.include_router(api_router, prefix=settings.API_V1_STR)
 
 
 @app.get("/health", tags=["health"])
 async def healthcheck():
     return {"status": "ok"}
+
+
+@app.get(
+    "/health/db-pool",
+    tags=["health"],
+    dependencies=[Depends(require_roles("admin"))],
+)
+def db_pool_status():
+    """Estado interno del pool (conexiones, overflow, esperas): sólo admins"""
+    return get_pool_status()
+
+
+if settings.METRICS_ENABLED:
+
+    @app.get("/metrics", include_in_schema=False)
+    def metrics(request: Request):
+        """Métricas en formato de texto Prometheus"""
+        # Con METRICS_TOKEN el scraper debe enviar `Authorization: Bearer <token>`
+        if settings.METRICS_TOKEN and not hmac.compare_digest(
+            request.headers.get("authorization", ""),
+            f"Bearer {settings.METRICS_TOKEN}",
+        ):
+            raise HTTPException(
+                status_code=401, detail={"message": "Token de métricas inválido"}
+            )
+        return metrics_response()
@@ -0,0 +1,163 @@
+"""
+Métricas Prometheus de la API.
+
+Todas las métricas viven en `registry` (no en el registro global de
+prometheus_client), así los tests pueden leerlas sin interferencias.
+Con varios workers de uvicorn cada proceso expone sus propios valores.
+"""
+
+from __future__ import annotations
+
+import time
+from contextlib import contextmanager
+from typing import Iterator
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+)
+from prometheus_client.core import GaugeMetricFamily
+from starlette.responses import Response
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+registry = CollectorRegistry(auto_describe=True)
+
+HTTP_REQUEST_DURATION = Histogram(
+    "fisiomove_http_request_duration_seconds",
+    "Latencia de las requests HTTP por ruta",
+    ["method", "route", "status"],
+    registry=registry,
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0),
+)
+HTTP_REQUESTS_IN_PROGRESS = Gauge(
+    "fisiomove_http_requests_in_progress",
+    "Requests HTTP en curso",
+    ["method"],
+    registry=registry,
+)
+GOTRUE_REQUEST_DURATION = Histogram(
+    "fisiomove_gotrue_request_duration_seconds",
+    "Latencia de las llamadas a GoTrue (Supabase Auth)",
+    ["operation"],
+    registry=registry,
+    buckets=(0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 15.0),
+)
+GOTRUE_ERRORS = Counter(
+    "fisiomove_gotrue_errors_total",
+    "Llamadas a GoTrue con error (HTTP >= 400 o fallo de red)",
+    ["operation", "status"],
+    registry=registry,
+)
+NOTIFICATION_FANOUT = Histogram(
+    "fisiomove_notification_fanout_size",
+    "Destinatarios por evento de notificación",
+    ["type"],
+    registry=registry,
+    buckets=(1, 2, 5, 10, 25, 50, 100, 250),
+)
+CACHE_REQUESTS = Counter(
+    "fisiomove_cache_requests_total",
+    "Consultas a cachés internas por resultado (hit/miss)",
+    ["cache", "result"],
+    registry=registry,
+)
+
+
+class _DBPoolCollector:
+    """Lee el estado del pool en cada scrape (sin coste entre scrapes)."""
+
+    _FIELDS = {
+        "checked_out": "Conexiones en uso",
+        "checked_in": "Conexiones libres en el pool",
+        "overflow": "Conexiones de overflow abiertas",
+        "checkouts": "Checkouts acumulados",
+        "checkout_timeouts": "Checkouts que agotaron pool_timeout",
+        "checkout_wait_total_ms": "Tiempo total de espera en checkout (ms)",
+        "pre_pings": "Pre-pings acumulados",
+        "pre_ping_total_ms": "Tiempo total de pre-ping (ms)",
+    }
+
+    def collect(self):
+        from app.db.session import get_pool_status
+
+        status = get_pool_status()
+        for name, doc in self._FIELDS.items():
+            if name in status:
+                yield GaugeMetricFamily(
+                    f"fisiomove_db_pool_{name}", doc, value=float(status[name])
+                )
+
+    def describe(self):
+        return []
+
+
+registry.register(_DBPoolCollector())
+
+
+def record_cache(cache: str, hit: bool) -> None:
+    CACHE_REQUESTS.labels(cache=cache, result="hit" if hit else "miss").inc()
+
+
+def record_notification_fanout(notification_type: str, recipients: int) -> None:
+    NOTIFICATION_FANOUT.labels(type=notification_type).observe(recipients)
+
+
+@contextmanager
+def track_gotrue(operation: str) -> Iterator[dict]:
+    """Mide una llamada a GoTrue; el llamador deja el status HTTP en `call["status"]`."""
+    call: dict = {"status": None}
+    start = time.perf_counter()
+    try:
+        yield call
+    except Exception:
+        GOTRUE_ERRORS.labels(operation=operation, status="network").inc()
+        raise
+    finally:
+        GOTRUE_REQUEST_DURATION.labels(operation=operation).observe(
+            time.perf_counter() - start
+        )
+    status = call["status"]
+    if status is not None and status >= 400:
+        GOTRUE_ERRORS.labels(operation=operation, status=str(status)).inc()
+
+
+class HTTPMetricsMiddleware:
+    """Middleware ASGI: latencia por plantilla de ruta y requests en curso."""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        method = scope["method"]
+        in_progress = HTTP_REQUESTS_IN_PROGRESS.labels(method=method)
+        in_progress.inc()
+        start = time.perf_counter()
+        status = 500
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            in_progress.dec()
+            # El router deja la ruta en el scope. Plantilla
+            # (/appointments/{cita_id}) para no explotar la cardinalidad
+            path = getattr(scope.get("route"), "path", None) or "unmatched"
+            HTTP_REQUEST_DURATION.labels(
+                method=method, route=path, status=str(status)
+            ).observe(time.perf_counter() - start)
+
+
+def metrics_response() -> Response:
+    return Response(generate_latest(registry), media_type=CONTENT_TYPE_LATEST)
@@ -1,3 +1,8 @@
 from .user import User, UserRole
-from .appointment import Appointment, AppointmentStatus
+from .appointment import Appointment, AppointmentStatus, AppointmentTombstone
 from .patient import Patient
+from .notification import Notification
+from .historial import Historial, TerapiaHistorial
+from .terapia import Terapia
+from .working_hours import WorkingHours, ScheduleException
+from .waitlist import WaitlistEntry, WaitlistStatus
@@ -1,15 +1,19 @@
 from __future__ import annotations
 
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 from enum import Enum
 
-from sqlalchemy import Column, DateTime, Enum as SAEnum, Integer, String, Index
+from sqlalchemy import Column, DateTime, Enum as SAEnum, Integer, String, Index, event
 from sqlalchemy.orm import relationship
-from sqlalchemy.sql import func
+from sqlalchemy.sql import func, text
 
 from app.db.base import Base
 
 
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
 class AppointmentStatus(str, Enum):
     programada = "programada"
     confirmada = "confirmada"
@@ -34,6 +38,10 @@ class Appointment(Base):
     id = Column(Integer, primary_key=True, index=True)
     start_time = Column(DateTime(timezone=True), nullable=False, index=True)
     duration_minutes = Column(Integer, nullable=False)
+    # start_time + duration_minutes, persistido para poder filtrar solapes en
+    # SQL. Se mantiene al escribir (ver `_sync_end_time`; en Postgres también
+    # por trigger) y lo usa la restricción EXCLUDE de la migración 9d41c7e2b8a6.
+    end_time = Column(DateTime(timezone=True), nullable=False)
 
     patient_id = Column(String(64), nullable=False, index=True)
     fisio_id = Column(
@@ -55,18 +63,68 @@ class Appointment(Base):
     created_at = Column(
         DateTime(timezone=True), server_default=func.now(), nullable=False
     )
+    # Fijado desde Python (con microsegundos, igual en Postgres y SQLite): es
+    # la clave del cursor de GET /appointments/changes
     updated_at = Column(
         DateTime(timezone=True),
         server_default=func.now(),
-        onupdate=func.now(),
+        default=_utcnow,
+        onupdate=_utcnow,
         nullable=False,
     )
 
     __table_args__ = (
         Index("ix_appointments_fisio_start", "fisio_id", "start_time"),
         Index("ix_appointments_patient_start", "patient_id", "start_time"),
+        # Sincronización incremental: recorrido por (updated_at, id)
+        Index("ix_appointments_updated_id", "updated_at", "id"),
+        # Comprobaciones de solape (EXISTS) resueltas sólo con el índice; parciales
+        # porque las citas canceladas nunca bloquean una franja
+        Index(
+            "ix_appointments_fisio_span",
+            "fisio_id",
+            "start_time",
+            "end_time",
+            postgresql_where=text("status <> 'cancelada'"),
+            sqlite_where=text("status <> 'cancelada'"),
+        ),
+        Index(
+            "ix_appointments_patient_span",
+            "patient_id",
+            "start_time",
+            "end_time",
+            postgresql_where=text("status <> 'cancelada'"),
+            sqlite_where=text("status <> 'cancelada'"),
+        ),
+        Index(
+            "ix_appointments_active_span",
+            "start_time",
+            "end_time",
+            postgresql_where=text("status <> 'cancelada'"),
+            sqlite_where=text("status <> 'cancelada'"),
+        ),
     )
 
-    @property
-    def end_time(self) -> datetime:
-        return self.start_time + timedelta(minutes=self.duration_minutes)
+
+@event.listens_for(Appointment, "before_insert")
+@event.listens_for(Appointment, "before_update")
+def _sync_end_time(mapper, connection, target: Appointment) -> None:
+    if target.start_time is not None and target.duration_minutes is not None:
+        target.end_time = target.start_time + timedelta(minutes=target.duration_minutes)
+
+
+class AppointmentTombstone(Base):
+    """Registro de una cita eliminada, para la sincronización incremental."""
+
+    __tablename__ = "appointment_tombstones"
+
+    # Secuencia creciente: sirve de cursor para las eliminaciones
+    id = Column(Integer, primary_key=True)
+    appointment_id = Column(Integer, nullable=False)
+    deleted_at = Column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+        default=_utcnow,
+        nullable=False,
+        index=True,
+    )
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Date, ForeignKey
+from sqlalchemy import Column, Integer, String, Date, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from app.db.base import Base
 
@@ -10,11 +10,15 @@ class Historial(Base):
     diagnostico = Column(String, nullable=False)
     notas = Column(String, nullable=True)
     fecha = Column(Date, nullable=False)
-    paciente_id = Column(Integer, ForeignKey("patients.id"), nullable=False)
+    paciente_id = Column(
+        Integer, ForeignKey("patients.id"), nullable=False, index=True
+    )
 
     paciente = relationship("Patient", back_populates="historiales")
     terapias = relationship("TerapiaHistorial", back_populates="historial")
 
+    __table_args__ = (Index("ix_historiales_paciente_fecha", "paciente_id", "fecha"),)
+
 
 class TerapiaHistorial(Base):
     __tablename__ = "terapias_historial"
@@ -23,6 +27,8 @@ class TerapiaHistorial(Base):
     tipo = Column(String, nullable=False)
     observaciones = Column(String, nullable=True)
     duracion = Column(Integer, nullable=False)
-    historial_id = Column(Integer, ForeignKey("historiales.id"), nullable=False)
+    historial_id = Column(
+        Integer, ForeignKey("historiales.id"), nullable=False, index=True
+    )
 
     historial = relationship("Historial", back_populates="terapias")
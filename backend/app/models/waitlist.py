@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+from datetime import timedelta
+from enum import Enum
+
+from sqlalchemy import (
+    Column,
+    DateTime,
+    Enum as SAEnum,
+    Index,
+    Integer,
+    String,
+    event,
+)
+from sqlalchemy.sql import func, text
+
+from app.db.base import Base
+from app.models.appointment import AppointmentType
+
+
+class WaitlistStatus(str, Enum):
+    en_espera = "en_espera"
+    asignada = "asignada"
+    cancelada = "cancelada"
+    # Su ventana pasó sin que se liberase un hueco (ver `expire_waitlist`)
+    caducada = "caducada"
+
+
+class WaitlistEntry(Base):
+    """
+    Paciente en lista de espera: acepta cualquier hueco de `duration_minutes`
+    que empiece dentro de [window_start, window_end - duración] (con
+    `fisio_id`, solo de ese fisio). Al liberarse una franja se le reserva
+    (ver `app.services.waitlist.backfill_slot`).
+    """
+
+    __tablename__ = "waitlist_entries"
+
+    id = Column(Integer, primary_key=True, index=True)
+    patient_id = Column(String(64), nullable=False, index=True)
+    fisio_id = Column(String(64), nullable=True)
+    window_start = Column(DateTime(timezone=True), nullable=False)
+    window_end = Column(DateTime(timezone=True), nullable=False)
+    duration_minutes = Column(Integer, nullable=False)
+    # window_end - duration_minutes: último inicio que cabe en la ventana.
+    # Persistido para que el matcher filtre y ordene en SQL (ver
+    # `_sync_latest_start`).
+    latest_start = Column(DateTime(timezone=True), nullable=False)
+    appointment_type = Column(
+        SAEnum(AppointmentType, name="appointment_type", create_type=False),
+        nullable=False,
+        default=AppointmentType.consulta,
+    )
+    status = Column(
+        SAEnum(WaitlistStatus, name="waitlist_status"),
+        nullable=False,
+        default=WaitlistStatus.en_espera,
+    )
+    # Cita reservada desde la lista de espera
+    appointment_id = Column(Integer, nullable=True)
+
+    created_at = Column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False
+    )
+
+    __table_args__ = (
+        # Búsqueda del matcher: solo entradas en espera, por ventana
+        Index(
+            "ix_waitlist_waiting_window",
+            "window_start",
+            "latest_start",
+            postgresql_where=text("status = 'en_espera'"),
+            sqlite_where=text("status = 'en_espera'"),
+        ),
+    )
+
+
+@event.listens_for(WaitlistEntry, "before_insert")
+@event.listens_for(WaitlistEntry, "before_update")
+def _sync_latest_start(mapper, connection, target: WaitlistEntry) -> None:
+    if target.window_end is not None and target.duration_minutes is not None:
+        target.latest_start = target.window_end - timedelta(
+            minutes=target.duration_minutes
+        )
@@ -0,0 +1,46 @@
+from __future__ import annotations
+
+from sqlalchemy import Boolean, Column, Date, Index, Integer, String, Time
+
+from app.db.base import Base
+
+
+class WorkingHours(Base):
+    """
+    Franja semanal de atención en hora local de la clínica.
+
+    `fisio_id` NULL es el horario de apertura de la clínica. Varias franjas el
+    mismo día modelan los descansos (08:00-12:00 y 14:00-18:00).
+    """
+
+    __tablename__ = "working_hours"
+
+    id = Column(Integer, primary_key=True, index=True)
+    fisio_id = Column(String(64), nullable=True)
+    weekday = Column(Integer, nullable=False)  # 0 = lunes ... 6 = domingo
+    start_time = Column(Time, nullable=False)
+    end_time = Column(Time, nullable=False)
+
+    __table_args__ = (Index("ix_working_hours_fisio_weekday", "fisio_id", "weekday"),)
+
+
+class ScheduleException(Base):
+    """
+    Excepción puntual al horario semanal (festivos, vacaciones, aperturas extra).
+
+    Sin `start_time`/`end_time` afecta al día completo. `is_open=False` cierra
+    la franja (gana sobre cualquier apertura); `is_open=True` la abre aunque no
+    esté en el horario semanal. `fisio_id` NULL aplica a toda la clínica.
+    """
+
+    __tablename__ = "schedule_exceptions"
+
+    id = Column(Integer, primary_key=True, index=True)
+    fisio_id = Column(String(64), nullable=True)
+    date = Column(Date, nullable=False)
+    start_time = Column(Time, nullable=True)
+    end_time = Column(Time, nullable=True)
+    is_open = Column(Boolean, nullable=False, default=False)
+    reason = Column(String(255), nullable=True)
+
+    __table_args__ = (Index("ix_schedule_exceptions_date_fisio", "date", "fisio_id"),)
@@ -6,6 +6,8 @@ from app.api.v1.endpoints import patients
 from app.api.v1.endpoints import historiales
 from app.api.v1.endpoints.notifications import router as notifications_router
 from app.api.v1.endpoints import dashboard
+from app.api.v1.endpoints import schedules
+from app.api.v1.endpoints import waitlist
 
 
 api_router = APIRouter()
@@ -20,3 +22,5 @@ api_router.include_router(
     notifications_router, prefix="/notifications", tags=["notificaciones"]
 )
 api_router.include_router(dashboard.router, prefix="/dashboard", tags=["Dashboard"])
+api_router.include_router(schedules.router, prefix="/schedules", tags=["horarios"])
+api_router.include_router(waitlist.router, prefix="/waitlist", tags=["lista de espera"])
@@ -1,6 +1,9 @@
 from .historiales import (
     HistorialCreate,
     HistorialResponse,
+    PacienteHistorialResponse,
     TerapiaCreate,
     TerapiaResponse,
+    TimelineEntry,
+    TimelinePage,
 )
@@ -49,6 +49,19 @@ class AppointmentCreate(AppointmentBase):
     fisio_id: Optional[str] = Field(default=None)
 
 
+class RecurrenceRule(BaseModel):
+    """Regla de recurrencia para planes de terapia (ej: 10 sesiones semanales)"""
+
+    frequency: Literal["daily", "weekly"] = Field(default="weekly")
+    interval: int = Field(default=1, ge=1, le=12)
+    count: int = Field(ge=1, le=52)
+
+
+class AppointmentSeriesCreate(AppointmentBase):
+    fisio_id: Optional[str] = Field(default=None)
+    recurrence: RecurrenceRule
+
+
 class AppointmentUpdate(BaseModel):
     start_time: Optional[datetime] = None
     duration_minutes: Optional[int] = Field(default=None, ge=1, le=24 * 60)
@@ -74,3 +87,30 @@ class AppointmentRead(BaseModel):
     fisio: Optional[FisioInfo] = None
 
     model_config = ConfigDict(from_attributes=True)
+
+
+class AppointmentChanges(BaseModel):
+    """Cambios de citas desde un cursor (`GET /appointments/changes`)."""
+
+    # Citas creadas o modificadas, en orden de `updated_at`
+    changes: list[AppointmentRead]
+    # IDs de citas eliminadas; aplicarlas antes que `changes`
+    deleted: list[int]
+    # Cursor para la siguiente llamada
+    cursor: str
+    # True si quedan cambios: repetir con el nuevo cursor
+    has_more: bool
+
+
+class FisioAssignment(BaseModel):
+    appointment_id: int
+    fisio_id: str
+
+
+class AssignmentResult(BaseModel):
+    """Resultado de `POST /appointments/assign-pending`."""
+
+    assigned: list[FisioAssignment]
+    # Pendientes sin ningún fisio libre en su horario
+    unassigned: list[int]
+    dry_run: bool
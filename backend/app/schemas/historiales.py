@@ -1,6 +1,6 @@
 from pydantic import BaseModel
-from datetime import date
-from typing import List, Optional
+from datetime import date, datetime
+from typing import Any, Dict, List, Literal, Optional
 
 
 class TerapiaBase(BaseModel):
@@ -36,3 +36,25 @@ class HistorialResponse(HistorialBase):
 
     class Config:
         orm_mode = True
+
+
+class PacienteHistorialResponse(BaseModel):
+    id: int
+    full_name: Optional[str] = None
+    historiales: List[HistorialResponse] = []
+
+    class Config:
+        from_attributes = True
+
+
+class TimelineEntry(BaseModel):
+    kind: Literal["historial", "terapia", "cita"]
+    id: int
+    timestamp: datetime
+    descripcion: str
+    detalle: Dict[str, Any] = {}
+
+
+class TimelinePage(BaseModel):
+    items: List[TimelineEntry]
+    next_cursor: Optional[str] = None
@@ -1,6 +1,6 @@
 from datetime import datetime
 from enum import Enum
-from pydantic import BaseModel
+from pydantic import AliasChoices, BaseModel, ConfigDict, Field
 
 
 class NotificationType(str, Enum):
@@ -28,9 +28,13 @@ class NotificationUpdate(BaseModel):
 
 
 class NotificationRead(NotificationBase):
+    model_config = ConfigDict(from_attributes=True)
+
     id: int
     is_read: bool
-    date: datetime
-
-    class Config:
-        orm_mode = True
+    # El modelo usa created_at / related_appointment_id
+    date: datetime = Field(validation_alias=AliasChoices("date", "created_at"))
+    related_cita_id: int | None = Field(
+        default=None,
+        validation_alias=AliasChoices("related_cita_id", "related_appointment_id"),
+    )
@@ -0,0 +1,75 @@
+from __future__ import annotations
+from datetime import date, datetime, time
+from typing import Optional
+from pydantic import BaseModel, ConfigDict, Field, model_validator
+
+
+def _check_span(start: Optional[time], end: Optional[time]) -> None:
+    # end 00:00 = medianoche final del día
+    if start is not None and end is not None and end != time(0) and end <= start:
+        raise ValueError("end_time debe ser posterior a start_time")
+
+
+class WorkingHoursSlot(BaseModel):
+    """Franja semanal en hora local de la clínica (0 = lunes)"""
+
+    weekday: int = Field(ge=0, le=6)
+    start_time: time
+    end_time: time
+
+    @model_validator(mode="after")
+    def _valid_span(self):
+        _check_span(self.start_time, self.end_time)
+        return self
+
+
+class WorkingHoursRead(WorkingHoursSlot):
+    id: int
+    fisio_id: Optional[str] = None
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class WorkingHoursReplace(BaseModel):
+    """Horario semanal completo; `fisio_id` nulo es el de la clínica"""
+
+    fisio_id: Optional[str] = Field(default=None, min_length=1)
+    slots: list[WorkingHoursSlot]
+
+
+class ScheduleExceptionCreate(BaseModel):
+    """Festivo, cierre o apertura puntual; sin horas afecta al día completo"""
+
+    fisio_id: Optional[str] = Field(default=None, min_length=1)
+    date: date
+    start_time: Optional[time] = None
+    end_time: Optional[time] = None
+    is_open: bool = False
+    reason: Optional[str] = Field(default=None, max_length=255)
+
+    @model_validator(mode="after")
+    def _valid_span(self):
+        if (self.start_time is None) != (self.end_time is None):
+            raise ValueError("start_time y end_time van juntos")
+        _check_span(self.start_time, self.end_time)
+        return self
+
+
+class ScheduleExceptionRead(ScheduleExceptionCreate):
+    id: int
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class TimeInterval(BaseModel):
+    start: datetime
+    end: datetime
+
+
+class CalendarDay(BaseModel):
+    """Horario abierto, tramos libres e inicios de franja de un día"""
+
+    date: date
+    open: list[TimeInterval]
+    free: list[TimeInterval]
+    slots: list[datetime]
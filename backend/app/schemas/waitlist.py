@@ -0,0 +1,35 @@
+from __future__ import annotations
+from datetime import datetime
+from typing import Literal, Optional
+from pydantic import BaseModel, ConfigDict, Field
+
+from app.schemas.appointments import AppointmentTypeEnum
+
+WaitlistStatusEnum = Literal["en_espera", "asignada", "cancelada", "caducada"]
+
+
+class WaitlistCreate(BaseModel):
+    """Ventana en la que el paciente aceptaría una cita liberada"""
+
+    patient_id: str = Field(min_length=1)
+    fisio_id: Optional[str] = Field(default=None, min_length=1)
+    window_start: datetime
+    window_end: datetime
+    duration_minutes: int = Field(ge=1, le=24 * 60)
+    appointment_type: AppointmentTypeEnum = Field(default="consulta")
+
+
+class WaitlistRead(BaseModel):
+    id: int
+    patient_id: str
+    fisio_id: Optional[str] = None
+    window_start: datetime
+    window_end: datetime
+    duration_minutes: int
+    appointment_type: str
+    status: str
+    # Cita reservada cuando status == "asignada"
+    appointment_id: Optional[int] = None
+    created_at: datetime
+
+    model_config = ConfigDict(from_attributes=True)
@@ -1,22 +1,42 @@
 from __future__ import annotations
-from datetime import datetime, timedelta, timezone
+import base64
+from datetime import date, datetime, time, timedelta, timezone
 import logging
 from typing import List, Optional
 
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from sqlalchemy import or_
+from sqlalchemy import and_, func, or_, select
+from sqlalchemy.exc import IntegrityError
 
+from app.core.config import settings
+from app.core.etag import version_columns
+from app.models.patient import Patient
 from app.models.user import User
-from app.models.appointment import Appointment, AppointmentStatus, AppointmentType
+from app.models.appointment import (
+    Appointment,
+    AppointmentStatus,
+    AppointmentTombstone,
+    AppointmentType,
+)
 from app.services.notifications import (
     create_notification,
     notify_cita_asignada,
     notify_cita_pendiente_asignacion,
     notify_cita_modificada,
     notify_cita_cancelada,
+    notify_serie_asignada,
+    notify_serie_pendiente_asignacion,
+)
+from app.services.users import get_users_by_ids, get_users_by_ids_async
+from app.services.patients import get_patients_by_ids, get_patients_by_ids_async
+from app.services.scheduling import (
+    free_starts,
+    intersect_intervals,
+    slot_starts,
+    subtract_intervals,
 )
-from app.services.users import get_users_by_ids
-from app.services.patients import get_patients_by_ids
+from app.services.working_hours import clinic_tz, local_span, open_calendar_async
 from app.schemas.notifications import NotificationCreate
 from app.schemas.appointments import AppointmentRead, PatientInfo, FisioInfo
 
@@ -37,30 +57,36 @@ def has_overlap(ap: Appointment, start_n: datetime, end_n: datetime) -> bool:
     return start_n < ap_end and end_n > ap_start
 
 
-def _check_query_conflicts(
-    query,
-    start_n: datetime,
-    end_n: datetime,
-    logger: logging.Logger,
-    message_prefix: str,
-    exclude_id: Optional[int] = None,
-) -> bool:
-    """Iterate `query` (SQLAlchemy query or iterable) and return True when a conflicting appointment is found.
+# Límite superior de `duration_minutes` (ver AppointmentCreate): acota por abajo
+# el rango de start_time en las consultas de solape
+MAX_DURATION = timedelta(minutes=24 * 60)
+
+
+def _overlap_criteria(
+    start_n: datetime, end_n: datetime, exclude_id: Optional[int] = None
+) -> list:
+    """Citas activas que se solapan con [start_n, end_n) (naive UTC).
 
-    Logs a debug message with `message_prefix` when a conflict is detected.
+    `start_time` queda en un rango acotado y `end_time` se filtra desde el mismo
+    índice (fisio_id|patient_id, start_time, end_time), sin cargar filas.
     """
+    criteria = [
+        Appointment.start_time > start_n - MAX_DURATION,
+        Appointment.start_time < end_n,
+        Appointment.end_time > start_n,
+        Appointment.status != AppointmentStatus.cancelada,
+    ]
     if exclude_id is not None:
-        query = query.filter(Appointment.id != exclude_id)
-
-    for ap in query:
-        if getattr(ap, "status", None) == AppointmentStatus.cancelada:
-            continue
-        if has_overlap(ap, start_n, end_n):
-            logger.debug(
-                f"{message_prefix} id={ap.id} start={ap.start_time.isoformat()} duration={ap.duration_minutes}"
-            )
-            return True
-    return False
+        criteria.append(Appointment.id != exclude_id)
+    return criteria
+
+
+def _overlap_exists(
+    start: datetime, end: datetime, *criteria, exclude_id: Optional[int] = None
+):
+    """`SELECT EXISTS(...)` de una cita activa que se solape con [start, end)."""
+    overlap = _overlap_criteria(_naive_utc(start), _naive_utc(end), exclude_id)
+    return select(select(Appointment.id).where(*overlap, *criteria).exists())
 
 
 def is_time_slot_available(
@@ -74,42 +100,19 @@ def is_time_slot_available(
 ) -> bool:
     """Verifica si el horario está disponible para el paciente y el fisioterapeuta (si aplica).
     No debe haber citas que se solapen para el paciente ni para el fisio.
-    """
-    start_n = _naive_utc(start_time)
-    end_n = start_n + timedelta(minutes=duration_minutes)
-
-    logger = logging.getLogger(__name__)
-    logger.debug(
-        f"Checking availability start_time={start_time.isoformat() if hasattr(start_time, 'isoformat') else str(start_time)} duration_minutes={duration_minutes} patient_id={patient_id} fisio_id={fisio_id}"
-    )
 
-    checks = []
-
-    # paciente
-    checks.append(
-        (
-            db.query(Appointment).filter(Appointment.patient_id == patient_id),
-            "Conflicto con cita del paciente",
-        )
-    )
-
-    # global
-    checks.append((db.query(Appointment), "Conflicto global detectado"))
-
-    # fisio (opcional)
-    if fisio_id:
-        checks.append(
-            (
-                db.query(Appointment).filter(Appointment.fisio_id == fisio_id),
-                "Conflicto con cita del fisio",
-            )
+    La comprobación es global (cualquier cita activa ocupa la franja), lo que ya
+    cubre las de paciente y fisio: un único EXISTS.
+    """
+    end_time = start_time + timedelta(minutes=duration_minutes)
+    taken = db.scalar(_overlap_exists(start_time, end_time, exclude_id=exclude_id))
+    if taken:
+        logging.getLogger(__name__).debug(
+            f"Conflicto detectado start_time={start_time.isoformat()} "
+            f"duration_minutes={duration_minutes} patient_id={patient_id} "
+            f"fisio_id={fisio_id}"
         )
-
-    for query, msg in checks:
-        if _check_query_conflicts(query, start_n, end_n, logger, msg, exclude_id):
-            return False
-
-    return True
+    return not taken
 
 
 def _naive_utc(dt: datetime) -> datetime:
@@ -143,28 +146,59 @@ def has_conflict(
     end: datetime,
     exclude_id: Optional[int] = None,
 ) -> bool:
-    # Ensure consistent timezone handling by normalizing to naive UTC
-    start_n = _naive_utc(start)
-    end_n = _naive_utc(end)
-
-    day_start = start_n.replace(hour=0, minute=0, second=0, microsecond=0) - timedelta(
-        days=1
+    """True si el fisio tiene otra cita activa que se solapa con [start, end)."""
+    stmt = _overlap_exists(
+        start, end, Appointment.fisio_id == fisio_id, exclude_id=exclude_id
     )
-    day_end = day_start + timedelta(days=3)
-    q = (
-        db.query(Appointment)
-        .filter(Appointment.fisio_id == fisio_id)
-        .filter(Appointment.start_time >= day_start, Appointment.start_time < day_end)
+    return bool(db.scalar(stmt))
+
+
+OVERLAP_CONSTRAINT = "appointments_fisio_no_overlap"
+CONFLICT_MESSAGE = "Conflicto de horario con otra cita"
+
+
+def _is_overlap_violation(exc: IntegrityError) -> bool:
+    """True si el error viene de la restricción EXCLUDE de solapes (23P01)."""
+    orig = exc.orig
+    code = getattr(orig, "pgcode", None) or getattr(orig, "sqlstate", None)
+    return code == "23P01" or OVERLAP_CONSTRAINT in str(orig)
+
+
+def overlap_constraint_enforced(db: Session) -> bool:
+    """
+    True si la BD rechaza por sí misma los solapes por fisio: requiere el flag
+    APPOINTMENT_OVERLAP_CONSTRAINT y Postgres (en SQLite no existe EXCLUDE y
+    la comprobación en Python sigue siendo la única protección).
+    """
+    return (
+        settings.APPOINTMENT_OVERLAP_CONSTRAINT
+        and db.get_bind().dialect.name == "postgresql"
     )
-    if exclude_id is not None:
-        q = q.filter(Appointment.id != exclude_id)
-    candidates = q.all()
-    for ap in candidates:
-        ap_start = _naive_utc(ap.start_time)
-        ap_end = ap_start + timedelta(minutes=ap.duration_minutes)
-        if start_n < ap_end and end_n > ap_start:
-            return True
-    return False
+
+
+def _commit_checked(db: Session) -> None:
+    """Commit que traduce la violación de la restricción de solapes a ValueError."""
+    try:
+        db.commit()
+    except IntegrityError as e:
+        db.rollback()
+        if _is_overlap_violation(e):
+            raise ValueError(CONFLICT_MESSAGE) from e
+        raise
+
+
+def _auto_assign(db: Session, ap: Appointment) -> bool:
+    """Intenta asignar fisio a una cita recién creada; True si lo consigue."""
+    # Import diferido: app.services.assignment depende de este módulo
+    from app.services.assignment import assign_pending_appointments
+
+    try:
+        result = assign_pending_appointments(db, appointment_ids=[ap.id])
+    except ValueError:
+        # Otro proceso ocupó el hueco: queda pendiente como antes
+        return False
+    db.refresh(ap)
+    return bool(result["assigned"])
 
 
 def create_appointment(
@@ -176,11 +210,12 @@ def create_appointment(
     fisio_id: Optional[str] = None,
     appointment_type: AppointmentType = AppointmentType.consulta,
 ) -> Appointment:
-    # Solo verificar conflictos si hay un fisioterapeuta asignado
-    if fisio_id:
+    # Solo verificar conflictos si hay un fisioterapeuta asignado; con la
+    # restricción EXCLUDE los rechaza la BD al insertar
+    if fisio_id and not overlap_constraint_enforced(db):
         end_time = start_time + timedelta(minutes=duration_minutes)
         if has_conflict(db, fisio_id=fisio_id, start=start_time, end=end_time):
-            raise ValueError("Conflicto de horario con otra cita")
+            raise ValueError(CONFLICT_MESSAGE)
 
     ap = Appointment(
         start_time=start_time,
@@ -191,7 +226,7 @@ def create_appointment(
         status=AppointmentStatus.programada,
     )
     db.add(ap)
-    db.commit()
+    _commit_checked(db)
     db.refresh(ap)
 
     if fisio_id:
@@ -224,6 +259,8 @@ def create_appointment(
             fisio_int if fisio_int is not None else 0,
         )
     else:
+        if settings.AUTO_ASSIGN_FISIO and _auto_assign(db, ap):
+            return ap
         # Notificar cita pendiente de asignación (paciente, admins y fisios)
         admins = db.query(User).filter(User.role == "admin").all()
         fisios = db.query(User).filter(User.role == "fisioterapeuta").all()
@@ -234,24 +271,190 @@ def create_appointment(
     return ap
 
 
-def _build_appointments_query(
-    db: Session, date: Optional[datetime] = None, user_id: Optional[str] = None
+def expand_recurrence(
+    start_time: datetime, *, frequency: str, interval: int, count: int
+) -> List[datetime]:
+    """Expande una regla de recurrencia (diaria/semanal) en las fechas de inicio de la serie."""
+    step = timedelta(days=interval * (7 if frequency == "weekly" else 1))
+    return [start_time + step * i for i in range(count)]
+
+
+def _load_busy_intervals(
+    db: Session, *, window_start: datetime, window_end: datetime
+) -> List[tuple[datetime, datetime]]:
+    """Carga en una sola consulta los intervalos ocupados (naive UTC) de la ventana.
+
+    Igual que `is_time_slot_available`, cualquier cita activa cuenta como ocupada
+    (conflicto global), así que no se filtra por paciente ni fisio.
+    """
+    overlap = _overlap_criteria(_naive_utc(window_start), _naive_utc(window_end))
+    rows = db.query(Appointment.start_time, Appointment.end_time).filter(*overlap)
+    return [(_naive_utc(start), _naive_utc(end)) for start, end in rows]
+
+
+def find_series_conflicts(
+    db: Session, *, occurrences: List[datetime], duration_minutes: int
+) -> List[datetime]:
+    """Devuelve las ocurrencias de la serie que chocan con citas existentes o entre sí."""
+    if not occurrences:
+        return []
+    busy = _load_busy_intervals(
+        db,
+        window_start=min(occurrences),
+        window_end=max(occurrences) + timedelta(minutes=duration_minutes),
+    )
+    free = set(free_starts(busy, occurrences, duration_minutes))
+    conflicts = []
+    accepted: List[tuple[datetime, datetime]] = []
+    for occ in occurrences:
+        start_n = _naive_utc(occ)
+        end_n = start_n + timedelta(minutes=duration_minutes)
+        # Las ocurrencias aceptadas también ocupan (pocas: comparación directa)
+        if occ not in free or any(start_n < e and end_n > s for s, e in accepted):
+            conflicts.append(occ)
+        else:
+            accepted.append((start_n, end_n))
+    return conflicts
+
+
+def _int_user_ids(*raw_ids: Optional[str]) -> List[int]:
+    """Convierte IDs de usuario a int, omitiendo los que no son numéricos."""
+    user_ids = []
+    for raw in raw_ids:
+        try:
+            user_ids.append(int(raw))
+        except (ValueError, TypeError):
+            pass
+    return user_ids
+
+
+def create_appointment_series(
+    db: Session,
+    *,
+    start_time: datetime,
+    duration_minutes: int,
+    patient_id: str,
+    fisio_id: Optional[str] = None,
+    appointment_type: AppointmentType = AppointmentType.consulta,
+    frequency: str = "weekly",
+    interval: int = 1,
+    count: int = 1,
 ) -> List[Appointment]:
-    """Build and execute the appointments query with optional filters."""
-    q = db.query(Appointment)
+    """Crea todas las citas de un plan de terapia en una sola transacción.
+
+    Las ocurrencias se validan contra un único conjunto de intervalos ocupados
+    y cada usuario recibe una sola notificación agregada para la serie.
+    """
+    occurrences = expand_recurrence(
+        start_time, frequency=frequency, interval=interval, count=count
+    )
+    conflicts = find_series_conflicts(
+        db, occurrences=occurrences, duration_minutes=duration_minutes
+    )
+    if conflicts:
+        raise ValueError(
+            f"Conflicto de horario en {len(conflicts)} ocurrencias de la serie: "
+            + ", ".join(c.isoformat() for c in conflicts)
+        )
+
+    appointments = [
+        Appointment(
+            start_time=occ,
+            duration_minutes=duration_minutes,
+            patient_id=patient_id,
+            fisio_id=fisio_id,
+            appointment_type=appointment_type,
+            status=AppointmentStatus.programada,
+        )
+        for occ in occurrences
+    ]
+    try:
+        db.add_all(appointments)
+        db.flush()
+        cita_ids = [ap.id for ap in appointments]
+        if fisio_id:
+            notify_serie_asignada(
+                db, cita_ids, _int_user_ids(patient_id, fisio_id), commit=False
+            )
+        else:
+            staff = (
+                db.query(User.id, User.role)
+                .filter(User.role.in_(["admin", "fisioterapeuta"]))
+                .all()
+            )
+            admin_ids = [uid for uid, role in staff if role == "admin"]
+            fisio_ids = [uid for uid, role in staff if role == "fisioterapeuta"]
+            notify_serie_pendiente_asignacion(
+                db, cita_ids, admin_ids, fisio_ids, commit=False
+            )
+        db.commit()
+    except IntegrityError as e:
+        db.rollback()
+        if _is_overlap_violation(e):
+            raise ValueError(f"{CONFLICT_MESSAGE} en la serie") from e
+        raise
+    except Exception:
+        db.rollback()
+        raise
+
+    # Recargar la serie completa en una sola consulta (en lugar de un refresh por cita)
+    return (
+        db.query(Appointment)
+        .filter(Appointment.id.in_(cita_ids))
+        .order_by(Appointment.start_time.asc())
+        .all()
+    )
+
+
+def _appointment_filters(
+    date: Optional[datetime] = None, user_id: Optional[str] = None
+) -> list:
+    """Filtros de los listados de citas (día y paciente/fisio)."""
+    criteria = []
     if date:
         day_start = date.replace(hour=0, minute=0, second=0, microsecond=0)
         day_end = day_start + timedelta(days=1)
-        q = q.filter(
-            Appointment.start_time >= day_start, Appointment.start_time < day_end
-        )
+        criteria += [
+            Appointment.start_time >= day_start,
+            Appointment.start_time < day_end,
+        ]
     if user_id:
-        q = q.filter(
+        criteria.append(
             or_(Appointment.patient_id == user_id, Appointment.fisio_id == user_id)
         )
+    return criteria
+
+
+def _build_appointments_query(
+    db: Session, date: Optional[datetime] = None, user_id: Optional[str] = None
+) -> List[Appointment]:
+    """Build and execute the appointments query with optional filters."""
+    q = db.query(Appointment).filter(*_appointment_filters(date, user_id))
     return q.order_by(Appointment.start_time.asc()).all()
 
 
+def appointments_version(
+    db: Session, *, date: Optional[datetime] = None, user_id: Optional[str] = None
+) -> tuple:
+    """
+    Versión del listado de citas para el ETag: filas y último `updated_at` de
+    las citas filtradas y de los pacientes/fisios que referencian (sus datos van
+    embebidos). Dos consultas por índice, sin recorrer las tablas completas.
+    """
+    criteria = _appointment_filters(date, user_id)
+    refs = db.execute(
+        select(Appointment.patient_id, Appointment.fisio_id).where(*criteria).distinct()
+    ).all()
+    patient_ids = _int_user_ids(*{p for p, _ in refs})
+    fisio_ids = _int_user_ids(*{f for _, f in refs})
+    stmt = select(
+        *version_columns(Appointment, *criteria),
+        *version_columns(Patient, Patient.id.in_(patient_ids)),
+        *version_columns(User, User.id.in_(fisio_ids)),
+    )
+    return tuple(db.execute(stmt).one())
+
+
 def _extract_ids_from_appointments(
     appointments: List[Appointment],
 ) -> tuple[List[int], List[str]]:
@@ -289,15 +492,20 @@ def _create_patient_info(ap: Appointment, patients_info: dict) -> Optional[Patie
 
 def _create_fisio_info(ap: Appointment, fisios_info: dict) -> Optional[FisioInfo]:
     """Create FisioInfo object from appointment and fisios data."""
-    if ap.fisio_id and ap.fisio_id in fisios_info:
-        fisio = fisios_info[ap.fisio_id]
-        return FisioInfo(
-            id=fisio.id,
-            first_name=fisio.first_name or "",
-            last_name=fisio.last_name or "",
-            email=fisio.email,
-        )
-    return None
+    if not ap.fisio_id:
+        return None
+    # fisios_info se indexa por User.id (int); fisio_id se guarda como texto
+    fisio = fisios_info.get(ap.fisio_id)
+    if fisio is None and ap.fisio_id.isdigit():
+        fisio = fisios_info.get(int(ap.fisio_id))
+    if fisio is None:
+        return None
+    return FisioInfo(
+        id=str(fisio.id),
+        first_name=fisio.first_name or "",
+        last_name=fisio.last_name or "",
+        email=fisio.email,
+    )
 
 
 def _create_appointment_read(
@@ -325,6 +533,13 @@ def list_appointments(
     db: Session, *, date: Optional[datetime] = None, user_id: Optional[str] = None
 ) -> List[AppointmentRead]:
     appointments = _build_appointments_query(db, date, user_id)
+    return _build_appointment_reads(db, appointments)
+
+
+def _build_appointment_reads(
+    db: Session, appointments: List[Appointment]
+) -> List[AppointmentRead]:
+    """`AppointmentRead` con los datos de paciente y fisio en dos consultas."""
     patient_ids, fisio_ids = _extract_ids_from_appointments(appointments)
 
     # Obtener información de pacientes y fisioterapeutas por separado
@@ -341,6 +556,98 @@ def list_appointments(
     return result
 
 
+def _encode_changes_cursor(
+    updated_at: Optional[datetime], appointment_id: int, tombstone_id: int
+) -> str:
+    ts = updated_at.isoformat() if updated_at else ""
+    raw = f"{ts}|{appointment_id}|{tombstone_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def _decode_changes_cursor(
+    since: Optional[str],
+) -> tuple[Optional[datetime], int, Optional[int]]:
+    """
+    `(updated_at, id de cita, id de tombstone)` de un cursor. También acepta
+    una fecha ISO 8601 (primera sincronización a partir de un instante); en ese
+    caso el id de tombstone es None y las eliminaciones se filtran por fecha.
+    """
+    if not since:
+        return None, 0, 0
+    try:
+        padded = since + "=" * (-len(since) % 4)
+        ts, ap_id, tomb_id = base64.urlsafe_b64decode(padded).decode().split("|")
+        return (datetime.fromisoformat(ts) if ts else None), int(ap_id), int(tomb_id)
+    except ValueError:
+        pass
+    try:
+        return _naive_utc(datetime.fromisoformat(since)), 0, None
+    except ValueError:
+        raise ValueError("Cursor 'since' inválido")
+
+
+def list_appointment_changes(
+    db: Session, *, since: Optional[str] = None, limit: int = 500
+) -> dict:
+    """
+    Citas creadas, modificadas o eliminadas después de `since`.
+
+    Las citas se recorren por `(updated_at, id)` y las eliminaciones por el id
+    de `AppointmentTombstone`, ambos con paginación por clave: cada respuesta
+    trae como mucho `limit` elementos de cada tipo y el cursor para continuar.
+
+    `updated_at` se fija al hacer flush, no al confirmar: una transacción más
+    lenta puede confirmar una fila con un valor que el cursor ya dejó atrás.
+    Por eso sólo se devuelven cambios con más de `CHANGES_SAFETY_LAG_SECONDS`
+    de antigüedad; los más recientes llegan en una llamada posterior.
+    """
+    ts, ap_id, tomb_id = _decode_changes_cursor(since)
+    horizon = datetime.now(timezone.utc) - timedelta(
+        seconds=settings.CHANGES_SAFETY_LAG_SECONDS
+    )
+
+    stmt = select(Appointment).where(Appointment.updated_at <= horizon)
+    if ts is not None:
+        stmt = stmt.where(
+            or_(
+                Appointment.updated_at > ts,
+                and_(Appointment.updated_at == ts, Appointment.id > ap_id),
+            )
+        )
+    stmt = stmt.order_by(Appointment.updated_at, Appointment.id).limit(limit + 1)
+    appointments = list(db.scalars(stmt).all())
+
+    tomb_stmt = select(AppointmentTombstone).where(
+        AppointmentTombstone.deleted_at <= horizon
+    )
+    if tomb_id is None:
+        tomb_stmt = tomb_stmt.where(AppointmentTombstone.deleted_at > ts)
+    else:
+        tomb_stmt = tomb_stmt.where(AppointmentTombstone.id > tomb_id)
+    tomb_stmt = tomb_stmt.order_by(AppointmentTombstone.id).limit(limit + 1)
+    tombstones = list(db.scalars(tomb_stmt).all())
+
+    has_more = len(appointments) > limit or len(tombstones) > limit
+    appointments, tombstones = appointments[:limit], tombstones[:limit]
+    if appointments:
+        ts, ap_id = appointments[-1].updated_at, appointments[-1].id
+    if tombstones:
+        tomb_id = tombstones[-1].id
+    elif tomb_id is None:
+        # Sin eliminaciones nuevas: continuar desde la última existente
+        last_tomb = select(func.max(AppointmentTombstone.id)).where(
+            AppointmentTombstone.deleted_at <= horizon
+        )
+        tomb_id = db.scalar(last_tomb) or 0
+
+    return {
+        "changes": _build_appointment_reads(db, appointments),
+        "deleted": [t.appointment_id for t in tombstones],
+        "cursor": _encode_changes_cursor(ts, ap_id, tomb_id),
+        "has_more": has_more,
+    }
+
+
 def update_appointment(
     db: Session,
     ap: Appointment,
@@ -366,13 +673,13 @@ def update_appointment(
         ap.status = AppointmentStatus(status)
 
     end_time = ap.start_time + timedelta(minutes=ap.duration_minutes)
-    if has_conflict(
+    if not overlap_constraint_enforced(db) and has_conflict(
         db, fisio_id=ap.fisio_id, start=ap.start_time, end=end_time, exclude_id=ap.id
     ):
-        raise ValueError("Conflicto de horario con otra cita")
+        raise ValueError(CONFLICT_MESSAGE)
 
     db.add(ap)
-    db.commit()
+    _commit_checked(db)
     db.refresh(ap)
     # Notificar modificación a todos los involucrados
     user_ids = []
@@ -395,6 +702,32 @@ def get_appointment(db: Session, ap_id: int) -> Optional[Appointment]:
     return db.query(Appointment).filter(Appointment.id == ap_id).first()
 
 
+def _backfill_waitlist(
+    db: Session, start: datetime, duration_minutes: int, fisio_id: Optional[str]
+) -> None:
+    """Ofrece el hueco liberado a la lista de espera sin afectar a la cancelación."""
+    if not settings.WAITLIST_BACKFILL_ENABLED:
+        return
+    # Un hueco que ya empezó no se puede aprovechar
+    if _naive_utc(start) <= _naive_utc(datetime.now(timezone.utc)):
+        return
+    # Import diferido: app.services.waitlist depende de este módulo
+    from app.services.waitlist import backfill_slot
+
+    try:
+        backfill_slot(
+            db,
+            start=start,
+            end=start + timedelta(minutes=duration_minutes),
+            fisio_id=fisio_id,
+        )
+    except Exception:
+        db.rollback()
+        logging.getLogger(__name__).exception(
+            "Error al rellenar desde la lista de espera"
+        )
+
+
 def cancel_appointment(db: Session, ap: Appointment) -> AppointmentRead:
     ap.status = AppointmentStatus.cancelada
     db.add(ap)
@@ -441,6 +774,8 @@ def cancel_appointment(db: Session, ap: Appointment) -> AppointmentRead:
             email=fisio.email,
         )
 
+    _backfill_waitlist(db, ap.start_time, ap.duration_minutes, ap.fisio_id)
+
     # Crear el objeto AppointmentRead con toda la información
     return AppointmentRead(
         id=ap.id,
@@ -508,10 +843,174 @@ def delete_appointment(db: Session, ap: Appointment) -> AppointmentRead:
         user_ids.append(int(ap.fisio_id))
     notify_cita_cancelada(db, ap.id, user_ids)
 
-    # Eliminar la cita de la base de datos
+    # Eliminar la cita y dejar constancia para la sincronización incremental
+    freed = (ap.start_time, ap.duration_minutes, ap.fisio_id)
+    was_active = ap.status != AppointmentStatus.cancelada
+    db.add(AppointmentTombstone(appointment_id=ap.id))
     db.delete(ap)
     db.commit()
+    if was_active:
+        _backfill_waitlist(db, *freed)
 
     return appointment_read
 
-    # ...existing code...
+
+# --- Versiones async (AsyncSession) de los servicios más usados ---
+
+
+async def _load_busy_intervals_async(
+    db: AsyncSession,
+    *,
+    window_start: datetime,
+    window_end: datetime,
+    exclude_id: Optional[int] = None,
+) -> List[tuple[datetime, datetime]]:
+    """Equivalente async de `_load_busy_intervals` (una sola consulta)."""
+    overlap = _overlap_criteria(
+        _naive_utc(window_start), _naive_utc(window_end), exclude_id
+    )
+    stmt = select(Appointment.start_time, Appointment.end_time).where(*overlap)
+    return [
+        (_naive_utc(start), _naive_utc(end))
+        for start, end in (await db.execute(stmt)).all()
+    ]
+
+
+async def is_time_slot_available_async(
+    db: AsyncSession,
+    *,
+    start_time: datetime,
+    duration_minutes: int,
+    patient_id: str,
+    fisio_id: Optional[str] = None,
+    exclude_id: Optional[int] = None,
+) -> bool:
+    """Versión async de `is_time_slot_available` (un único EXISTS global)."""
+    end_time = start_time + timedelta(minutes=duration_minutes)
+    return not await db.scalar(
+        _overlap_exists(start_time, end_time, exclude_id=exclude_id)
+    )
+
+
+def _local(value: datetime) -> datetime:
+    return value.replace(tzinfo=timezone.utc).astimezone(clinic_tz())
+
+
+async def free_calendar_async(
+    db: AsyncSession,
+    *,
+    date_from: date,
+    date_to: date,
+    duration_minutes: int,
+    step_minutes: int = 30,
+    fisio_id: Optional[str] = None,
+    hours: Optional[tuple[int, int]] = None,
+    exclude_id: Optional[int] = None,
+) -> List[dict]:
+    """
+    Calendario libre por día: horario abierto (ver `app.services.working_hours`)
+    menos los intervalos ocupados, más los inicios de franja en los que cabe
+    `duration_minutes` (alineados a `step_minutes` desde la medianoche local).
+
+    Los ocupados de todo el rango se cargan en una sola consulta. Los inicios
+    alineados del horario abierto de todos los días se filtran de una vez
+    contra ellos con el núcleo NumPy (`free_starts`). `hours`
+    (hora inicial, hora final) restringe además la ventana local de cada día.
+    Devuelve datetimes en hora local de la clínica.
+    """
+    tz = clinic_tz()
+    open_by_day = await open_calendar_async(
+        db, date_from=date_from, date_to=date_to, fisio_id=fisio_id
+    )
+    if hours is not None:
+        start_hour, end_hour = hours
+        open_by_day = {
+            day: intersect_intervals(
+                intervals,
+                [
+                    local_span(
+                        day,
+                        time(start_hour),
+                        time(end_hour) if end_hour < 24 else None,
+                        tz,
+                    )
+                ],
+            )
+            for day, intervals in open_by_day.items()
+        }
+    spans = [span for intervals in open_by_day.values() for span in intervals]
+    busy = (
+        await _load_busy_intervals_async(
+            db,
+            window_start=min(s for s, _ in spans),
+            window_end=max(e for _, e in spans),
+            exclude_id=exclude_id,
+        )
+        if spans
+        else []
+    )
+    candidates = {
+        day: slot_starts(
+            open_, duration_minutes, step_minutes, local_span(day, None, None, tz)[0]
+        )
+        for day, open_ in open_by_day.items()
+    }
+    available = set(
+        free_starts(
+            busy,
+            [c for day_candidates in candidates.values() for c in day_candidates],
+            duration_minutes,
+        )
+    )
+    days = []
+    for day, open_ in open_by_day.items():
+        free = subtract_intervals(open_, busy)
+        days.append(
+            {
+                "date": day,
+                "open": [{"start": _local(s), "end": _local(e)} for s, e in open_],
+                "free": [{"start": _local(s), "end": _local(e)} for s, e in free],
+                "slots": [_local(s) for s in candidates[day] if s in available],
+            }
+        )
+    return days
+
+
+async def has_conflict_async(
+    db: AsyncSession,
+    *,
+    fisio_id: str,
+    start: datetime,
+    end: datetime,
+    exclude_id: Optional[int] = None,
+) -> bool:
+    stmt = _overlap_exists(
+        start, end, Appointment.fisio_id == fisio_id, exclude_id=exclude_id
+    )
+    return bool(await db.scalar(stmt))
+
+
+async def get_appointment_async(db: AsyncSession, ap_id: int) -> Optional[Appointment]:
+    return await db.get(Appointment, ap_id)
+
+
+async def list_appointments_async(
+    db: AsyncSession, *, date: Optional[datetime] = None, user_id: Optional[str] = None
+) -> List[AppointmentRead]:
+    stmt = select(Appointment).where(*_appointment_filters(date, user_id))
+    appointments = list(
+        (await db.scalars(stmt.order_by(Appointment.start_time.asc()))).all()
+    )
+    patient_ids, fisio_ids = _extract_ids_from_appointments(appointments)
+    patients_info = (
+        await get_patients_by_ids_async(db, patient_ids) if patient_ids else {}
+    )
+    fisios_info = await get_users_by_ids_async(db, fisio_ids) if fisio_ids else {}
+    return [
+        _create_appointment_read(
+            ap,
+            _create_patient_info(ap, patients_info),
+            _create_fisio_info(ap, fisios_info),
+        )
+        for ap in appointments
+    ]
@@ -0,0 +1,252 @@
+"""
+Motor de asignación automática de fisio para citas pendientes (sin `fisio_id`).
+
+Para una ventana de tiempo se cargan, en pocas consultas:
+
+- las citas pendientes activas,
+- los fisios activos, su horario abierto (`app.services.working_hours`) y sus
+  citas ya asignadas (ocupación y carga en minutos).
+
+`plan_assignments` recorre las pendientes de la más restringida (menos fisios
+posibles) a la menos, y asigna cada una al fisio libre y en horario con menor
+carga acumulada; la carga se actualiza tras cada asignación, así que el reparto
+queda equilibrado. Nunca asigna dos citas solapadas al mismo fisio. Las que no
+caben en ningún horario quedan pendientes.
+
+Se ejecuta desde `POST /appointments/assign-pending` o como tarea programada:
+
+    python -m app.services.assignment --days 31 [--dry-run]
+"""
+
+from __future__ import annotations
+
+import argparse
+from bisect import bisect_left, bisect_right
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, List, NamedTuple, Optional, Sequence
+
+from sqlalchemy.orm import Session
+
+from app.models.appointment import Appointment, AppointmentStatus
+from app.models.user import User, UserRole
+from app.services.appointments import (
+    _commit_checked,
+    _int_user_ids,
+    _naive_utc,
+    _overlap_criteria,
+)
+from app.services.notifications import notify_asignacion_automatica
+from app.services.scheduling import Interval, merge_intervals
+from app.services.working_hours import clinic_tz, open_calendars
+
+# Ventana por defecto del trabajo por lotes
+DEFAULT_WINDOW = timedelta(days=31)
+PENDING_STATUSES = (AppointmentStatus.programada, AppointmentStatus.confirmada)
+
+
+class PendingSlot(NamedTuple):
+    appointment_id: int
+    start: datetime  # naive UTC
+    end: datetime
+
+
+class FisioAgenda:
+    """Horario abierto, ocupación (ordenada, sin solapes) y carga de un fisio."""
+
+    __slots__ = ("fisio_id", "open", "_open_starts", "starts", "ends", "load")
+
+    def __init__(
+        self,
+        fisio_id: str,
+        open_intervals: Iterable[Interval],
+        busy: Iterable[Interval] = (),
+    ) -> None:
+        busy = list(busy)
+        self.fisio_id = fisio_id
+        self.open = merge_intervals(open_intervals)
+        self._open_starts = [s for s, _ in self.open]
+        merged = merge_intervals(busy)
+        self.starts = [s for s, _ in merged]
+        self.ends = [e for _, e in merged]
+        # Minutos ya asignados en la ventana
+        self.load = sum((e - s).total_seconds() for s, e in busy) / 60
+
+    def is_open(self, start: datetime, end: datetime) -> bool:
+        i = bisect_right(self._open_starts, start) - 1
+        return i >= 0 and self.open[i][1] >= end
+
+    def is_free(self, start: datetime, end: datetime) -> bool:
+        # Ocupados disjuntos y ordenados: basta el último que empieza antes de `end`
+        i = bisect_left(self.starts, end) - 1
+        return i < 0 or self.ends[i] <= start
+
+    def book(self, start: datetime, end: datetime) -> None:
+        i = bisect_left(self.starts, start)
+        self.starts.insert(i, start)
+        self.ends.insert(i, end)
+        self.load += (end - start).total_seconds() / 60
+
+
+def plan_assignments(
+    pending: Sequence[PendingSlot], agendas: Sequence[FisioAgenda]
+) -> Dict[int, str]:
+    """`{appointment_id: fisio_id}` equilibrando la carga; modifica `agendas`."""
+    eligible = {
+        p.appointment_id: [
+            a
+            for a in agendas
+            if a.is_open(p.start, p.end) and a.is_free(p.start, p.end)
+        ]
+        for p in pending
+    }
+    order = sorted(pending, key=lambda p: (len(eligible[p.appointment_id]), p.start))
+    plan: Dict[int, str] = {}
+    for p in order:
+        best = min(
+            (a for a in eligible[p.appointment_id] if a.is_free(p.start, p.end)),
+            key=lambda a: (a.load, a.fisio_id),
+            default=None,
+        )
+        if best is not None:
+            best.book(p.start, p.end)
+            plan[p.appointment_id] = best.fisio_id
+    return plan
+
+
+def load_pending(
+    db: Session,
+    *,
+    window_start: Optional[datetime] = None,
+    window_end: Optional[datetime] = None,
+    appointment_ids: Optional[Sequence[int]] = None,
+) -> List[Appointment]:
+    q = db.query(Appointment).filter(
+        Appointment.fisio_id.is_(None), Appointment.status.in_(PENDING_STATUSES)
+    )
+    if window_start is not None:
+        q = q.filter(Appointment.start_time >= _naive_utc(window_start))
+    if window_end is not None:
+        q = q.filter(Appointment.start_time < _naive_utc(window_end))
+    if appointment_ids is not None:
+        q = q.filter(Appointment.id.in_(appointment_ids))
+    return q.order_by(Appointment.start_time, Appointment.id).all()
+
+
+def _local_date(value: datetime):
+    return value.replace(tzinfo=timezone.utc).astimezone(clinic_tz()).date()
+
+
+def load_agendas(db: Session, pending: Sequence[PendingSlot]) -> List[FisioAgenda]:
+    """Agendas de los fisios activos en la ventana de `pending` (4 consultas)."""
+    fisio_ids = [
+        str(u_id)
+        for (u_id,) in db.query(User.id)
+        .filter(User.role == UserRole.fisioterapeuta, User.is_active.is_(True))
+        .order_by(User.id)
+    ]
+    if not fisio_ids or not pending:
+        return []
+    span_start = min(p.start for p in pending)
+    span_end = max(p.end for p in pending)
+
+    busy: Dict[str, List[Interval]] = defaultdict(list)
+    rows = db.query(
+        Appointment.fisio_id, Appointment.start_time, Appointment.end_time
+    ).filter(
+        Appointment.fisio_id.in_(fisio_ids), *_overlap_criteria(span_start, span_end)
+    )
+    for fisio_id, start, end in rows:
+        busy[fisio_id].append((_naive_utc(start), _naive_utc(end)))
+
+    open_by_fisio = open_calendars(
+        db,
+        date_from=_local_date(span_start),
+        date_to=_local_date(span_end),
+        fisio_ids=fisio_ids,
+    )
+    return [
+        FisioAgenda(fisio_id, open_by_fisio[fisio_id], busy[fisio_id])
+        for fisio_id in fisio_ids
+    ]
+
+
+def assign_pending_appointments(
+    db: Session,
+    *,
+    window_start: Optional[datetime] = None,
+    window_end: Optional[datetime] = None,
+    appointment_ids: Optional[Sequence[int]] = None,
+    dry_run: bool = False,
+    notify: bool = True,
+) -> dict:
+    """
+    Asigna fisio a las citas pendientes que empiezan en la ventana (por
+    defecto, desde ahora y durante `DEFAULT_WINDOW`; sin límite de ventana si
+    se pasan `appointment_ids`) en una sola transacción.
+
+    Con `dry_run` solo devuelve el plan. Lanza ValueError si otra escritura
+    ocupa uno de los huecos entre la lectura y el commit (restricción EXCLUDE).
+    """
+    if appointment_ids is None:
+        window_start = window_start or datetime.now(timezone.utc)
+        window_end = window_end or window_start + DEFAULT_WINDOW
+    appointments = load_pending(
+        db,
+        window_start=window_start,
+        window_end=window_end,
+        appointment_ids=appointment_ids,
+    )
+    pending = [
+        PendingSlot(ap.id, _naive_utc(ap.start_time), _naive_utc(ap.end_time))
+        for ap in appointments
+    ]
+    plan = plan_assignments(pending, load_agendas(db, pending))
+
+    if plan and not dry_run:
+        cita_ids_by_user: Dict[int, List[int]] = defaultdict(list)
+        for ap in appointments:
+            if ap.id in plan:
+                ap.fisio_id = plan[ap.id]
+                for user_id in _int_user_ids(ap.patient_id, ap.fisio_id):
+                    cita_ids_by_user[user_id].append(ap.id)
+        if notify:
+            notify_asignacion_automatica(db, cita_ids_by_user, commit=False)
+        _commit_checked(db)
+
+    return {
+        "assigned": [
+            {"appointment_id": ap_id, "fisio_id": fisio_id}
+            for ap_id, fisio_id in sorted(plan.items())
+        ],
+        "unassigned": [
+            p.appointment_id for p in pending if p.appointment_id not in plan
+        ],
+        "dry_run": dry_run,
+    }
+
+
+def main() -> None:
+    from app.db.session import SessionLocal
+
+    parser = argparse.ArgumentParser(description="Asigna fisio a citas pendientes")
+    parser.add_argument("--days", type=int, default=DEFAULT_WINDOW.days)
+    parser.add_argument("--dry-run", action="store_true")
+    args = parser.parse_args()
+
+    now = datetime.now(timezone.utc)
+    with SessionLocal() as db:
+        result = assign_pending_appointments(
+            db,
+            window_start=now,
+            window_end=now + timedelta(days=args.days),
+            dry_run=args.dry_run,
+        )
+    print(
+        f"asignadas={len(result['assigned'])} "
+        f"sin_asignar={len(result['unassigned'])} dry_run={args.dry_run}"
+    )
+
+
+if __name__ == "__main__":
+    main()
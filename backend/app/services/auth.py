@@ -1,10 +1,8 @@
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy.orm import Session
-from supabase_utils.gotrue import get_user_from_token
+from supabase_utils.gotrue import get_user_from_token, get_user_from_token_async
 
 from app.core.config import settings
-from app.db.session import get_db
 
 reuseable_oauth = OAuth2PasswordBearer(
     tokenUrl=f"{settings.API_V1_STR}/auth/login",
@@ -12,16 +10,38 @@ reuseable_oauth = OAuth2PasswordBearer(
 )
 
 
-def get_current_user(
-    token: str = Depends(reuseable_oauth), db: Session = Depends(get_db)
-):
+def _invalid_token() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED, detail="Token inválido o expirado"
+    )
+
+
+def _set_request_user(request: Request, data: dict) -> dict:
+    # Clave de rate limiting por usuario (app.limiter.rate_limit_key)
+    request.state.user_id = (data or {}).get("id")
+    return data
+
+
+def get_current_user(request: Request, token: str = Depends(reuseable_oauth)):
     try:
         data = get_user_from_token(token)
-        return data
     except Exception:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED, detail="Token inválido o expirado"
-        )
+        raise _invalid_token()
+    return _set_request_user(request, data)
+
+
+async def get_current_user_async(
+    request: Request, token: str = Depends(reuseable_oauth)
+):
+    """
+    Igual que `get_current_user` para rutas async: la llamada a GoTrue es async
+    y no abre sesión de BD, así que el request no ocupa un hilo del threadpool.
+    """
+    try:
+        data = await get_user_from_token_async(token)
+    except Exception:
+        raise _invalid_token()
+    return _set_request_user(request, data)
 
 
 def require_roles(*roles: str):
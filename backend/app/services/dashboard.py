@@ -1,12 +1,28 @@
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from sqlalchemy import func, and_, or_
+from sqlalchemy import func, and_, or_, select
 from datetime import date, datetime, timedelta
 from typing import Optional, Dict, List, Any
+from app.core.etag import version_columns
 from app.models.appointment import Appointment
 from app.models.patient import Patient
 from app.models.terapia import Terapia
 
 
+def dashboard_version(db: Session) -> tuple:
+    """
+    Versión de los datos del dashboard para el ETag: citas, pacientes y
+    terapias activas en una sola consulta, más el día actual (las ventanas
+    de "hoy", semanas y meses cambian con la fecha).
+    """
+    stmt = select(
+        *version_columns(Appointment),
+        *version_columns(Patient),
+        *version_columns(Terapia, Terapia.is_active == True, column=Terapia.id),
+    )
+    return (date.today(), *db.execute(stmt).one())
+
+
 def get_dashboard_summary(db: Session) -> Dict[str, Any]:
     """Obtener resumen general del dashboard"""
     total_patients = db.query(Patient).count()
@@ -27,6 +43,29 @@ def get_dashboard_summary(db: Session) -> Dict[str, Any]:
     }
 
 
+async def get_dashboard_summary_async(db: AsyncSession) -> Dict[str, Any]:
+    """Versión async de `get_dashboard_summary`"""
+    total_patients = await db.scalar(select(func.count(Patient.id)))
+    total_appointments = await db.scalar(select(func.count(Appointment.id)))
+    active_therapies = await db.scalar(
+        select(func.count(Terapia.id)).where(Terapia.is_active == True)
+    )
+    appointments_by_status = (
+        await db.execute(
+            select(Appointment.status, func.count(Appointment.id)).group_by(
+                Appointment.status
+            )
+        )
+    ).all()
+
+    return {
+        "total_patients": total_patients,
+        "total_appointments": total_appointments,
+        "active_therapies": active_therapies,
+        "appointments_by_status": dict(appointments_by_status),
+    }
+
+
 def _build_next_appointment_info(next_appointment, now):
     """Build next appointment information, extracting nested conditional logic."""
     if not next_appointment:
@@ -1,5 +1,16 @@
-from sqlalchemy.orm import Session
+import base64
+import heapq
+import json
+from datetime import datetime, time, timezone
+from itertools import islice
+from typing import Any, Dict, Optional
+
+from sqlalchemy import and_, or_
+from sqlalchemy.orm import Session, contains_eager, selectinload
+from app.models.appointment import Appointment
 from app.models.historial import Historial, TerapiaHistorial
+from app.models.patient import Patient
+from app.services.appointments import _naive_utc
 from app.schemas.historiales import HistorialCreate, TerapiaCreate
 
 
@@ -20,12 +31,183 @@ def create_terapia(db: Session, terapia_in: TerapiaCreate):
 
 
 def get_historiales_by_paciente(db: Session, paciente_id: int):
-    return db.query(Historial).filter(Historial.paciente_id == paciente_id).all()
+    # selectinload: las terapias de todos los historiales se cargan en una sola
+    # consulta adicional en lugar de una carga lazy por historial al serializar
+    return (
+        db.query(Historial)
+        .options(selectinload(Historial.terapias))
+        .filter(Historial.paciente_id == paciente_id)
+        .order_by(Historial.fecha.desc(), Historial.id.desc())
+        .all()
+    )
 
 
 def get_terapias_by_paciente(db: Session, paciente_id: int):
-    historiales = db.query(Historial).filter(Historial.paciente_id == paciente_id).all()
-    terapias = []
-    for historial in historiales:
-        terapias.extend(historial.terapias)
-    return terapias
+    return (
+        db.query(TerapiaHistorial)
+        .join(Historial, TerapiaHistorial.historial_id == Historial.id)
+        .filter(Historial.paciente_id == paciente_id)
+        .order_by(Historial.fecha.desc(), TerapiaHistorial.id)
+        .all()
+    )
+
+
+def get_historial_completo(db: Session, paciente_id: int) -> Optional[Patient]:
+    """Paciente con historiales y terapias anidados, resuelto en una sola consulta."""
+    rows = (
+        db.query(Patient)
+        .outerjoin(Patient.historiales)
+        .outerjoin(Historial.terapias)
+        .options(contains_eager(Patient.historiales).contains_eager(Historial.terapias))
+        .filter(Patient.id == paciente_id)
+        .order_by(Historial.fecha.desc(), Historial.id.desc(), TerapiaHistorial.id)
+        .populate_existing()
+        .all()
+    )
+    return rows[0] if rows else None
+
+
+# --- Timeline clínico paginado ---
+
+# Desempate para eventos con el mismo instante (orden descendente): la cita
+# aparece primero, luego el historial y después sus terapias.
+TIMELINE_KIND_RANK = {"terapia": 0, "historial": 1, "cita": 2}
+
+
+def encode_timeline_cursor(timestamp: datetime, kind: str, item_id: int) -> str:
+    raw = json.dumps([timestamp.isoformat(), kind, item_id])
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_timeline_cursor(cursor: str) -> tuple[datetime, str, int]:
+    try:
+        ts, kind, item_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        if kind not in TIMELINE_KIND_RANK:
+            raise ValueError(kind)
+        return datetime.fromisoformat(ts), kind, int(item_id)
+    except (ValueError, TypeError):
+        raise ValueError("Cursor inválido")
+
+
+def _timeline_key(entry: Dict[str, Any]) -> tuple:
+    return entry["timestamp"], TIMELINE_KIND_RANK[entry["kind"]], entry["id"]
+
+
+def _before_cursor(ts_col, id_col, kind: str, cursor: tuple, *, as_date=False):
+    """Filtro SQL para las filas que van después del cursor en orden descendente."""
+    c_ts, c_kind, c_id = cursor
+    c_val = c_ts
+    if as_date:
+        c_val = c_ts.date()
+        if c_ts != datetime.combine(c_val, time.min):
+            # El cursor cae a mitad del día: todo ese día queda antes
+            return ts_col <= c_val
+    rank, c_rank = TIMELINE_KIND_RANK[kind], TIMELINE_KIND_RANK[c_kind]
+    if rank < c_rank:
+        return ts_col <= c_val
+    if rank > c_rank:
+        return ts_col < c_val
+    return or_(ts_col < c_val, and_(ts_col == c_val, id_col < c_id))
+
+
+def get_patient_timeline(
+    db: Session,
+    paciente_id: int,
+    *,
+    limit: int = 20,
+    cursor: Optional[str] = None,
+    now: Optional[datetime] = None,
+) -> Dict[str, Any]:
+    """
+    Historiales, terapias y citas pasadas del paciente en un único flujo
+    cronológico (más reciente primero) paginado por cursor.
+
+    Cada fuente se lee con una consulta por rango sobre su índice
+    (paciente, fecha) limitada a `limit + 1` filas y se mezclan en Python,
+    así el coste no depende del tamaño total del historial.
+    """
+    position = decode_timeline_cursor(cursor) if cursor else None
+    now_n = _naive_utc(now or datetime.now(timezone.utc))
+    fetch = limit + 1
+
+    hq = db.query(Historial).filter(Historial.paciente_id == paciente_id)
+    tq = (
+        db.query(TerapiaHistorial, Historial.fecha)
+        .join(Historial, TerapiaHistorial.historial_id == Historial.id)
+        .filter(Historial.paciente_id == paciente_id)
+    )
+    aq = db.query(Appointment).filter(
+        Appointment.patient_id == str(paciente_id), Appointment.start_time < now_n
+    )
+    if position:
+        hq = hq.filter(
+            _before_cursor(
+                Historial.fecha, Historial.id, "historial", position, as_date=True
+            )
+        )
+        tq = tq.filter(
+            _before_cursor(
+                Historial.fecha, TerapiaHistorial.id, "terapia", position, as_date=True
+            )
+        )
+        aq = aq.filter(
+            _before_cursor(Appointment.start_time, Appointment.id, "cita", position)
+        )
+
+    historiales = [
+        {
+            "kind": "historial",
+            "id": h.id,
+            "timestamp": datetime.combine(h.fecha, time.min),
+            "descripcion": h.diagnostico,
+            "detalle": {"notas": h.notas},
+        }
+        for h in hq.order_by(Historial.fecha.desc(), Historial.id.desc())
+        .limit(fetch)
+        .all()
+    ]
+    terapias = [
+        {
+            "kind": "terapia",
+            "id": t.id,
+            "timestamp": datetime.combine(fecha, time.min),
+            "descripcion": t.tipo,
+            "detalle": {
+                "historial_id": t.historial_id,
+                "duracion": t.duracion,
+                "observaciones": t.observaciones,
+            },
+        }
+        for t, fecha in tq.order_by(Historial.fecha.desc(), TerapiaHistorial.id.desc())
+        .limit(fetch)
+        .all()
+    ]
+    citas = [
+        {
+            "kind": "cita",
+            "id": ap.id,
+            "timestamp": _naive_utc(ap.start_time),
+            "descripcion": f"Cita de {ap.appointment_type.value}",
+            "detalle": {
+                "status": ap.status.value,
+                "duration_minutes": ap.duration_minutes,
+                "fisio_id": ap.fisio_id,
+            },
+        }
+        for ap in aq.order_by(Appointment.start_time.desc(), Appointment.id.desc())
+        .limit(fetch)
+        .all()
+    ]
+
+    merged = list(
+        islice(
+            heapq.merge(historiales, terapias, citas, key=_timeline_key, reverse=True),
+            fetch,
+        )
+    )
+    items = merged[:limit]
+    next_cursor = None
+    if len(merged) > limit:
+        last = items[-1]
+        next_cursor = encode_timeline_cursor(last["timestamp"], last["kind"], last["id"])
+    return {"items": items, "next_cursor": next_cursor}
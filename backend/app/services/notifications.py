@@ -1,11 +1,16 @@
+from typing import Optional
+
+from sqlalchemy import func, select
 from sqlalchemy.orm import Session
+
+from app.core.etag import version_columns
 from app.models.notification import Notification
 from app.schemas.notifications import (
     NotificationCreate,
     NotificationUpdate,
     NotificationType,
 )
-import datetime
+from app.metrics import record_notification_fanout
 import datetime
 
 
@@ -15,7 +20,11 @@ def get_notifications_by_cita(db: Session, cita_id: int):
     """
     from app.models.notification import Notification
 
-    return db.query(Notification).filter(Notification.related_cita_id == cita_id).all()
+    return (
+        db.query(Notification)
+        .filter(Notification.related_appointment_id == cita_id)
+        .all()
+    )
 
 
 def create_notification(db: Session, notification: NotificationCreate):
@@ -39,6 +48,33 @@ def create_notification(db: Session, notification: NotificationCreate):
     return db_notification
 
 
+def create_notifications_bulk(
+    db: Session, notifications: list[NotificationCreate], *, commit: bool = True
+):
+    """
+    Inserta varias notificaciones con un único flush/commit.
+    Con commit=False quedan pendientes en la transacción del llamador.
+    """
+    now = datetime.datetime.now(datetime.timezone.utc)
+    db_notifications = [
+        Notification(
+            user_id=n.user_id,
+            type=(n.type.value if isinstance(n.type, NotificationType) else n.type),
+            message=n.message,
+            related_appointment_id=n.related_cita_id,
+            created_at=now,
+            is_read=False,
+        )
+        for n in notifications
+    ]
+    db.add_all(db_notifications)
+    if commit:
+        db.commit()
+    else:
+        db.flush()
+    return db_notifications
+
+
 # --- Servicios de negocio para notificaciones ---
 
 
@@ -49,6 +85,9 @@ def notify_cita_pendiente_asignacion(
     fisio_ids: list[int],
 ):
     message = f"Cita #{cita_id} pendiente de asignación"
+    record_notification_fanout(
+        NotificationType.CITA_PENDIENTE_ASIGNACION.value, len(admin_ids + fisio_ids)
+    )
     for user_id in admin_ids + fisio_ids:
         notification = NotificationCreate(
             user_id=user_id,
@@ -61,6 +100,7 @@ def notify_cita_pendiente_asignacion(
 
 def notify_cita_asignada(db: Session, cita_id: int, paciente_id: int, fisio_id: int):
     message = f"Cita #{cita_id} asignada"
+    record_notification_fanout(NotificationType.CITA_ASIGNADA.value, 2)
     for user_id in [paciente_id, fisio_id]:
         notification = NotificationCreate(
             user_id=user_id,
@@ -71,10 +111,85 @@ def notify_cita_asignada(db: Session, cita_id: int, paciente_id: int, fisio_id:
         create_notification(db, notification)
 
 
+def _serie_message(cita_ids: list[int], suffix: str) -> str:
+    ids = ", ".join(f"#{cita_id}" for cita_id in cita_ids)
+    return f"Serie de {len(cita_ids)} citas ({ids}) {suffix}"
+
+
+def notify_serie_asignada(
+    db: Session, cita_ids: list[int], user_ids: list[int], *, commit: bool = True
+):
+    """Una sola notificación agregada por usuario para una serie de citas."""
+    message = _serie_message(cita_ids, "asignada")
+    notifications = [
+        NotificationCreate(
+            user_id=user_id,
+            type=NotificationType.CITA_ASIGNADA,
+            message=message,
+            related_cita_id=cita_ids[0],
+        )
+        for user_id in dict.fromkeys(user_ids)
+    ]
+    record_notification_fanout(NotificationType.CITA_ASIGNADA.value, len(notifications))
+    return create_notifications_bulk(db, notifications, commit=commit)
+
+
+def notify_asignacion_automatica(
+    db: Session, cita_ids_by_user: dict[int, list[int]], *, commit: bool = True
+):
+    """
+    Una notificación por usuario (paciente o fisio) con todas sus citas
+    asignadas en una pasada del motor de asignación.
+    """
+    notifications = [
+        NotificationCreate(
+            user_id=user_id,
+            type=NotificationType.CITA_ASIGNADA,
+            message=(
+                f"Cita #{cita_ids[0]} asignada"
+                if len(cita_ids) == 1
+                else f"{len(cita_ids)} citas asignadas ("
+                + ", ".join(f"#{cita_id}" for cita_id in cita_ids)
+                + ")"
+            ),
+            related_cita_id=cita_ids[0],
+        )
+        for user_id, cita_ids in cita_ids_by_user.items()
+        if cita_ids
+    ]
+    record_notification_fanout(NotificationType.CITA_ASIGNADA.value, len(notifications))
+    return create_notifications_bulk(db, notifications, commit=commit)
+
+
+def notify_serie_pendiente_asignacion(
+    db: Session,
+    cita_ids: list[int],
+    admin_ids: list[int],
+    fisio_ids: list[int],
+    *,
+    commit: bool = True,
+):
+    message = _serie_message(cita_ids, "pendiente de asignación")
+    notifications = [
+        NotificationCreate(
+            user_id=user_id,
+            type=NotificationType.CITA_PENDIENTE_ASIGNACION,
+            message=message,
+            related_cita_id=cita_ids[0],
+        )
+        for user_id in dict.fromkeys(admin_ids + fisio_ids)
+    ]
+    record_notification_fanout(
+        NotificationType.CITA_PENDIENTE_ASIGNACION.value, len(notifications)
+    )
+    return create_notifications_bulk(db, notifications, commit=commit)
+
+
 def notify_cita_tomada(
     db: Session, cita_id: int, paciente_id: int, admin_ids: list[int]
 ):
     message = f"Cita #{cita_id} tomada por fisioterapeuta"
+    record_notification_fanout(NotificationType.CITA_TOMADA.value, 1 + len(admin_ids))
     for user_id in [paciente_id] + admin_ids:
         notification = NotificationCreate(
             user_id=user_id,
@@ -87,6 +202,7 @@ def notify_cita_tomada(
 
 def notify_cita_modificada(db: Session, cita_id: int, user_ids: list[int]):
     message = f"Cita #{cita_id} modificada"
+    record_notification_fanout(NotificationType.CITA_MODIFICADA.value, len(user_ids))
     for user_id in user_ids:
         notification = NotificationCreate(
             user_id=user_id,
@@ -99,6 +215,7 @@ def notify_cita_modificada(db: Session, cita_id: int, user_ids: list[int]):
 
 def notify_cita_cancelada(db: Session, cita_id: int, user_ids: list[int]):
     message = f"Cita #{cita_id} cancelada"
+    record_notification_fanout(NotificationType.CITA_CANCELADA.value, len(user_ids))
     for user_id in user_ids:
         notification = NotificationCreate(
             user_id=user_id,
@@ -111,6 +228,7 @@ def notify_cita_cancelada(db: Session, cita_id: int, user_ids: list[int]):
 
 def notify_cita_recordatorio(db: Session, cita_id: int, user_ids: list[int]):
     message = f"Recordatorio: cita #{cita_id} próxima"
+    record_notification_fanout(NotificationType.CITA_RECORDATORIO.value, len(user_ids))
     for user_id in user_ids:
         notification = NotificationCreate(
             user_id=user_id,
@@ -121,8 +239,28 @@ def notify_cita_recordatorio(db: Session, cita_id: int, user_ids: list[int]):
         create_notification(db, notification)
 
 
+def notifications_version(
+    db: Session, *, user_id: Optional[int] = None, cita_id: Optional[int] = None
+) -> tuple:
+    """
+    Versión de las notificaciones para el ETag. No tienen `updated_at`: se usa
+    el último id (altas) y el número de leídas (marcar como leída).
+    """
+    criteria = []
+    if user_id is not None:
+        criteria.append(Notification.user_id == user_id)
+    if cita_id is not None:
+        criteria.append(Notification.related_appointment_id == cita_id)
+    read = select(func.count()).where(Notification.is_read == True, *criteria)
+    stmt = select(
+        *version_columns(Notification, *criteria, column=Notification.id),
+        read.scalar_subquery(),
+    )
+    return tuple(db.execute(stmt).one())
+
+
 def list_notifications(db: Session, user_id: int):
-    return db.query(Notification).filter(Notification.usuario_id == user_id).all()
+    return db.query(Notification).filter(Notification.user_id == user_id).all()
 
 
 def mark_notification_as_read(db: Session, notification_id: int):
@@ -130,7 +268,7 @@ def mark_notification_as_read(db: Session, notification_id: int):
         db.query(Notification).filter(Notification.id == notification_id).first()
     )
     if notification:
-        notification.leida = True
+        notification.is_read = True
         db.commit()
         db.refresh(notification)
     return notification
@@ -1,8 +1,11 @@
 from __future__ import annotations
 from typing import List, Optional, Dict
 
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
+from app.core.etag import version_columns
 from app.models.patient import Patient
 
 
@@ -59,3 +62,45 @@ def search_patients(db: Session, search_term: str) -> List[Patient]:
 def delete_patient(db: Session, patient: Patient) -> None:
     db.delete(patient)
     db.commit()
+
+
+# --- Versiones async (AsyncSession) ---
+
+
+async def list_patients_async(db: AsyncSession) -> List[Patient]:
+    stmt = select(Patient).order_by(Patient.created_at.desc())
+    return list((await db.scalars(stmt)).all())
+
+
+async def patients_version_async(db: AsyncSession) -> tuple:
+    """Versión de la tabla de pacientes para el ETag de listados y búsquedas."""
+    return tuple((await db.execute(select(*version_columns(Patient)))).one())
+
+
+async def get_patient_async(db: AsyncSession, patient_id: int) -> Optional[Patient]:
+    return await db.get(Patient, patient_id)
+
+
+async def get_patients_by_ids_async(
+    db: AsyncSession, patient_ids: List[int]
+) -> Dict[int, Patient]:
+    stmt = select(Patient).where(Patient.id.in_(patient_ids))
+    return {patient.id: patient for patient in (await db.scalars(stmt)).all()}
+
+
+async def search_patients_async(db: AsyncSession, search_term: str) -> List[Patient]:
+    if not search_term or len(search_term.strip()) < 2:
+        return []
+
+    search_term = f"%{search_term.strip()}%"
+    stmt = (
+        select(Patient)
+        .where(
+            Patient.full_name.ilike(search_term)
+            | Patient.email.ilike(search_term)
+            | Patient.dni.ilike(search_term)
+        )
+        .order_by(Patient.full_name)
+        .limit(10)
+    )
+    return list((await db.scalars(stmt)).all())
@@ -0,0 +1,171 @@
+"""
+Núcleo de cálculo de franjas con arrays NumPy de minutos epoch (int64).
+
+Los intervalos ocupados de un día se convierten una vez a dos arrays
+(`starts`, `ends`) ordenados por inicio, con `ends` como máximo acumulado. Así,
+para un candidato [s, e) basta con localizar por búsqueda binaria el último
+ocupado que empieza antes de `e`: el candidato está libre si ninguno empieza
+antes de `e` o si el mayor fin hasta ahí es <= `s`. Todos los candidatos (y
+todas las duraciones) se resuelven con operaciones vectorizadas, sin objetos
+ORM, `_naive_utc` ni `timedelta` por fila.
+
+Tanto los ocupados como los candidatos de `free_starts` se redondean hacia
+fuera al minuto (inicio hacia abajo, fin hacia arriba, este calculado desde los
+segundos exactos), así que el redondeo nunca deja libre una franja ocupada.
+`free_mask` recibe ya minutos enteros.
+
+También incluye la aritmética de intervalos del calendario de disponibilidad
+(horario abierto menos ocupados) y la generación de inicios alineados.
+"""
+
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+from typing import Iterable, List, NamedTuple, Sequence, Tuple
+
+import numpy as np
+
+_EPOCH = datetime(1970, 1, 1)
+_SECOND = timedelta(seconds=1)
+
+
+Interval = Tuple[datetime, datetime]
+
+
+class BusyArrays(NamedTuple):
+    starts: np.ndarray  # minutos epoch, orden ascendente
+    max_ends: np.ndarray  # máximo acumulado de los fines
+
+
+def _epoch_seconds(value: datetime) -> int:
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return (value - _EPOCH) // _SECOND
+
+
+def to_epoch_minutes(values: Iterable[datetime], *, ceil: bool = False) -> np.ndarray:
+    """Minutos epoch (int64) de datetimes; los naive se interpretan como UTC."""
+    # Aritmética de timedelta: bastante más rápida que np.array(..., "datetime64")
+    seconds = np.array([_epoch_seconds(v) for v in values], dtype=np.int64)
+    if ceil:
+        return -(-seconds // 60)
+    return seconds // 60
+
+
+def busy_arrays(intervals: Sequence[Tuple[datetime, datetime]]) -> BusyArrays:
+    """Prepara los intervalos ocupados `(inicio, fin)` para `free_mask`."""
+    starts = to_epoch_minutes((s for s, _ in intervals))
+    ends = to_epoch_minutes((e for _, e in intervals), ceil=True)
+    order = np.argsort(starts, kind="stable")
+    starts, ends = starts[order], ends[order]
+    max_ends = np.maximum.accumulate(ends) if len(ends) else ends
+    return BusyArrays(starts, max_ends)
+
+
+def free_mask(
+    busy: BusyArrays, starts: np.ndarray, durations: np.ndarray | int
+) -> np.ndarray:
+    """
+    Máscara de candidatos libres.
+
+    `starts` y `durations` (minutos) se combinan por broadcasting: con
+    `starts[:, None]` y un array de duraciones se obtiene la matriz
+    candidato x duración.
+    """
+    starts = np.asarray(starts, dtype=np.int64)
+    ends = starts + np.asarray(durations, dtype=np.int64)
+    if len(busy.starts) == 0:
+        return np.ones(np.broadcast(starts, ends).shape, dtype=bool)
+    idx = np.searchsorted(busy.starts, ends, side="left") - 1
+    latest_end = busy.max_ends[np.maximum(idx, 0)]
+    return (idx < 0) | (latest_end <= starts)
+
+
+def free_starts(
+    busy_intervals: Sequence[Tuple[datetime, datetime]],
+    candidates: Sequence[datetime],
+    duration_minutes: int,
+) -> List[datetime]:
+    """Candidatos (en su orden y zona originales) libres para `duration_minutes`."""
+    if not candidates:
+        return []
+    # Un inicio con segundos (10:00:30) ocupa parte del minuto siguiente al
+    # final: se redondea hacia fuera como los ocupados
+    seconds = np.array([_epoch_seconds(c) for c in candidates], dtype=np.int64)
+    starts = seconds // 60
+    ends = -(-(seconds + duration_minutes * 60) // 60)
+    mask = free_mask(busy_arrays(busy_intervals), starts, ends - starts)
+    return [cand for cand, free in zip(candidates, mask.tolist()) if free]
+
+
+def merge_intervals(intervals: Iterable[Interval]) -> List[Interval]:
+    """Ordena y fusiona intervalos solapados o contiguos."""
+    merged: List[Interval] = []
+    for start, end in sorted(intervals):
+        if start >= end:
+            continue
+        if merged and start <= merged[-1][1]:
+            if end > merged[-1][1]:
+                merged[-1] = (merged[-1][0], end)
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def intersect_intervals(a: Iterable[Interval], b: Iterable[Interval]) -> List[Interval]:
+    """Intersección de dos conjuntos de intervalos."""
+    a, b = merge_intervals(a), merge_intervals(b)
+    result: List[Interval] = []
+    i = j = 0
+    while i < len(a) and j < len(b):
+        start, end = max(a[i][0], b[j][0]), min(a[i][1], b[j][1])
+        if start < end:
+            result.append((start, end))
+        if a[i][1] < b[j][1]:
+            i += 1
+        else:
+            j += 1
+    return result
+
+
+def subtract_intervals(
+    base: Iterable[Interval], remove: Iterable[Interval]
+) -> List[Interval]:
+    """`base` menos `remove` en un único recorrido de ambas listas ordenadas."""
+    remove = merge_intervals(remove)
+    result: List[Interval] = []
+    j = 0
+    for start, end in merge_intervals(base):
+        while j < len(remove) and remove[j][1] <= start:
+            j += 1
+        cursor, k = start, j
+        while k < len(remove) and remove[k][0] < end:
+            if remove[k][0] > cursor:
+                result.append((cursor, remove[k][0]))
+            cursor = max(cursor, remove[k][1])
+            k += 1
+        if cursor < end:
+            result.append((cursor, end))
+    return result
+
+
+def slot_starts(
+    free: Iterable[Interval],
+    duration_minutes: int,
+    step_minutes: int,
+    anchor: datetime,
+) -> List[datetime]:
+    """
+    Inicios `anchor + k * step` en los que caben `duration_minutes` dentro de
+    algún intervalo libre (normalmente `anchor` es la medianoche local).
+    """
+    step = timedelta(minutes=step_minutes)
+    duration = timedelta(minutes=duration_minutes)
+    starts: List[datetime] = []
+    for start, end in free:
+        k = -((anchor - start) // step)  # primer múltiplo >= start
+        cand = anchor + k * step
+        while cand + duration <= end:
+            starts.append(cand)
+            cand += step
+    return starts
@@ -1,3 +1,5 @@
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from typing import Optional, Dict, List
 
@@ -21,6 +23,13 @@ def get_users_by_ids(db: Session, user_ids: List[str]) -> Dict[str, User]:
     return {user.id: user for user in users}
 
 
+async def get_users_by_ids_async(
+    db: AsyncSession, user_ids: List[str]
+) -> Dict[str, User]:
+    users = (await db.scalars(select(User).where(User.id.in_(user_ids)))).all()
+    return {user.id: user for user in users}
+
+
 def create_user(db: Session, data: UserCreate) -> User:
     user = User(
         email=data.email,
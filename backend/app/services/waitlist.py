@@ -0,0 +1,221 @@
+"""
+Lista de espera con relleno automático de huecos.
+
+Los pacientes registran la ventana en la que aceptarían una cita y su duración.
+Cuando una cita se cancela o se elimina, `backfill_slot` busca en una sola
+consulta (índice parcial de entradas en espera por `window_start` y
+`latest_start`) la mejor entrada que quepa en el hueco liberado
+y le reserva la cita; si sobra tiempo, sigue con la siguiente. Así los
+clientes no necesitan sondear la disponibilidad esperando un hueco.
+
+Mejor entrada: primero las que piden ese fisio, después la de mayor duración
+(aprovecha más el hueco) y, a igualdad, la más antigua.
+
+El hueco se recorre por sus tramos realmente libres (regla global: cualquier
+cita activa ocupa la franja), así una cita de otro fisio dentro del hueco no
+impide colocar entradas más cortas antes o después de ella.
+
+Las entradas cuyo último inicio posible (`latest_start`) ya pasó caducan
+(`expire_waitlist`): al rellenar un hueco y con `python -m app.services.waitlist`
+(pensado para cron).
+"""
+
+from __future__ import annotations
+
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Iterable, List, Optional
+
+from sqlalchemy import or_, update
+from sqlalchemy.orm import Session
+
+from app.models.appointment import Appointment, AppointmentType
+from app.models.waitlist import WaitlistEntry, WaitlistStatus
+from app.services.appointments import (
+    _load_busy_intervals,
+    _naive_utc,
+    create_appointment,
+    is_time_slot_available,
+)
+from app.services.scheduling import subtract_intervals
+
+logger = logging.getLogger(__name__)
+
+
+def add_to_waitlist(
+    db: Session,
+    *,
+    patient_id: str,
+    window_start: datetime,
+    window_end: datetime,
+    duration_minutes: int,
+    fisio_id: Optional[str] = None,
+    appointment_type: AppointmentType = AppointmentType.consulta,
+) -> WaitlistEntry:
+    if window_end - window_start < timedelta(minutes=duration_minutes):
+        raise ValueError("La ventana es más corta que la duración solicitada")
+    entry = WaitlistEntry(
+        patient_id=patient_id,
+        fisio_id=fisio_id,
+        window_start=window_start,
+        window_end=window_end,
+        duration_minutes=duration_minutes,
+        appointment_type=appointment_type,
+        status=WaitlistStatus.en_espera,
+    )
+    db.add(entry)
+    db.commit()
+    db.refresh(entry)
+    return entry
+
+
+def get_waitlist_entry(db: Session, entry_id: int) -> Optional[WaitlistEntry]:
+    return db.get(WaitlistEntry, entry_id)
+
+
+def list_waitlist(
+    db: Session,
+    *,
+    patient_ids: Optional[Iterable[str]] = None,
+    status: Optional[WaitlistStatus] = None,
+) -> List[WaitlistEntry]:
+    q = db.query(WaitlistEntry)
+    if patient_ids is not None:
+        q = q.filter(WaitlistEntry.patient_id.in_(list(patient_ids)))
+    if status:
+        q = q.filter(WaitlistEntry.status == status)
+    return q.order_by(WaitlistEntry.id).all()
+
+
+def cancel_waitlist_entry(db: Session, entry: WaitlistEntry) -> WaitlistEntry:
+    if entry.status != WaitlistStatus.en_espera:
+        raise ValueError("La entrada ya no está en espera")
+    entry.status = WaitlistStatus.cancelada
+    db.commit()
+    db.refresh(entry)
+    return entry
+
+
+def expire_waitlist(db: Session, *, now: Optional[datetime] = None) -> int:
+    """Marca `caducada` las entradas en espera que ya no caben en su ventana."""
+    now_n = _naive_utc(now or datetime.now(timezone.utc))
+    expired = db.execute(
+        update(WaitlistEntry)
+        .where(
+            WaitlistEntry.status == WaitlistStatus.en_espera,
+            WaitlistEntry.latest_start < now_n,
+        )
+        .values(status=WaitlistStatus.caducada)
+    ).rowcount
+    db.commit()
+    return expired
+
+
+def find_best_match(
+    db: Session, *, start: datetime, end: datetime, fisio_id: Optional[str] = None
+) -> Optional[WaitlistEntry]:
+    """Mejor entrada en espera para una cita que empiece en `start` y acabe antes de `end`."""
+    start_n, end_n = _naive_utc(start), _naive_utc(end)
+    free_minutes = int((end_n - start_n).total_seconds() // 60)
+    owner = WaitlistEntry.fisio_id.is_(None)
+    if fisio_id:
+        owner = or_(owner, WaitlistEntry.fisio_id == fisio_id)
+    return (
+        db.query(WaitlistEntry)
+        .filter(
+            WaitlistEntry.status == WaitlistStatus.en_espera,
+            WaitlistEntry.window_start <= start_n,
+            WaitlistEntry.latest_start >= start_n,
+            WaitlistEntry.duration_minutes <= free_minutes,
+            owner,
+        )
+        # Primero las del fisio (NULL al final), la más larga y la más antigua
+        .order_by(
+            WaitlistEntry.fisio_id.is_(None),
+            WaitlistEntry.duration_minutes.desc(),
+            WaitlistEntry.id,
+        )
+        .first()
+    )
+
+
+def backfill_slot(
+    db: Session, *, start: datetime, end: datetime, fisio_id: Optional[str] = None
+) -> List[Appointment]:
+    """
+    Reserva el hueco [start, end) liberado a pacientes de la lista de espera,
+    uno tras otro desde el inicio de cada tramo libre, mientras quepa alguno.
+    Devuelve las citas creadas (con las notificaciones habituales de
+    `create_appointment`).
+    """
+    now = _naive_utc(datetime.now(timezone.utc))
+    expire_waitlist(db, now=now)
+    start, end = max(_naive_utc(start), now), _naive_utc(end)
+    if start >= end:
+        return []
+    busy = _load_busy_intervals(db, window_start=start, window_end=end)
+    booked: List[Appointment] = []
+    for cursor, gap_end in subtract_intervals([(start, end)], busy):
+        while cursor < gap_end:
+            entry = find_best_match(db, start=cursor, end=gap_end, fisio_id=fisio_id)
+            if entry is None:
+                break
+            if not is_time_slot_available(
+                db,
+                start_time=cursor,
+                duration_minutes=entry.duration_minutes,
+                patient_id=entry.patient_id,
+                fisio_id=fisio_id,
+            ):
+                # Otro proceso reservó en el tramo tras cargar los ocupados:
+                # lo que queda del tramo ya no es fiable
+                break
+            # Reclamar la entrada en la misma transacción que el alta de la cita
+            # (la confirma `create_appointment`): dos cancelaciones concurrentes
+            # no pueden reservar dos veces al mismo paciente
+            claim = db.execute(
+                update(WaitlistEntry)
+                .where(
+                    WaitlistEntry.id == entry.id,
+                    WaitlistEntry.status == WaitlistStatus.en_espera,
+                )
+                .values(status=WaitlistStatus.asignada)
+            )
+            if claim.rowcount != 1:
+                # Otro proceso ya la reservó: probar con la siguiente
+                db.rollback()
+                continue
+            try:
+                ap = create_appointment(
+                    db,
+                    start_time=cursor.replace(tzinfo=timezone.utc),
+                    duration_minutes=entry.duration_minutes,
+                    patient_id=entry.patient_id,
+                    fisio_id=fisio_id,
+                    appointment_type=entry.appointment_type,
+                )
+            except ValueError:
+                # Otro proceso ocupó el hueco: se deshace también la reclamación
+                db.rollback()
+                break
+            entry.appointment_id = ap.id
+            db.commit()
+            logger.info(
+                f"Lista de espera: entrada {entry.id} -> cita {ap.id} "
+                f"({cursor.isoformat()}, fisio={fisio_id})"
+            )
+            booked.append(ap)
+            cursor += timedelta(minutes=entry.duration_minutes)
+    return booked
+
+
+def main() -> None:
+    from app.db.session import SessionLocal
+
+    with SessionLocal() as db:
+        expired = expire_waitlist(db)
+    print(f"Entradas de lista de espera caducadas: {expired}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,250 @@
+"""
+Horario de atención (clínica y fisios) y excepciones.
+
+Las reglas se guardan en hora local de la clínica (`CLINIC_TIMEZONE`). Para un
+día se resuelve el horario abierto así:
+
+1. Horario semanal de la clínica para ese día (o el horario por defecto
+   `CLINIC_DEFAULT_OPEN_HOUR`-`CLINIC_DEFAULT_CLOSE_HOUR` si la clínica no
+   tiene ninguna fila en `working_hours`).
+2. Si el fisio tiene horario semanal propio, se intersecta con el anterior.
+3. Se suman las aperturas puntuales (`is_open=True`) y se restan los cierres
+   (festivos, vacaciones, descansos), de la clínica y del fisio.
+
+El resultado son intervalos naive UTC, comparables con los ocupados de
+`appointments`.
+"""
+
+from __future__ import annotations
+
+from datetime import date, datetime, time, timedelta, timezone, tzinfo
+from functools import lru_cache
+from typing import Dict, List, Optional, Sequence
+from zoneinfo import ZoneInfo
+
+from sqlalchemy import or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.working_hours import ScheduleException, WorkingHours
+from app.services.scheduling import (
+    Interval,
+    intersect_intervals,
+    merge_intervals,
+    subtract_intervals,
+)
+
+
+@lru_cache()
+def clinic_tz() -> tzinfo:
+    return ZoneInfo(settings.CLINIC_TIMEZONE)
+
+
+def local_span(
+    day: date, start: Optional[time], end: Optional[time], tz: tzinfo
+) -> Interval:
+    """
+    Franja local de `day` como intervalo naive UTC. Sin horas es el día
+    completo; `end` 00:00 es la medianoche final del día.
+    """
+    start_dt = datetime.combine(day, start or time(0), tzinfo=tz)
+    end_day = day if end not in (None, time(0)) else day + timedelta(days=1)
+    end_dt = datetime.combine(end_day, end or time(0), tzinfo=tz)
+    return (
+        start_dt.astimezone(timezone.utc).replace(tzinfo=None),
+        end_dt.astimezone(timezone.utc).replace(tzinfo=None),
+    )
+
+
+def _weekly_intervals(
+    day: date, rules: Sequence[WorkingHours], tz: tzinfo
+) -> List[Interval]:
+    return [
+        local_span(day, r.start_time, r.end_time, tz)
+        for r in rules
+        if r.weekday == day.weekday()
+    ]
+
+
+def resolve_open_intervals(
+    day: date,
+    weekly: Sequence[WorkingHours],
+    exceptions: Sequence[ScheduleException],
+    *,
+    fisio_id: Optional[str] = None,
+    tz: Optional[tzinfo] = None,
+) -> List[Interval]:
+    """Horario abierto de `day` (naive UTC) a partir de las reglas ya cargadas."""
+    tz = tz or clinic_tz()
+    clinic_rules = [r for r in weekly if r.fisio_id is None]
+    if clinic_rules:
+        open_ = _weekly_intervals(day, clinic_rules, tz)
+    else:
+        open_ = [
+            local_span(
+                day,
+                time(settings.CLINIC_DEFAULT_OPEN_HOUR),
+                (
+                    time(settings.CLINIC_DEFAULT_CLOSE_HOUR)
+                    if settings.CLINIC_DEFAULT_CLOSE_HOUR < 24
+                    else None
+                ),
+                tz,
+            )
+        ]
+
+    fisio_rules = [r for r in weekly if fisio_id and r.fisio_id == fisio_id]
+    if fisio_rules:
+        open_ = intersect_intervals(open_, _weekly_intervals(day, fisio_rules, tz))
+
+    applicable = [
+        e
+        for e in exceptions
+        if e.date == day and (e.fisio_id is None or e.fisio_id == fisio_id)
+    ]
+    openings = [
+        local_span(day, e.start_time, e.end_time, tz) for e in applicable if e.is_open
+    ]
+    closures = [
+        local_span(day, e.start_time, e.end_time, tz)
+        for e in applicable
+        if not e.is_open
+    ]
+    return subtract_intervals(merge_intervals(open_ + openings), closures)
+
+
+def _rules_statements(date_from: date, date_to: date, fisio_ids: Sequence[str]):
+    """Consultas de reglas semanales y excepciones de la clínica y de `fisio_ids`."""
+    weekly_owner = WorkingHours.fisio_id.is_(None)
+    exception_owner = ScheduleException.fisio_id.is_(None)
+    if fisio_ids:
+        weekly_owner = or_(weekly_owner, WorkingHours.fisio_id.in_(fisio_ids))
+        exception_owner = or_(
+            exception_owner, ScheduleException.fisio_id.in_(fisio_ids)
+        )
+    return (
+        select(WorkingHours).where(weekly_owner),
+        select(ScheduleException).where(
+            exception_owner,
+            ScheduleException.date >= date_from,
+            ScheduleException.date <= date_to,
+        ),
+    )
+
+
+def _days(date_from: date, date_to: date) -> List[date]:
+    return [
+        date_from + timedelta(days=i) for i in range((date_to - date_from).days + 1)
+    ]
+
+
+async def open_calendar_async(
+    db: AsyncSession,
+    *,
+    date_from: date,
+    date_to: date,
+    fisio_id: Optional[str] = None,
+) -> Dict[date, List[Interval]]:
+    """Horario abierto por día de `[date_from, date_to]` en dos consultas."""
+    weekly_stmt, exceptions_stmt = _rules_statements(
+        date_from, date_to, [fisio_id] if fisio_id else []
+    )
+    weekly = (await db.scalars(weekly_stmt)).all()
+    exceptions = (await db.scalars(exceptions_stmt)).all()
+    tz = clinic_tz()
+    return {
+        day: resolve_open_intervals(day, weekly, exceptions, fisio_id=fisio_id, tz=tz)
+        for day in _days(date_from, date_to)
+    }
+
+
+def open_calendars(
+    db: Session, *, date_from: date, date_to: date, fisio_ids: Sequence[str]
+) -> Dict[str, List[Interval]]:
+    """
+    Horario abierto de varios fisios en `[date_from, date_to]` (dos consultas
+    para todos). Devuelve, por fisio, los intervalos de todo el rango.
+    """
+    weekly_stmt, exceptions_stmt = _rules_statements(date_from, date_to, fisio_ids)
+    weekly = db.scalars(weekly_stmt).all()
+    exceptions = db.scalars(exceptions_stmt).all()
+    tz = clinic_tz()
+    days = _days(date_from, date_to)
+    return {
+        fisio_id: [
+            span
+            for day in days
+            for span in resolve_open_intervals(
+                day, weekly, exceptions, fisio_id=fisio_id, tz=tz
+            )
+        ]
+        for fisio_id in fisio_ids
+    }
+
+
+def _owner(fisio_id: Optional[str]):
+    if fisio_id:
+        return WorkingHours.fisio_id == fisio_id
+    return WorkingHours.fisio_id.is_(None)
+
+
+def list_working_hours(db: Session, fisio_id: Optional[str] = None):
+    """Horario semanal propio del fisio, o el de la clínica sin `fisio_id`."""
+    return (
+        db.query(WorkingHours)
+        .filter(_owner(fisio_id))
+        .order_by(WorkingHours.weekday, WorkingHours.start_time)
+        .all()
+    )
+
+
+def replace_working_hours(
+    db: Session, *, fisio_id: Optional[str], slots: Sequence[dict]
+) -> List[WorkingHours]:
+    """Sustituye el horario semanal completo de la clínica o de un fisio."""
+    db.query(WorkingHours).filter(_owner(fisio_id)).delete(synchronize_session=False)
+    rows = [WorkingHours(fisio_id=fisio_id, **slot) for slot in slots]
+    db.add_all(rows)
+    db.commit()
+    return list_working_hours(db, fisio_id)
+
+
+def list_schedule_exceptions(
+    db: Session,
+    *,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    fisio_id: Optional[str] = None,
+):
+    """Excepciones del rango; con `fisio_id`, las suyas y las de la clínica."""
+    q = db.query(ScheduleException)
+    if fisio_id:
+        q = q.filter(
+            or_(
+                ScheduleException.fisio_id.is_(None),
+                ScheduleException.fisio_id == fisio_id,
+            )
+        )
+    if date_from:
+        q = q.filter(ScheduleException.date >= date_from)
+    if date_to:
+        q = q.filter(ScheduleException.date <= date_to)
+    return q.order_by(ScheduleException.date, ScheduleException.id).all()
+
+
+def create_schedule_exception(db: Session, **data) -> ScheduleException:
+    exc = ScheduleException(**data)
+    db.add(exc)
+    db.commit()
+    db.refresh(exc)
+    return exc
+
+
+def delete_schedule_exception(db: Session, exception_id: int) -> bool:
+    exc = db.get(ScheduleException, exception_id)
+    if exc is None:
+        return False
+    db.delete(exc)
+    db.commit()
+    return True
@@ -0,0 +1,161 @@
+"""
+Motor de asignación de fisio: un mes de citas pendientes para 50 fisios.
+
+Uso (desde backend/):
+
+    python benchmarks/bench_assignment.py --fisios 50 --appointments 8000 --pending 3000
+
+Siembra una clínica con `datagen` (solo citas futuras, 30 días) en una SQLite
+temporal o en `BENCH_DATABASE_URL` (se vacía), añade `--pending` citas sin fisio
+repartidas en el mes (08:00-18:00 Bogotá, lunes a sábado) y mide por separado la carga de datos (pendientes, agendas y horarios) y el cálculo del
+plan de `plan_assignments`. Compara el reparto con una asignación ingenua
+"primer fisio libre": minutos asignados por fisio (mín./máx./desviación).
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import timedelta, timezone
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+_tmp_db = Path(tempfile.gettempdir()) / "fisiomove_bench_assignment.db"
+os.environ["DATABASE_URL"] = os.getenv("BENCH_DATABASE_URL", f"sqlite:///{_tmp_db}")
+os.environ.setdefault("SUPABASE_URL", "http://localhost:9999")
+os.environ.setdefault("SUPABASE_API_KEY", "bench")
+
+from benchmarks.bench_serialization import timed  # noqa: E402
+from benchmarks.datagen import (  # noqa: E402
+    CLOSE_HOUR,
+    DURATIONS,
+    OPEN_HOUR,
+    ClinicSpec,
+    generate_clinic,
+)
+
+from app.db.base import Base  # noqa: E402
+from app.db.session import SessionLocal, engine  # noqa: E402
+from app.models.appointment import Appointment, AppointmentStatus  # noqa: E402
+from app.services.appointments import _naive_utc  # noqa: E402
+from app.services.assignment import (  # noqa: E402
+    PendingSlot,
+    load_agendas,
+    load_pending,
+    plan_assignments,
+)
+
+
+def insert_pending(db, data, n: int, days: int, seed: int = 7) -> None:
+    rng = random.Random(seed)
+    workdays = [
+        data.anchor + timedelta(days=d)
+        for d in range(1, days)
+        if (data.anchor + timedelta(days=d)).weekday() < 6
+    ]
+    rows = []
+    for _ in range(n):
+        duration = rng.choices(*DURATIONS)[0]
+        latest = (CLOSE_HOUR - OPEN_HOUR) * 60 - duration
+        start = rng.choice(workdays) + timedelta(
+            hours=OPEN_HOUR, minutes=rng.randrange(0, latest + 1, 15)
+        )
+        rows.append(
+            {
+                "start_time": start.astimezone(timezone.utc),
+                "end_time": (start + timedelta(minutes=duration)).astimezone(
+                    timezone.utc
+                ),
+                "duration_minutes": duration,
+                "patient_id": str(rng.choice(data.patient_ids)),
+                "fisio_id": None,
+                "status": AppointmentStatus.programada,
+            }
+        )
+    db.bulk_insert_mappings(Appointment, rows)
+    db.commit()
+
+
+def first_fit(pending, agendas):
+    """Referencia: primer fisio en horario y libre, sin mirar la carga."""
+    plan = {}
+    for p in sorted(pending, key=lambda p: p.start):
+        for a in agendas:
+            if a.is_open(p.start, p.end) and a.is_free(p.start, p.end):
+                a.book(p.start, p.end)
+                plan[p.appointment_id] = a.fisio_id
+                break
+    return plan
+
+
+def balance(agendas) -> str:
+    loads = [a.load for a in agendas]
+    return (
+        f"min={min(loads):>6.0f}  max={max(loads):>6.0f}  "
+        f"desv={statistics.pstdev(loads):>6.0f} min/fisio"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--fisios", type=int, default=50)
+    parser.add_argument("--appointments", type=int, default=8_000)
+    parser.add_argument("--pending", type=int, default=3_000)
+    parser.add_argument("--days", type=int, default=30)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    spec = ClinicSpec(
+        patients=2_000,
+        fisios=args.fisios,
+        appointments=args.appointments,
+        days_back=0,
+        days_ahead=args.days,
+    )
+    t0 = time.perf_counter()
+    with SessionLocal() as db:
+        data = generate_clinic(db, spec)
+        insert_pending(db, data, args.pending, args.days)
+    print(f"sembrado en {time.perf_counter() - t0:.1f}s (ancla {data.anchor:%Y-%m-%d})")
+
+    with SessionLocal() as db:
+
+        def load():
+            appointments = load_pending(db, window_start=data.anchor)
+            pending = [
+                PendingSlot(a.id, _naive_utc(a.start_time), _naive_utc(a.end_time))
+                for a in appointments
+            ]
+            return pending, load_agendas(db, pending)
+
+        load_s, (pending, agendas) = timed(load, args.repeat)
+        print(f"{len(pending)} pendientes, {len(agendas)} fisios")
+        print(f"carga de datos         {load_s * 1000:>9.1f} ms")
+        print(f"carga inicial          {balance(agendas)}")
+
+        plan_s, plan = timed(lambda: plan_assignments(pending, load()[1]), args.repeat)
+        print(f"plan (incl. carga)     {plan_s * 1000:>9.1f} ms  asignadas={len(plan)}")
+
+        agendas = load()[1]
+        t0 = time.perf_counter()
+        plan = plan_assignments(pending, agendas)
+        print(f"plan (solo cálculo)    {(time.perf_counter() - t0) * 1000:>9.1f} ms")
+        print(f"equilibrado            {balance(agendas)}")
+
+        agendas = load()[1]
+        naive = first_fit(pending, agendas)
+        print(f"primer libre           {balance(agendas)}  asignadas={len(naive)}")
+
+
+if __name__ == "__main__":
+    main()
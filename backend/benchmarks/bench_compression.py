@@ -0,0 +1,116 @@
+"""
+Coste de CPU frente a bytes ahorrados al comprimir respuestas JSON de listados.
+
+Uso (desde backend/):
+
+    python benchmarks/bench_compression.py --appointments 1000 --patients 1000
+
+Serializa N citas (`AppointmentRead`) y N pacientes (`PatientRead`) como lo hace
+`json_list_response` y mide, para cada codificación y nivel, el tiempo de
+compresión, el tamaño resultante y el tiempo de transferencia ahorrado en un
+enlace lento (`--link-mbps`, por defecto 10 Mbit/s, un móvil 4G modesto). Una
+fila compensa cuando `ahorro_ms` es mayor que `cpu_ms`.
+
+brotli solo se mide si el paquete está instalado.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+os.environ.setdefault("SUPABASE_URL", "http://localhost:9999")
+os.environ.setdefault("SUPABASE_API_KEY", "bench")
+
+from benchmarks.bench_serialization import build, make_fixture, timed  # noqa: E402
+
+import app.models  # noqa: E402,F401
+from app.compression import GzipEncoder, brotli  # noqa: E402
+from app.core.responses import json_list_response  # noqa: E402
+from app.models.patient import Patient  # noqa: E402
+from app.schemas.appointments import AppointmentRead  # noqa: E402
+from app.schemas.patients import PatientRead  # noqa: E402
+
+GZIP_LEVELS = (1, 4, 6, 9)
+BROTLI_QUALITIES = (1, 4, 6, 11)
+
+
+def appointments_payload(n: int) -> bytes:
+    items = build(*make_fixture(n))
+    return json_list_response(AppointmentRead, items).body
+
+
+def patients_payload(n: int) -> bytes:
+    created = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    patients = [
+        Patient(
+            id=i,
+            full_name=f"Paciente Número {i}",
+            email=f"paciente{i}@example.com",
+            phone=f"+57 300 {i:07d}",
+            dni=f"CC-{10_000_000 + i}",
+            gender="F" if i % 2 else "M",
+            blood_type="O+",
+            is_active=True,
+            created_at=created,
+            updated_at=created,
+        )
+        for i in range(1, n + 1)
+    ]
+    return json_list_response(PatientRead, patients, from_attributes=True).body
+
+
+def encoders():
+    for level in GZIP_LEVELS:
+        yield f"gzip-{level}", lambda lvl=level: GzipEncoder(lvl)
+    if brotli is not None:
+        from app.compression import BrotliEncoder
+
+        for quality in BROTLI_QUALITIES:
+            yield f"br-{quality}", lambda q=quality: BrotliEncoder(q)
+
+
+def compress(factory, payload: bytes) -> bytes:
+    encoder = factory()
+    return encoder.compress(payload) + encoder.finish()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--appointments", type=int, default=1000)
+    parser.add_argument("--patients", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--link-mbps", type=float, default=10.0)
+    args = parser.parse_args()
+
+    bytes_per_ms = args.link_mbps * 1_000_000 / 8 / 1000
+    payloads = [
+        (f"{args.appointments} citas", appointments_payload(args.appointments)),
+        (f"{args.patients} pacientes", patients_payload(args.patients)),
+    ]
+    if brotli is None:
+        print("brotli no instalado: solo se mide gzip")
+    for name, payload in payloads:
+        print(f"\n{name}: {len(payload)} bytes sin comprimir")
+        print(
+            f"{'codificación':<14}{'cpu_ms':>9}{'bytes':>10}{'ratio':>8}{'ahorro_ms':>11}"
+        )
+        for label, factory in encoders():
+            cpu_s, body = timed(lambda: compress(factory, payload), args.repeat)
+            saved_ms = (len(payload) - len(body)) / bytes_per_ms
+            print(
+                f"{label:<14}{cpu_s * 1000:>9.2f}{len(body):>10}"
+                f"{len(payload) / len(body):>8.1f}{saved_ms:>11.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+"""
+Coste de construir y serializar la respuesta de `GET /appointments/` por cada
+1000 citas, antes y después de la ruta rápida (`app.core.responses`).
+
+Uso (desde backend/):
+
+    python benchmarks/bench_serialization.py --appointments 1000 --repeat 20
+
+Sin BD: citas, pacientes y fisios son objetos ORM en memoria. La construcción
+de los `AppointmentRead` (helpers del servicio) es común a todas las rutas; lo
+que cambia es la serialización:
+
+- antes: ruta estándar de FastAPI (`serialize_response`: model_dump,
+  revalidación contra `response_model`, conversión a tipos JSON) +
+  `JSONResponse` (json.dumps de la stdlib).
+- orjson: igual, pero renderizando con `ORJSONResponse` (clase por defecto).
+- después: `json_list_response` (pydantic-core serializa directamente a bytes
+  los modelos ya validados, sin revalidar).
+
+`model_construct` no se usa para construir: con pydantic 2.8 es más lento que
+la validación en Rust para modelos de este tamaño.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+os.environ.setdefault("SUPABASE_URL", "http://localhost:9999")
+os.environ.setdefault("SUPABASE_API_KEY", "bench")
+
+from fastapi.responses import JSONResponse, ORJSONResponse  # noqa: E402
+from fastapi.routing import serialize_response  # noqa: E402
+from fastapi.utils import create_model_field  # noqa: E402
+
+import app.models  # noqa: E402,F401
+from app.core.responses import json_list_response  # noqa: E402
+from app.models.appointment import (  # noqa: E402
+    Appointment,
+    AppointmentStatus,
+    AppointmentType,
+)
+from app.models.patient import Patient  # noqa: E402
+from app.models.user import User, UserRole  # noqa: E402
+from app.schemas.appointments import AppointmentRead  # noqa: E402
+from app.services.appointments import (  # noqa: E402
+    _create_appointment_read,
+    _create_fisio_info,
+    _create_patient_info,
+)
+
+RESPONSE_FIELD = create_model_field(
+    "Response_list_citas", list[AppointmentRead], mode="serialization"
+)
+
+
+def make_fixture(n: int):
+    start = datetime(2025, 3, 3, 13, 0, tzinfo=timezone.utc)
+    patients = {
+        i: Patient(id=i, full_name=f"Paciente Número {i}", email=f"p{i}@example.com")
+        for i in range(1, 201)
+    }
+    fisios = {
+        i: User(
+            id=i,
+            first_name=f"Fisio{i}",
+            last_name="Apellido",
+            email=f"f{i}@example.com",
+            role=UserRole.fisioterapeuta,
+        )
+        for i in range(1, 21)
+    }
+    appointments = [
+        Appointment(
+            id=i,
+            start_time=start + timedelta(minutes=30 * i),
+            duration_minutes=60,
+            patient_id=str(i % 200 + 1),
+            fisio_id=str(i % 20 + 1),
+            appointment_type=AppointmentType.fisioterapia,
+            status=AppointmentStatus.programada,
+            created_at=start,
+            updated_at=start,
+        )
+        for i in range(n)
+    ]
+    return appointments, patients, fisios
+
+
+def build(appointments, patients, fisios):
+    return [
+        _create_appointment_read(
+            ap, _create_patient_info(ap, patients), _create_fisio_info(ap, fisios)
+        )
+        for ap in appointments
+    ]
+
+
+def fastapi_render(items, response_class) -> bytes:
+    content = asyncio.run(
+        serialize_response(field=RESPONSE_FIELD, response_content=items)
+    )
+    return response_class(content).body
+
+
+def timed(fn, repeat: int):
+    samples = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = fn()
+        samples.append(time.perf_counter() - t0)
+    return statistics.median(samples), result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--appointments", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    fixture = make_fixture(args.appointments)
+    scale = 1000 / args.appointments
+    build_s, items = timed(lambda: build(*fixture), args.repeat)
+
+    rows = [
+        ("antes (FastAPI + JSONResponse)", lambda: fastapi_render(items, JSONResponse)),
+        (
+            "orjson (FastAPI + ORJSONResponse)",
+            lambda: fastapi_render(items, ORJSONResponse),
+        ),
+        (
+            "después (json_list_response)",
+            lambda: json_list_response(AppointmentRead, items).body,
+        ),
+    ]
+    print(f"ms por 1000 citas (mediana de {args.repeat} repeticiones)")
+    print(f"construcción de AppointmentRead: {build_s * 1000 * scale:.2f} ms")
+    print(f"{'serialización':<38}{'ms':>9}{'bytes':>10}")
+    for label, render in rows:
+        render_s, body = timed(render, args.repeat)
+        print(f"{label:<38}{render_s * 1000 * scale:>9.2f}{len(body):>10}")
+
+
+if __name__ == "__main__":
+    main()
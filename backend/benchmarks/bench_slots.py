@@ -0,0 +1,104 @@
+"""
+Cálculo de franjas libres: bucle Python frente a arrays NumPy de minutos epoch.
+
+Uso (desde backend/):
+
+    python benchmarks/bench_slots.py --intervals 10000 --candidates 1000
+
+Genera `--intervals` citas ocupadas aleatorias (semilla fija, ~2 h de ventana
+por cita, así que parte de los candidatos queda libre) y `--candidates` inicios
+repartidos en la misma ventana, y compara el bucle anterior del filtrado de
+franjas (un `any()` sobre todos los ocupados por candidato) con `free_starts`
+(conversión + `searchsorted`), que usan la disponibilidad y la validación de
+series. También mide la
+matriz candidato x duración de `free_mask` para varias duraciones a la vez.
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+import numpy as np  # noqa: E402
+
+from benchmarks.bench_serialization import timed  # noqa: E402
+
+from app.services.scheduling import (  # noqa: E402
+    busy_arrays,
+    free_mask,
+    free_starts,
+    to_epoch_minutes,
+)
+
+BASE = datetime(2030, 1, 7, 13, 0)
+DURATIONS = (15, 30, 45, 60, 90, 120)
+
+
+def make_fixture(intervals: int, candidates: int, seed: int = 42):
+    rng = random.Random(seed)
+    window = intervals * 120
+    busy = []
+    for _ in range(intervals):
+        start = BASE + timedelta(minutes=rng.randrange(0, window))
+        busy.append((start, start + timedelta(minutes=rng.choice(DURATIONS))))
+    step = max(15, window // candidates // 15 * 15)
+    cands = [BASE + timedelta(minutes=step * i) for i in range(candidates)]
+    return busy, cands
+
+
+def python_loop(busy, candidates, duration_minutes: int):
+    available = []
+    for cand in candidates:
+        end = cand + timedelta(minutes=duration_minutes)
+        if not any(cand < b_end and end > b_start for b_start, b_end in busy):
+            available.append(cand)
+    return available
+
+
+def duration_matrix(busy, candidates):
+    return free_mask(
+        busy_arrays(busy),
+        to_epoch_minutes(candidates)[:, None],
+        np.array(DURATIONS),
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--intervals", type=int, default=10_000)
+    parser.add_argument("--candidates", type=int, default=1_000)
+    parser.add_argument("--duration", type=int, default=60)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    busy, cands = make_fixture(args.intervals, args.candidates)
+
+    print(f"{args.intervals} ocupados x {args.candidates} candidatos")
+    print(f"{'método':<28}{'ms':>10}{'libres':>8}")
+    loop_s, expected = timed(
+        lambda: python_loop(busy, cands, args.duration), args.repeat
+    )
+    numpy_s, result = timed(
+        lambda: free_starts(busy, cands, args.duration), args.repeat
+    )
+    assert result == expected, "free_starts difiere del bucle de referencia"
+    print(f"{'python any()':<28}{loop_s * 1000:>10.2f}{len(expected):>8}")
+    print(f"{'numpy free_starts':<28}{numpy_s * 1000:>10.2f}{len(result):>8}")
+    print(f"{'  speedup':<28}{loop_s / numpy_s:>10.1f}x")
+
+    matrix_s, mask = timed(lambda: duration_matrix(busy, cands), args.repeat)
+    print(
+        f"{f'numpy matriz x{len(DURATIONS)} duraciones':<28}"
+        f"{matrix_s * 1000:>10.2f}{int(mask.sum()):>8}"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+"""
+Compara el throughput de los servicios sync (Session + threadpool) frente a
+sus versiones async (AsyncSession + event loop) sobre la misma base de datos.
+
+Uso (desde backend/):
+
+    python benchmarks/bench_sync_vs_async.py --requests 2000 --concurrency 200
+    BENCH_DATABASE_URL=postgresql://... python benchmarks/bench_sync_vs_async.py
+
+El threadpool sync usa 40 hilos, el mismo límite por defecto que FastAPI/anyio
+aplica a los endpoints `def`. Con SQLite el modo async suele salir peor
+(aiosqlite ejecuta cada conexión en un hilo); la comparación relevante es
+contra Postgres, donde asyncpg no ocupa hilos mientras espera I/O.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+_tmp_db = Path(tempfile.gettempdir()) / "fisiomove_bench_async.db"
+DB_URL = os.getenv("BENCH_DATABASE_URL", f"sqlite:///{_tmp_db}")
+os.environ.setdefault("DATABASE_URL", DB_URL)
+os.environ.setdefault("SUPABASE_URL", "http://localhost:9999")
+os.environ.setdefault("SUPABASE_API_KEY", "bench")
+
+from sqlalchemy.ext.asyncio import async_sessionmaker  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+
+import app.models  # noqa: E402,F401
+from app.db.base import Base  # noqa: E402
+from app.db.session import create_async_db_engine, create_db_engine  # noqa: E402
+from app.models.patient import Patient  # noqa: E402
+from app.models.terapia import Terapia  # noqa: E402
+from app.services.dashboard import (  # noqa: E402
+    get_dashboard_summary,
+    get_dashboard_summary_async,
+)
+from app.services.patients import search_patients, search_patients_async  # noqa: E402
+
+THREADPOOL_SIZE = 40
+
+SCENARIOS = {
+    "search_patients": (
+        lambda db: search_patients(db, "Paciente 1"),
+        lambda db: search_patients_async(db, "Paciente 1"),
+    ),
+    "dashboard_summary": (get_dashboard_summary, get_dashboard_summary_async),
+}
+
+
+def seed(engine, patients: int) -> None:
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    Session = sessionmaker(bind=engine)
+    with Session() as db:
+        db.add_all(
+            Patient(full_name=f"Paciente {i}", dni=f"{10000000 + i}")
+            for i in range(patients)
+        )
+        db.add(Terapia(name="TENS", is_active=True))
+        db.commit()
+
+
+def run_sync(engine, fn, requests: int) -> float:
+    Session = sessionmaker(bind=engine)
+
+    def one(_):
+        with Session() as db:
+            fn(db)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=THREADPOOL_SIZE) as pool:
+        list(pool.map(one, range(requests)))
+    return time.perf_counter() - start
+
+
+async def run_async(fn, requests: int, concurrency: int) -> float:
+    # Un engine por event loop: las conexiones async quedan ligadas a su loop
+    async_engine = create_async_db_engine(DB_URL)
+    Session = async_sessionmaker(async_engine, expire_on_commit=False)
+    sem = asyncio.Semaphore(concurrency)
+
+    async def one():
+        async with sem, Session() as db:
+            await fn(db)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(requests)))
+    elapsed = time.perf_counter() - start
+    await async_engine.dispose()
+    return elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--patients", type=int, default=2000)
+    args = parser.parse_args()
+
+    engine = create_db_engine(DB_URL)
+    seed(engine, args.patients)
+
+    print(f"db={engine.url.render_as_string(hide_password=True)}")
+    print(f"{'scenario':<20}{'mode':<8}{'req/s':>10}{'total s':>10}")
+    for name, (sync_fn, async_fn) in SCENARIOS.items():
+        sync_elapsed = run_sync(engine, sync_fn, args.requests)
+        async_elapsed = asyncio.run(
+            run_async(async_fn, args.requests, args.concurrency)
+        )
+        for mode, elapsed in (("sync", sync_elapsed), ("async", async_elapsed)):
+            print(
+                f"{name:<20}{mode:<8}{args.requests / elapsed:>10.1f}{elapsed:>10.2f}"
+            )
+
+    engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,286 @@
+"""
+Generador determinista de datos sintéticos de la clínica para los benchmarks.
+
+Con la misma semilla y los mismos tamaños produce exactamente las mismas filas,
+de modo que los resultados de distintos commits son comparables. Las
+distribuciones imitan la agenda real:
+
+- Citas de lunes a sábado (sábado con la mitad de carga), 08:00-18:00 Bogotá,
+  con picos a media mañana y a última hora de la tarde.
+- Duraciones 30/45/60/90 min, con 60 min como la más habitual.
+- Carga por fisio sesgada (unos pocos concentran la agenda) y pacientes
+  crónicos que acumulan muchas visitas.
+- Estados según la fecha: pasadas mayormente completadas, futuras programadas.
+- ~5 % de citas sin fisio asignado (pendientes de asignación).
+
+Las citas de un mismo fisio no se solapan entre sí.
+"""
+
+from __future__ import annotations
+
+import random
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Set, Tuple
+
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from app.models.appointment import Appointment, AppointmentStatus, AppointmentType
+from app.models.notification import Notification
+from app.models.patient import Patient
+from app.models.terapia import Terapia
+from app.models.user import User, UserRole
+from app.schemas.notifications import NotificationType
+
+BOGOTA = timezone(timedelta(hours=-5))
+SLOT_MINUTES = 15
+OPEN_HOUR, CLOSE_HOUR = 8, 18
+
+# Pesos por franja horaria (hora local -> peso relativo)
+HOUR_WEIGHTS = {8: 3, 9: 5, 10: 6, 11: 5, 12: 2, 13: 2, 14: 4, 15: 5, 16: 6, 17: 4}
+WEEKDAY_WEIGHTS = {0: 1.0, 1: 1.0, 2: 1.0, 3: 1.0, 4: 0.9, 5: 0.5, 6: 0.0}
+DURATIONS = ([30, 45, 60, 90], [3, 2, 4, 1])
+TYPES = (
+    [
+        AppointmentType.fisioterapia,
+        AppointmentType.rehabilitacion,
+        AppointmentType.seguimiento,
+        AppointmentType.consulta,
+        AppointmentType.evaluacion_inicial,
+    ],
+    [40, 25, 15, 15, 5],
+)
+PAST_STATUSES = (
+    [
+        AppointmentStatus.completada,
+        AppointmentStatus.cancelada,
+        AppointmentStatus.no_show,
+    ],
+    [85, 10, 5],
+)
+FUTURE_STATUSES = (
+    [
+        AppointmentStatus.programada,
+        AppointmentStatus.confirmada,
+        AppointmentStatus.cancelada,
+    ],
+    [65, 25, 10],
+)
+UNASSIGNED_RATIO = 0.05
+FIRST_NAMES = ["Ana", "Luis", "María", "Carlos", "Laura", "Andrés", "Sofía", "Juan"]
+LAST_NAMES = ["Gómez", "Rodríguez", "Martínez", "López", "Díaz", "Pérez", "Rojas"]
+
+_BATCH = 5_000
+
+
+@dataclass(frozen=True)
+class ClinicSpec:
+    patients: int = 1_000
+    fisios: int = 20
+    admins: int = 2
+    appointments: int = 10_000
+    # Ventana de la agenda alrededor de `anchor` (días hacia atrás / adelante)
+    days_back: int = 60
+    days_ahead: int = 30
+    seed: int = 42
+    anchor: Optional[datetime] = None
+
+
+@dataclass
+class ClinicData:
+    spec: ClinicSpec
+    anchor: datetime
+    patient_ids: List[int] = field(default_factory=list)
+    fisio_ids: List[int] = field(default_factory=list)
+    admin_ids: List[int] = field(default_factory=list)
+    appointment_ids: List[int] = field(default_factory=list)
+    notifications: int = 0
+
+
+def _bulk_insert(db: Session, model, rows: List[dict]) -> None:
+    for i in range(0, len(rows), _BATCH):
+        db.execute(insert(model), rows[i : i + _BATCH])
+
+
+def _person_name(rng: random.Random, i: int) -> Tuple[str, str]:
+    return rng.choice(FIRST_NAMES), f"{rng.choice(LAST_NAMES)} {i}"
+
+
+def _day_slots(rng: random.Random, day: datetime, weights) -> List[datetime]:
+    """Franjas de inicio de un día, ordenadas por preferencia aleatoria ponderada."""
+    slots = [
+        day.replace(hour=h, minute=m)
+        for h in range(OPEN_HOUR, CLOSE_HOUR)
+        for m in range(0, 60, SLOT_MINUTES)
+    ]
+    keys = [rng.random() ** (1.0 / weights[s.hour]) for s in slots]
+    return [s for _, s in sorted(zip(keys, slots), reverse=True)]
+
+
+def generate_clinic(db: Session, spec: ClinicSpec = ClinicSpec()) -> ClinicData:
+    """Inserta la clínica sintética en `db` (que debe estar vacía) y hace commit."""
+    rng = random.Random(spec.seed)
+    anchor = spec.anchor or datetime.now(BOGOTA).replace(
+        hour=0, minute=0, second=0, microsecond=0
+    )
+    data = ClinicData(spec=spec, anchor=anchor)
+
+    users = []
+    for role, n in (
+        (UserRole.admin, spec.admins),
+        (UserRole.fisioterapeuta, spec.fisios),
+    ):
+        for i in range(n):
+            first, last = _person_name(rng, i)
+            users.append(
+                {
+                    "email": f"{role.value}{i}@bench.example.com",
+                    "first_name": first,
+                    "last_name": last,
+                    "full_name": f"{first} {last}",
+                    "role": role,
+                    "is_active": True,
+                    "hashed_password": "!",
+                }
+            )
+    _bulk_insert(db, User, users)
+
+    patients = []
+    for i in range(spec.patients):
+        first, last = _person_name(rng, i)
+        patients.append(
+            {
+                "full_name": f"{first} {last}",
+                "email": f"paciente{i}@bench.example.com",
+                "dni": str(10_000_000 + i),
+                "phone": f"3{rng.randint(100000000, 199999999)}",
+                "gender": rng.choice(["F", "M"]),
+                "is_active": rng.random() > 0.03,
+            }
+        )
+    _bulk_insert(db, Patient, patients)
+    _bulk_insert(
+        db,
+        Terapia,
+        [
+            {"name": name, "is_active": True}
+            for name in ("TENS", "Ultrasonido", "Calor")
+        ],
+    )
+    db.flush()
+
+    for u_id, role in db.query(User.id, User.role).order_by(User.id):
+        target = data.admin_ids if role == UserRole.admin else data.fisio_ids
+        target.append(u_id)
+    data.patient_ids = [p for (p,) in db.query(Patient.id).order_by(Patient.id)]
+
+    rows = _appointment_rows(rng, spec, anchor, data)
+    _bulk_insert(db, Appointment, rows)
+    db.flush()
+    data.appointment_ids = [
+        a for (a,) in db.query(Appointment.id).order_by(Appointment.id)
+    ]
+
+    data.notifications = _insert_notifications(db, rng, data, rows)
+    db.commit()
+    return data
+
+
+def _appointment_rows(
+    rng: random.Random, spec: ClinicSpec, anchor: datetime, data: ClinicData
+) -> List[dict]:
+    days = [
+        anchor + timedelta(days=d)
+        for d in range(-spec.days_back, spec.days_ahead)
+        if WEEKDAY_WEIGHTS[(anchor + timedelta(days=d)).weekday()] > 0
+    ]
+    day_weights = [WEEKDAY_WEIGHTS[d.weekday()] for d in days]
+    # Carga por fisio ~ Zipf suave; pacientes crónicos ~ Pareto
+    fisio_weights = [1.0 / (rank + 1) ** 0.7 for rank in range(len(data.fisio_ids))]
+    patient_weights = [rng.paretovariate(1.5) for _ in data.patient_ids]
+
+    # Ocupación por fisio: conjunto de franjas de 15 min ya tomadas
+    busy: Dict[Optional[int], Set[datetime]] = {f: set() for f in data.fisio_ids}
+    slot_cache: Dict[datetime, List[datetime]] = {}
+    rows: List[dict] = []
+    attempts = 0
+    while len(rows) < spec.appointments and attempts < spec.appointments * 20:
+        attempts += 1
+        day = rng.choices(days, day_weights)[0]
+        duration = rng.choices(*DURATIONS)[0]
+        fisio = None
+        if rng.random() >= UNASSIGNED_RATIO and data.fisio_ids:
+            fisio = rng.choices(data.fisio_ids, fisio_weights)[0]
+        if day not in slot_cache:
+            slot_cache[day] = _day_slots(rng, day, HOUR_WEIGHTS)
+        start = _pick_start(rng, slot_cache[day], busy.get(fisio), duration)
+        if start is None:
+            continue
+        status_pool = PAST_STATUSES if start < anchor else FUTURE_STATUSES
+        rows.append(
+            {
+                "start_time": start.astimezone(timezone.utc),
+                "end_time": (start + timedelta(minutes=duration)).astimezone(
+                    timezone.utc
+                ),
+                "duration_minutes": duration,
+                "patient_id": str(rng.choices(data.patient_ids, patient_weights)[0]),
+                "fisio_id": str(fisio) if fisio is not None else None,
+                "appointment_type": rng.choices(*TYPES)[0],
+                "status": rng.choices(*status_pool)[0],
+            }
+        )
+    rows.sort(key=lambda r: r["start_time"])
+    return rows
+
+
+def _pick_start(
+    rng: random.Random,
+    slots: List[datetime],
+    taken: Optional[Set[datetime]],
+    duration: int,
+) -> Optional[datetime]:
+    # Empieza en un punto aleatorio de la lista ordenada por preferencia
+    offset = min(int(rng.expovariate(0.15)), len(slots) - 1)
+    steps = -(-duration // SLOT_MINUTES)
+    for start in slots[offset:] + slots[:offset]:
+        cells = [start + timedelta(minutes=SLOT_MINUTES * k) for k in range(steps)]
+        if cells[-1].hour >= CLOSE_HOUR:
+            continue
+        if taken is None:
+            return start
+        if not any(c in taken for c in cells):
+            taken.update(cells)
+            return start
+    return None
+
+
+def _insert_notifications(
+    db: Session, rng: random.Random, data: ClinicData, rows: List[dict]
+) -> int:
+    """Una notificación por destinatario y cita, como hacen los servicios."""
+    notifications = []
+    for ap_id, row in zip(data.appointment_ids, rows):
+        if row["fisio_id"] is None:
+            recipients = data.admin_ids + data.fisio_ids
+            ntype = NotificationType.CITA_PENDIENTE_ASIGNACION
+        else:
+            recipients = [int(row["fisio_id"])]
+            ntype = NotificationType.CITA_ASIGNADA
+        created = row["start_time"].replace(tzinfo=None) - timedelta(days=3)
+        for user_id in recipients:
+            notifications.append(
+                {
+                    "type": ntype.value,
+                    "message": f"Cita #{ap_id}",
+                    "user_id": user_id,
+                    "is_read": created
+                    < data.anchor.replace(tzinfo=None) - timedelta(days=7)
+                    or rng.random() < 0.3,
+                    "created_at": created,
+                    "related_appointment_id": ap_id,
+                }
+            )
+    _bulk_insert(db, Notification, notifications)
+    return len(notifications)
@@ -0,0 +1,280 @@
+"""
+Servidor GoTrue (Supabase Auth) falso para pruebas de carga locales.
+
+Implementa en memoria los endpoints que usa `supabase_utils.gotrue`:
+
+    POST   /auth/v1/signup
+    POST   /auth/v1/token?grant_type=password|refresh_token
+    GET    /auth/v1/user            PUT /auth/v1/user
+    POST   /auth/v1/logout
+    GET    /auth/v1/settings
+    GET    /auth/v1/admin/users?email=...
+    POST   /auth/v1/admin/users
+    GET|PATCH|PUT|DELETE /auth/v1/admin/users/{id}
+
+Cada respuesta se retrasa `latency_ms` más una cola exponencial de media
+`jitter_ms` (las colas largas de un servicio externo son lo que más afecta a
+los percentiles altos de la API). `error_rate` inyecta respuestas 503.
+No valida contraseñas más allá de compararlas ni firma tokens: sólo sirve
+para pruebas.
+
+Uso (desde backend/):
+
+    python benchmarks/fake_gotrue.py --port 9999 --latency-ms 40 --jitter-ms 20
+    SUPABASE_URL=http://127.0.0.1:9999 SUPABASE_SERVICE_ROLE_KEY=fake \\
+        uvicorn app.main:app --port 8000
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import random
+import secrets
+import threading
+import time
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, Response
+
+TOKEN_TTL_SECONDS = 3600
+
+
+@dataclass
+class FakeGoTrueConfig:
+    latency_ms: float = 0.0
+    jitter_ms: float = 0.0
+    error_rate: float = 0.0
+    seed: Optional[int] = None
+
+
+@dataclass
+class _Store:
+    users: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+    passwords: Dict[str, str] = field(default_factory=dict)
+    by_email: Dict[str, str] = field(default_factory=dict)
+    access_tokens: Dict[str, str] = field(default_factory=dict)
+    refresh_tokens: Dict[str, str] = field(default_factory=dict)
+    lock: threading.Lock = field(default_factory=threading.Lock)
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+def _error(status: int, code: str, message: str) -> JSONResponse:
+    return JSONResponse(
+        status_code=status, content={"code": status, "error_code": code, "msg": message}
+    )
+
+
+def create_app(config: FakeGoTrueConfig = FakeGoTrueConfig()) -> FastAPI:
+    app = FastAPI(title="fake-gotrue", docs_url=None, redoc_url=None)
+    store = _Store()
+    rng = random.Random(config.seed)
+    app.state.store = store
+    app.state.config = config
+
+    @app.middleware("http")
+    async def simulate_network(request: Request, call_next):
+        delay = config.latency_ms
+        if config.jitter_ms > 0:
+            delay += rng.expovariate(1.0 / config.jitter_ms)
+        if delay > 0:
+            await asyncio.sleep(delay / 1000)
+        if config.error_rate and rng.random() < config.error_rate:
+            return _error(503, "unavailable", "Error inyectado por fake_gotrue")
+        return await call_next(request)
+
+    def create_user(
+        email: str,
+        password: str,
+        metadata: Optional[dict],
+        *,
+        user_id: Optional[str] = None,
+        confirmed: bool = True,
+    ) -> Optional[Dict[str, Any]]:
+        email = email.strip().lower()
+        with store.lock:
+            if email in store.by_email:
+                return None
+            uid = user_id or str(uuid.uuid4())
+            user = {
+                "id": uid,
+                "aud": "authenticated",
+                "role": "authenticated",
+                "email": email,
+                "email_confirmed_at": _now() if confirmed else None,
+                "phone": "",
+                "app_metadata": {"provider": "email", "providers": ["email"]},
+                "user_metadata": dict(metadata or {}),
+                "created_at": _now(),
+                "updated_at": _now(),
+            }
+            store.users[uid] = user
+            store.passwords[uid] = password
+            store.by_email[email] = uid
+        return user
+
+    def issue_session(uid: str) -> Dict[str, Any]:
+        access, refresh = secrets.token_urlsafe(24), secrets.token_urlsafe(24)
+        with store.lock:
+            store.access_tokens[access] = uid
+            store.refresh_tokens[refresh] = uid
+            user = store.users[uid]
+        return {
+            "access_token": access,
+            "token_type": "bearer",
+            "expires_in": TOKEN_TTL_SECONDS,
+            "expires_at": int(time.time()) + TOKEN_TTL_SECONDS,
+            "refresh_token": refresh,
+            "user": user,
+        }
+
+    def bearer_user(request: Request) -> Optional[Dict[str, Any]]:
+        auth = request.headers.get("authorization", "")
+        token = auth[7:] if auth.lower().startswith("bearer ") else ""
+        with store.lock:
+            uid = store.access_tokens.get(token)
+            return store.users.get(uid) if uid else None
+
+    def apply_update(user: Dict[str, Any], payload: dict, meta_key: str) -> None:
+        with store.lock:
+            if payload.get("email"):
+                new_email = payload["email"].strip().lower()
+                store.by_email.pop(user["email"], None)
+                store.by_email[new_email] = user["id"]
+                user["email"] = new_email
+            if payload.get("password"):
+                store.passwords[user["id"]] = payload["password"]
+            if payload.get("email_confirm"):
+                user["email_confirmed_at"] = user["email_confirmed_at"] or _now()
+            if payload.get(meta_key):
+                user["user_metadata"].update(payload[meta_key])
+            user["updated_at"] = _now()
+
+    @app.get("/auth/v1/settings")
+    async def settings_():
+        return {"external": {"email": True}, "disable_signup": False}
+
+    @app.post("/auth/v1/signup")
+    async def signup(payload: dict):
+        user = create_user(payload["email"], payload["password"], payload.get("data"))
+        if user is None:
+            return _error(422, "user_already_exists", "User already registered")
+        return {**issue_session(user["id"]), "user": user}
+
+    @app.post("/auth/v1/token")
+    async def token(request: Request, grant_type: str, payload: dict):
+        if grant_type == "password":
+            with store.lock:
+                uid = store.by_email.get((payload.get("email") or "").lower())
+                ok = uid is not None and store.passwords[uid] == payload.get("password")
+            if not ok:
+                return _error(400, "invalid_credentials", "Invalid login credentials")
+            if not store.users[uid]["email_confirmed_at"]:
+                return _error(400, "email_not_confirmed", "Email not confirmed")
+            return issue_session(uid)
+        if grant_type == "refresh_token":
+            with store.lock:
+                uid = store.refresh_tokens.pop(payload.get("refresh_token") or "", None)
+            if uid is None:
+                return _error(400, "refresh_token_not_found", "Invalid Refresh Token")
+            return issue_session(uid)
+        return _error(400, "unsupported_grant_type", "Unsupported grant type")
+
+    @app.get("/auth/v1/user")
+    async def get_user(request: Request):
+        user = bearer_user(request)
+        if user is None:
+            return _error(401, "bad_jwt", "invalid JWT")
+        return user
+
+    @app.put("/auth/v1/user")
+    async def update_user(request: Request, payload: dict):
+        user = bearer_user(request)
+        if user is None:
+            return _error(401, "bad_jwt", "invalid JWT")
+        apply_update(user, payload, "data")
+        return user
+
+    @app.post("/auth/v1/logout")
+    async def logout(request: Request):
+        auth = request.headers.get("authorization", "")
+        with store.lock:
+            store.access_tokens.pop(auth[7:], None)
+        return Response(status_code=204)
+
+    @app.get("/auth/v1/admin/users")
+    async def admin_list(email: Optional[str] = None):
+        with store.lock:
+            users = list(store.users.values())
+        if email:
+            users = [u for u in users if u["email"] == email.strip().lower()]
+        return {"users": users, "aud": "authenticated"}
+
+    @app.post("/auth/v1/admin/users")
+    async def admin_create(payload: dict):
+        user = create_user(
+            payload["email"],
+            payload.get("password") or secrets.token_urlsafe(12),
+            payload.get("user_metadata"),
+            user_id=payload.get("id"),
+            confirmed=bool(payload.get("email_confirm")),
+        )
+        if user is None:
+            return _error(422, "email_exists", "Email already registered")
+        return user
+
+    @app.get("/auth/v1/admin/users/{user_id}")
+    async def admin_get(user_id: str):
+        user = store.users.get(user_id)
+        return user if user else _error(404, "user_not_found", "User not found")
+
+    @app.api_route("/auth/v1/admin/users/{user_id}", methods=["PATCH", "PUT"])
+    async def admin_update(user_id: str, payload: dict):
+        user = store.users.get(user_id)
+        if user is None:
+            return _error(404, "user_not_found", "User not found")
+        apply_update(user, payload, "user_metadata")
+        return user
+
+    @app.delete("/auth/v1/admin/users/{user_id}")
+    async def admin_delete(user_id: str):
+        with store.lock:
+            user = store.users.pop(user_id, None)
+            if user is not None:
+                store.by_email.pop(user["email"], None)
+        if user is None:
+            return _error(404, "user_not_found", "User not found")
+        return {}
+
+    return app
+
+
+def main() -> None:
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9999)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int)
+    args = parser.parse_args()
+    config = FakeGoTrueConfig(
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        error_rate=args.error_rate,
+        seed=args.seed,
+    )
+    uvicorn.run(create_app(config), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+"""
+Informe de `python -X importtime`: qué módulos cuestan más al arrancar.
+
+Uso (desde backend/):
+
+    python benchmarks/importtime_report.py
+    python benchmarks/importtime_report.py app.services.assignment --top 15
+    python benchmarks/importtime_report.py app.main get_fresh_token --repeat 5 --json
+
+Para cada módulo objetivo lanza `--repeat` intérpretes nuevos con
+`-X importtime -c "import <módulo>"` y se queda, por módulo importado, con el
+mínimo de las ejecuciones (el ruido del sistema sólo suma). Muestra el tiempo
+total, los `--top` módulos con mayor tiempo acumulado (incluye lo que importan;
+con `--json` también los de mayor tiempo propio) y el total propio agrupado por
+paquete raíz, que indica qué dependencia conviene importar de forma perezosa.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+from collections import defaultdict
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Dict, List
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+
+DEFAULT_TARGETS = ("app.main", "app.services.assignment", "get_fresh_token")
+ENV = {
+    **os.environ,
+    "DATABASE_URL": os.getenv("DATABASE_URL", "sqlite:///:memory:"),
+    "SUPABASE_URL": os.getenv("SUPABASE_URL", "http://localhost:9999"),
+    "SUPABASE_API_KEY": os.getenv("SUPABASE_API_KEY", "importtime"),
+}
+
+
+@dataclass
+class ModuleTime:
+    name: str
+    self_us: int
+    cumulative_us: int
+    depth: int
+
+
+def parse_importtime(stderr: str) -> List[ModuleTime]:
+    """Líneas `import time: self [us] | cumulative | imported package`."""
+    modules = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        fields = line[len("import time:") :].split("|")
+        if len(fields) != 3 or not fields[0].strip().isdigit():
+            continue  # cabecera
+        name = fields[2].rstrip()
+        depth = (len(name) - len(name.lstrip())) // 2
+        modules.append(ModuleTime(name.strip(), int(fields[0]), int(fields[1]), depth))
+    return modules
+
+
+def measure(target: str, repeat: int) -> Dict[str, ModuleTime]:
+    best: Dict[str, ModuleTime] = {}
+    for _ in range(repeat):
+        out = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", f"import {target}"],
+            cwd=BACKEND_DIR,
+            env=ENV,
+            capture_output=True,
+            text=True,
+        )
+        if out.returncode != 0:
+            raise RuntimeError(f"import {target} falló:\n{out.stderr[-2000:]}")
+        for mod in parse_importtime(out.stderr):
+            current = best.get(mod.name)
+            if current is None or mod.cumulative_us < current.cumulative_us:
+                best[mod.name] = mod
+    return best
+
+
+def by_package(modules: Dict[str, ModuleTime]) -> Dict[str, int]:
+    totals: Dict[str, int] = defaultdict(int)
+    for mod in modules.values():
+        totals[mod.name.split(".")[0]] += mod.self_us
+    return dict(sorted(totals.items(), key=lambda kv: -kv[1]))
+
+
+def report(target: str, modules: Dict[str, ModuleTime], top: int) -> dict:
+    total = modules[target].cumulative_us if target in modules else 0
+    return {
+        "target": target,
+        "total_ms": total / 1000,
+        "modules": len(modules),
+        "top_cumulative": [
+            asdict(m)
+            for m in sorted(modules.values(), key=lambda m: -m.cumulative_us)[
+                1 : top + 1
+            ]
+        ],
+        "top_self": [
+            asdict(m) for m in sorted(modules.values(), key=lambda m: -m.self_us)[:top]
+        ],
+        "packages_ms": {
+            name: us / 1000 for name, us in list(by_package(modules).items())[:top]
+        },
+    }
+
+
+def print_report(data: dict) -> None:
+    print(
+        f"\n== import {data['target']}: {data['total_ms']:.1f} ms "
+        f"({data['modules']} módulos)"
+    )
+    print(f"{'acumulado':>12s} {'propio':>10s}  módulo")
+    for m in data["top_cumulative"]:
+        print(
+            f"{m['cumulative_us'] / 1000:9.1f} ms {m['self_us'] / 1000:7.1f} ms  "
+            f"{'  ' * m['depth']}{m['name']}"
+        )
+    print("-- tiempo propio por paquete raíz")
+    for name, ms in data["packages_ms"].items():
+        print(f"{ms:9.1f} ms  {name}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("targets", nargs="*", default=list(DEFAULT_TARGETS))
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--top", type=int, default=20)
+    parser.add_argument("--json", action="store_true", help="Salida JSON")
+    args = parser.parse_args()
+
+    results = [
+        report(target, measure(target, args.repeat), args.top)
+        for target in args.targets
+    ]
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    for data in results:
+        print_report(data)
+
+
+if __name__ == "__main__":
+    main()
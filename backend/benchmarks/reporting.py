@@ -0,0 +1,69 @@
+"""Utilidades compartidas por los benchmarks: percentiles, metadatos y JSON."""
+
+from __future__ import annotations
+
+import json
+import platform
+import statistics
+import subprocess
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List, Optional
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Percentil por rango más cercano sobre una lista ya ordenada."""
+    idx = round(pct / 100 * len(sorted_values)) - 1
+    return sorted_values[min(len(sorted_values) - 1, max(0, idx))]
+
+
+def summarize(samples: List[float]) -> Dict[str, float]:
+    """Resumen de latencias; `samples` en segundos, el resultado en ms."""
+    ms = sorted(s * 1000 for s in samples)
+    return {
+        "iterations": len(ms),
+        "min_ms": round(ms[0], 3),
+        "median_ms": round(statistics.median(ms), 3),
+        "mean_ms": round(statistics.fmean(ms), 3),
+        "p95_ms": round(percentile(ms, 95), 3),
+        "p99_ms": round(percentile(ms, 99), 3),
+        "max_ms": round(ms[-1], 3),
+        "stdev_ms": round(statistics.pstdev(ms), 3),
+        "ops_per_sec": round(len(ms) / (sum(ms) / 1000), 1),
+    }
+
+
+def _git(*args: str) -> str:
+    try:
+        return subprocess.run(
+            ["git", *args], cwd=BACKEND_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+def run_metadata() -> Dict:
+    """Commit, entorno y versión de Python de la ejecución."""
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "git_commit": _git("rev-parse", "--short", "HEAD") or None,
+        "git_dirty": bool(_git("status", "--porcelain", "--", ".")),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+    }
+
+
+def write_report(report: Dict, prefix: str, output: Optional[Path] = None) -> Path:
+    """Guarda el informe en `output` o en results/<prefix>-<commit>-<fecha>.json."""
+    commit = report.get("meta", {}).get("git_commit") or "nogit"
+    output = output or RESULTS_DIR / (
+        f"{prefix}-{commit}-{datetime.now().strftime('%Y%m%dT%H%M%S')}.json"
+    )
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(
+        json.dumps(report, indent=2, ensure_ascii=False), encoding="utf-8"
+    )
+    return output
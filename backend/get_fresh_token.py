@@ -1,9 +1,34 @@
-import requests
 import json
+from urllib import error, request
+
+# Sólo biblioteca estándar: el script arranca sin importar `requests` ni la app
 
 # Base URL del API
 BASE_URL = "http://localhost:8000/api/v1"
 
+
+class _Response:
+    def __init__(self, status_code: int, text: str):
+        self.status_code = status_code
+        self.text = text
+
+    def json(self):
+        return json.loads(self.text)
+
+
+def _request(method, url, json_body=None, headers=None):
+    """Petición HTTP mínima con urllib (las respuestas de error no lanzan)."""
+    data = json.dumps(json_body).encode() if json_body is not None else None
+    req = request.Request(url, data=data, method=method, headers=dict(headers or {}))
+    if data is not None:
+        req.add_header("Content-Type", "application/json")
+    try:
+        with request.urlopen(req, timeout=30) as resp:
+            return _Response(resp.status, resp.read().decode())
+    except error.HTTPError as e:
+        return _Response(e.code, e.read().decode())
+
+
 # Usuarios disponibles
 USERS = {
     "admin": {"email": "admin@fisiomove.com", "password": "Admin123"},
@@ -22,7 +47,7 @@ def get_token(user_type="admin"):
 
     try:
         print(f"Obteniendo token para: {login_data['email']}")
-        response = requests.post(f"{BASE_URL}/auth/login", json=login_data)
+        response = _request("POST", f"{BASE_URL}/auth/login", json_body=login_data)
 
         if response.status_code == 200:
             token_data = response.json()
@@ -54,8 +79,8 @@ def test_appointment_detail(token, appointment_id=3):
 
     try:
         print(f"\n🔍 Probando GET /appointments/{appointment_id}")
-        response = requests.get(
-            f"{BASE_URL}/appointments/{appointment_id}", headers=headers
+        response = _request(
+            "GET", f"{BASE_URL}/appointments/{appointment_id}", headers=headers
         )
 
         print(f"Status Code: {response.status_code}")
@@ -80,7 +105,7 @@ def test_appointments_list(token):
 
     try:
         print(f"\n📋 Probando GET /appointments")
-        response = requests.get(f"{BASE_URL}/appointments", headers=headers)
+        response = _request("GET", f"{BASE_URL}/appointments", headers=headers)
 
         print(f"Status Code: {response.status_code}")
 
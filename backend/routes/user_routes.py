@@ -1,6 +1,6 @@
 from fastapi import APIRouter, HTTPException, status
 from pydantic import EmailStr
-from supabase_config import supabase
+from supabase_config import get_default_supabase
 
 router = APIRouter()
 
@@ -17,7 +17,7 @@ def create_user_route(email: EmailStr, password: str):
     """
     # Input validated por EmailStr. Se recomienda validar password y longitud mínima.
     try:
-        return supabase.auth.sign_up(email=email, password=password)
+        return get_default_supabase().auth.sign_up(email=email, password=password)
     except Exception:
         # No devolver error detallado que pueda ayudar a un atacante en producción
         raise HTTPException(
@@ -35,7 +35,7 @@ def get_user_route(email: EmailStr):
     (p. ej. 404 sin indicar si existe o no).
     """
     try:
-        user = supabase.auth.get_user_by_email(email=email)
+        user = get_default_supabase().auth.get_user_by_email(email=email)
         if user:
             return user
         # Evitar dar pistas sobre existencia de usuario
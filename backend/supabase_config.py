@@ -9,8 +9,13 @@ Notas de seguridad (inline):
 """
 
 import os
+from functools import lru_cache
+from typing import TYPE_CHECKING
+
 from dotenv import load_dotenv
-from supabase import create_client, Client
+
+if TYPE_CHECKING:
+    from supabase import Client
 
 # Cargar variables de entorno solo si existen archivos .env locales (no fatal)
 load_dotenv()
@@ -21,7 +26,7 @@ SUPABASE_URL = os.getenv("SUPABASE_URL", "your-project-url")
 SUPABASE_KEY = os.getenv("SUPABASE_API_KEY", "your-anon-key")
 
 
-def get_supabase(url: str | None = None, key: str | None = None) -> Client:
+def get_supabase(url: str | None = None, key: str | None = None) -> "Client":
     """Crear cliente de Supabase.
 
     Recomendación de seguridad:
@@ -29,13 +34,26 @@ def get_supabase(url: str | None = None, key: str | None = None) -> Client:
     - En vez de usar el cliente global, llame a esta función desde el arranque y pase
         las credenciales tomadas de un secret manager o variables de entorno seguras.
     """
+    from supabase import create_client
+
     _url = url or SUPABASE_URL
     _key = key or SUPABASE_KEY
     return create_client(_url, _key)
 
 
-# Cliente global (uso rápido para desarrollo). En production evite usar este singleton.
-supabase: Client = get_supabase()
+@lru_cache()
+def get_default_supabase() -> "Client":
+    """Cliente con las credenciales del entorno, creado en el primer uso."""
+    return get_supabase()
+
+
+def __getattr__(name: str):
+    # Cliente global (uso rápido para desarrollo). En production evite usar este
+    # singleton. Se crea al primer acceso (`from supabase_config import supabase`),
+    # no al importar el módulo.
+    if name == "supabase":
+        return get_default_supabase()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 def test_supabase_connection():
@@ -45,7 +63,7 @@ def test_supabase_connection():
     que contengan información sensible en entornos de producción.
     """
     try:
-        response = supabase.table("test_table").select("*").execute()
+        response = get_default_supabase().table("test_table").select("*").execute()
         print("Conexión exitosa. Respuesta:", response)
     except Exception as e:
         print("Error al conectar con Supabase:", e)
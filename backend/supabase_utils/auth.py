@@ -1,17 +1,29 @@
 """
 Módulo para autenticación con Supabase
+
+El cliente se crea en la primera llamada a `get_auth_client()`: importar el
+módulo no importa el SDK de Supabase ni lee credenciales.
 """
-from supabase import create_client, Client
+from functools import lru_cache
+from typing import TYPE_CHECKING
 import os
 
-SUPABASE_URL = os.getenv("SUPABASE_URL")
-SUPABASE_KEY = os.getenv("SUPABASE_ANON_KEY")
+if TYPE_CHECKING:
+    from supabase import Client
+
 
-def get_auth_client() -> Client:
+@lru_cache()
+def get_auth_client() -> "Client":
     """
-    Crear cliente de autenticación de Supabase
+    Cliente de autenticación de Supabase (singleton perezoso)
     """
-    return create_client(SUPABASE_URL, SUPABASE_KEY)
+    from supabase import create_client
+
+    return create_client(os.getenv("SUPABASE_URL"), os.getenv("SUPABASE_ANON_KEY"))
+
 
-# Cliente global para autenticación
-auth_client: Client = get_auth_client()
+def __getattr__(name: str):
+    # Compatibilidad con `from supabase_utils.auth import auth_client`
+    if name == "auth_client":
+        return get_auth_client()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,17 +1,29 @@
 """
 Módulo para configuración del cliente principal de Supabase
+
+El cliente se crea en la primera llamada a `get_supabase_client()`: importar el
+módulo no importa el SDK de Supabase ni lee credenciales.
 """
-from supabase import create_client, Client
+from functools import lru_cache
+from typing import TYPE_CHECKING
 import os
 
-SUPABASE_URL = os.getenv("SUPABASE_URL")
-SUPABASE_KEY = os.getenv("SUPABASE_ANON_KEY")
+if TYPE_CHECKING:
+    from supabase import Client
+
 
-def get_supabase_client() -> Client:
+@lru_cache()
+def get_supabase_client() -> "Client":
     """
-    Crear cliente principal de Supabase
+    Cliente principal de Supabase (singleton perezoso)
     """
-    return create_client(SUPABASE_URL, SUPABASE_KEY)
+    from supabase import create_client
+
+    return create_client(os.getenv("SUPABASE_URL"), os.getenv("SUPABASE_ANON_KEY"))
+
 
-# Cliente global
-supabase_client: Client = get_supabase_client()
+def __getattr__(name: str):
+    # Compatibilidad con `from supabase_utils.client import supabase_client`
+    if name == "supabase_client":
+        return get_supabase_client()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
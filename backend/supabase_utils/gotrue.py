@@ -4,30 +4,109 @@ evita colisión de nombres con el paquete 'supabase' de PyPI.
 """
 
 from __future__ import annotations
-from typing import Optional, Dict, Any
-import requests
+from functools import lru_cache
+from typing import TYPE_CHECKING, NamedTuple, Optional, Dict, Any
 
 from app.core.config import settings
+from app.metrics import track_gotrue
 
-BASE_URL = str(settings.SUPABASE_URL).strip().rstrip("/")
-API_KEY = str(settings.SUPABASE_API_KEY).strip()
-SERVICE_ROLE_KEY = (settings.SUPABASE_SERVICE_ROLE_KEY or "").strip()
+if TYPE_CHECKING:
+    import httpx
+    import requests
 
-# Para endpoints públicos (signup/login) basta con enviar 'apikey'
-PUBLIC_HEADERS = {
-    "apikey": API_KEY,
-    "Content-Type": "application/json",
-}
 
-ADMIN_HEADERS = None
-if SERVICE_ROLE_KEY:
-    ADMIN_HEADERS = {
-        "apikey": SERVICE_ROLE_KEY,
-        "Authorization": f"Bearer {SERVICE_ROLE_KEY}",
+class GoTrueConfig(NamedTuple):
+    base_url: str
+    api_key: str
+    service_role_key: str
+
+
+@lru_cache()
+def _config() -> GoTrueConfig:
+    """URL y claves de Supabase, leídas de `settings` en el primer uso (no al importar)."""
+    return GoTrueConfig(
+        base_url=str(settings.SUPABASE_URL).strip().rstrip("/"),
+        api_key=str(settings.SUPABASE_API_KEY).strip(),
+        service_role_key=(settings.SUPABASE_SERVICE_ROLE_KEY or "").strip(),
+    )
+
+
+def _base_url() -> str:
+    return _config().base_url
+
+
+@lru_cache()
+def public_headers() -> Dict[str, str]:
+    # Para endpoints públicos (signup/login) basta con enviar 'apikey'
+    return {
+        "apikey": _config().api_key,
+        "Content-Type": "application/json",
+    }
+
+
+@lru_cache()
+def admin_headers() -> Optional[Dict[str, str]]:
+    service_role_key = _config().service_role_key
+    if not service_role_key:
+        return None
+    return {
+        "apikey": service_role_key,
+        "Authorization": f"Bearer {service_role_key}",
         "Content-Type": "application/json",
     }
 
 
+_LAZY_ATTRS = {
+    "BASE_URL": lambda: _config().base_url,
+    "API_KEY": lambda: _config().api_key,
+    "SERVICE_ROLE_KEY": lambda: _config().service_role_key,
+    "PUBLIC_HEADERS": public_headers,
+    "ADMIN_HEADERS": admin_headers,
+}
+
+
+def __getattr__(name: str):
+    # Compatibilidad con las antiguas constantes de módulo
+    if name in _LAZY_ATTRS:
+        return _LAZY_ATTRS[name]()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def _send(operation: str, method: str, url: str, **kwargs) -> requests.Response:
+    """Llamada HTTP a GoTrue con métricas de latencia y errores por operación."""
+    import requests
+
+    with track_gotrue(operation) as call:
+        resp = requests.request(method, url, **kwargs)
+        call["status"] = resp.status_code
+    return resp
+
+
+@lru_cache()
+def _async_client() -> httpx.AsyncClient:
+    """Cliente HTTP async compartido (pool de conexiones), creado en el primer uso."""
+    import httpx
+
+    return httpx.AsyncClient(timeout=15)
+
+
+async def _send_async(
+    operation: str, method: str, url: str, **kwargs
+) -> httpx.Response:
+    """Equivalente async de `_send`: no ocupa un hilo del threadpool."""
+    with track_gotrue(operation) as call:
+        resp = await _async_client().request(method, url, **kwargs)
+        call["status"] = resp.status_code
+    return resp
+
+
+async def aclose() -> None:
+    """Cierra el cliente async si llegó a crearse (al apagar el worker)."""
+    if _async_client.cache_info().currsize:
+        await _async_client().aclose()
+        _async_client.cache_clear()
+
+
 def sign_up_user(
     email: str,
     password: str,
@@ -43,7 +122,7 @@ def sign_up_user(
     Devuelve el JSON de GoTrue (user, session, etc) o lanza una excepción en error.
     """
 
-    url = f"{BASE_URL}/auth/v1/signup"
+    url = f"{_base_url()}/auth/v1/signup"
     payload: Dict[str, Any] = {"email": email, "password": password}
 
     # Datos adicionales en el perfil
@@ -62,7 +141,9 @@ def sign_up_user(
     if redirect_to:
         payload["redirect_to"] = redirect_to
 
-    resp = requests.post(url, json=payload, headers=PUBLIC_HEADERS, timeout=15)
+    resp = _send(
+        "sign_up_user", "POST", url, json=payload, headers=public_headers(), timeout=15
+    )
 
     if resp.status_code >= 400:
         try:
@@ -82,27 +163,36 @@ def sign_in_user(email: str, password: str) -> Dict[str, Any]:
     Inicia sesión (password grant) en Supabase Auth.
     Devuelve access_token, refresh_token, token_type, user, etc.
     """
-    url = f"{BASE_URL}/auth/v1/token?grant_type=password"
+    url = f"{_base_url()}/auth/v1/token?grant_type=password"
     payload = {"email": email, "password": password}
 
-    resp = requests.post(url, json=payload, headers=PUBLIC_HEADERS, timeout=15)
+    resp = _send(
+        "sign_in_user", "POST", url, json=payload, headers=public_headers(), timeout=15
+    )
 
     if resp.status_code >= 400:
         try:
             detail = resp.json()
         except Exception:
             detail = {"message": resp.text}
-            
+
         raise ValueError({"status": resp.status_code, "detail": detail})
     result = resp.json()
-    
+
     return result
 
 
 def refresh_session(refresh_token: str) -> Dict[str, Any]:
-    url = f"{BASE_URL}/auth/v1/token?grant_type=refresh_token"
+    url = f"{_base_url()}/auth/v1/token?grant_type=refresh_token"
     payload = {"refresh_token": refresh_token}
-    resp = requests.post(url, json=payload, headers=PUBLIC_HEADERS, timeout=15)
+    resp = _send(
+        "refresh_session",
+        "POST",
+        url,
+        json=payload,
+        headers=public_headers(),
+        timeout=15,
+    )
     if resp.status_code >= 400:
         try:
             detail = resp.json()
@@ -114,9 +204,9 @@ def refresh_session(refresh_token: str) -> Dict[str, Any]:
 
 def logout(access_token: str) -> None:
     """Revoca la sesión del access_token actual."""
-    url = f"{BASE_URL}/auth/v1/logout"
-    headers = {"apikey": API_KEY, "Authorization": f"Bearer {access_token}"}
-    resp = requests.post(url, headers=headers, timeout=15)
+    url = f"{_base_url()}/auth/v1/logout"
+    headers = {"apikey": _config().api_key, "Authorization": f"Bearer {access_token}"}
+    resp = _send("logout", "POST", url, headers=headers, timeout=15)
     if resp.status_code >= 400:
         try:
             detail = resp.json()
@@ -129,13 +219,31 @@ def get_user_from_token(access_token: str) -> Dict[str, Any]:
     """
     Obtiene el usuario asociado a un access_token de Supabase.
     """
-    url = f"{BASE_URL}/auth/v1/user"
+    url = f"{_base_url()}/auth/v1/user"
+    headers = {
+        "apikey": _config().api_key,
+        "Content-Type": "application/json",
+        "Authorization": f"Bearer {access_token}",
+    }
+    resp = _send("get_user_from_token", "GET", url, headers=headers, timeout=15)
+    if resp.status_code >= 400:
+        try:
+            detail = resp.json()
+        except Exception:
+            detail = {"message": resp.text}
+        raise ValueError({"status": resp.status_code, "detail": detail})
+    return resp.json()
+
+
+async def get_user_from_token_async(access_token: str) -> Dict[str, Any]:
+    """Versión async de `get_user_from_token` para las dependencias async."""
+    url = f"{_base_url()}/auth/v1/user"
     headers = {
-        "apikey": API_KEY,
+        "apikey": _config().api_key,
         "Content-Type": "application/json",
         "Authorization": f"Bearer {access_token}",
     }
-    resp = requests.get(url, headers=headers, timeout=15)
+    resp = await _send_async("get_user_from_token", "GET", url, headers=headers)
     if resp.status_code >= 400:
         try:
             detail = resp.json()
@@ -148,8 +256,10 @@ def get_user_from_token(access_token: str) -> Dict[str, Any]:
 def validate_api_key() -> bool:
     """Valida que SUPABASE_URL/API_KEY respondan correctamente."""
     try:
-        url = f"{BASE_URL}/auth/v1/settings"
-        resp = requests.get(url, headers=PUBLIC_HEADERS, timeout=10)
+        url = f"{_base_url()}/auth/v1/settings"
+        resp = _send(
+            "validate_api_key", "GET", url, headers=public_headers(), timeout=10
+        )
         return resp.status_code == 200
     except Exception:
         return False
@@ -169,9 +279,9 @@ def update_user_self(
     phone: Optional[str] = None,
 ) -> Dict[str, Any]:
     """Actualiza el usuario autenticado (email/password/metadata)."""
-    url = f"{BASE_URL}/auth/v1/user"
+    url = f"{_base_url()}/auth/v1/user"
     headers = {
-        "apikey": API_KEY,
+        "apikey": _config().api_key,
         "Content-Type": "application/json",
         "Authorization": f"Bearer {access_token}",
     }
@@ -194,7 +304,9 @@ def update_user_self(
     if not payload:
         return get_user_from_token(access_token)
 
-    resp = requests.put(url, json=payload, headers=headers, timeout=15)
+    resp = _send(
+        "update_user_self", "PUT", url, json=payload, headers=headers, timeout=15
+    )
 
     if resp.status_code >= 400:
         try:
@@ -207,24 +319,37 @@ def update_user_self(
 
 def admin_confirm_user(user_id: str) -> bool:
     """Confirma por admin un usuario (requiere service_role)."""
-    if not ADMIN_HEADERS:
+    if not admin_headers():
         return False
-    url = f"{BASE_URL}/auth/v1/admin/users/{user_id}"
+    url = f"{_base_url()}/auth/v1/admin/users/{user_id}"
     payload = {"email_confirm": True}
-    resp = requests.patch(url, json=payload, headers=ADMIN_HEADERS, timeout=15)
+    resp = _send(
+        "admin_confirm_user",
+        "PATCH",
+        url,
+        json=payload,
+        headers=admin_headers(),
+        timeout=15,
+    )
     return resp.status_code < 400
 
 
 def admin_get_user_by_email(email: str) -> Optional[Dict[str, Any]]:
 
-    if not ADMIN_HEADERS:
+    if not admin_headers():
         return None
 
-    url = f"{BASE_URL}/auth/v1/admin/users"
+    url = f"{_base_url()}/auth/v1/admin/users"
     params = {"email": email}
 
-
-    resp = requests.get(url, headers=ADMIN_HEADERS, params=params, timeout=15)
+    resp = _send(
+        "admin_get_user_by_email",
+        "GET",
+        url,
+        headers=admin_headers(),
+        params=params,
+        timeout=15,
+    )
 
     if resp.status_code >= 400:
         try:
@@ -268,10 +393,12 @@ def admin_confirm_user_by_email(email: str) -> bool:
 
 
 def admin_delete_user(user_id: str) -> bool:
-    if not ADMIN_HEADERS:
+    if not admin_headers():
         return False
-    url = f"{BASE_URL}/auth/v1/admin/users/{user_id}"
-    resp = requests.delete(url, headers=ADMIN_HEADERS, timeout=15)
+    url = f"{_base_url()}/auth/v1/admin/users/{user_id}"
+    resp = _send(
+        "admin_delete_user", "DELETE", url, headers=admin_headers(), timeout=15
+    )
     return resp.status_code < 400
 
 
@@ -296,11 +423,10 @@ def admin_create_user(
     email_confirm: bool = True,
 ) -> Optional[Dict[str, Any]]:
 
-    if not ADMIN_HEADERS:
+    if not admin_headers():
         return None
 
-
-    url = f"{BASE_URL}/auth/v1/admin/users"
+    url = f"{_base_url()}/auth/v1/admin/users"
     payload: Dict[str, Any] = {
         "email": email,
         "password": password,
@@ -318,8 +444,14 @@ def admin_create_user(
     if data:
         payload["user_metadata"] = data
 
-
-    resp = requests.post(url, json=payload, headers=ADMIN_HEADERS, timeout=15)
+    resp = _send(
+        "admin_create_user",
+        "POST",
+        url,
+        json=payload,
+        headers=admin_headers(),
+        timeout=15,
+    )
 
     if resp.status_code >= 400:
         try:
@@ -347,9 +479,9 @@ def admin_update_user(
     role: Optional[str] = None,
 ) -> Optional[Dict[str, Any]]:
     """Actualiza atributos del usuario por Admin API."""
-    if not ADMIN_HEADERS:
+    if not admin_headers():
         return None
-    url = f"{BASE_URL}/auth/v1/admin/users/{user_id}"
+    url = f"{_base_url()}/auth/v1/admin/users/{user_id}"
     payload: Dict[str, Any] = {}
     if email is not None:
         payload["email"] = email
@@ -370,7 +502,14 @@ def admin_update_user(
         payload["user_metadata"] = meta
     if not payload:
         return None
-    resp = requests.patch(url, json=payload, headers=ADMIN_HEADERS, timeout=15)
+    resp = _send(
+        "admin_update_user",
+        "PATCH",
+        url,
+        json=payload,
+        headers=admin_headers(),
+        timeout=15,
+    )
     if resp.status_code >= 400:
         return None
     return resp.json()
@@ -13,11 +13,20 @@ BACKEND_DIR = Path(__file__).resolve().parents[1]
 if str(BACKEND_DIR) not in sys.path:
     sys.path.insert(0, str(BACKEND_DIR))
 
+# Antes de importar la app: /metrics y su middleware se registran al importar
+os.environ.setdefault("METRICS_ENABLED", "true")
+
 from app.main import app
 from app.db.base import Base
-from app.db.session import get_db
-from app.services.auth import get_current_user
-
+from app.db.session import (
+    create_async_db_engine,
+    get_async_db,
+    get_async_read_db,
+    get_db,
+    get_read_db,
+)
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from app.services.auth import get_current_user, get_current_user_async
 
 # Use a local SQLite DB for tests
 TEST_DATABASE_URL = os.getenv("TEST_DATABASE_URL", "sqlite:///./test.db")
@@ -28,6 +37,9 @@ engine = create_engine(
     ),
 )
 TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# Misma base de datos vía aiosqlite/asyncpg para los endpoints async
+async_engine = create_async_db_engine(TEST_DATABASE_URL)
+TestingAsyncSessionLocal = async_sessionmaker(async_engine, expire_on_commit=False)
 
 
 def override_get_db() -> Generator:
@@ -38,6 +50,11 @@ def override_get_db() -> Generator:
         db.close()
 
 
+async def override_get_async_db():
+    async with TestingAsyncSessionLocal() as db:
+        yield db
+
+
 CURRENT_TEST_USER = {
     "id": "test-user-1",
     "email": "tester@example.com",
@@ -65,6 +82,19 @@ def setup_database():
 @pytest.fixture(scope="session")
 def client():
     app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_async_db] = override_get_async_db
+    # Sin réplica en tests: las lecturas van a la misma base de datos
+    app.dependency_overrides[get_read_db] = override_get_db
+    app.dependency_overrides[get_async_read_db] = override_get_async_db
     app.dependency_overrides[get_current_user] = fake_get_current_user
+    app.dependency_overrides[get_current_user_async] = fake_get_current_user
     with TestClient(app) as c:
         yield c
+
+
+@pytest.fixture
+def query_budget():
+    """Uso: `with query_budget(3): client.get(...)` falla si se superan 3 consultas."""
+    from app.db.profiling import assert_max_queries
+
+    return assert_max_queries
@@ -0,0 +1,100 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app.core.config import settings
+
+
+@pytest.fixture(autouse=True)
+def no_safety_lag(monkeypatch):
+    monkeypatch.setattr(settings, "CHANGES_SAFETY_LAG_SECONDS", 0)
+
+
+def _sync(client, cursor=None, limit=500):
+    """Recorre todas las páginas y devuelve (cambios, eliminadas, cursor)."""
+    changes, deleted = [], []
+    while True:
+        params = {"limit": limit}
+        if cursor:
+            params["since"] = cursor
+        r = client.get("/api/v1/appointments/changes", params=params)
+        assert r.status_code == 200, r.text
+        body = r.json()
+        changes += body["changes"]
+        deleted += body["deleted"]
+        cursor = body["cursor"]
+        if not body["has_more"]:
+            return changes, deleted, cursor
+
+
+def _create(client, patient_id, days):
+    start = datetime.now(timezone.utc) + timedelta(days=days)
+    r = client.post(
+        "/api/v1/appointments/",
+        json={
+            "patient_id": patient_id,
+            "start_time": start.isoformat(),
+            "duration_minutes": 30,
+        },
+    )
+    assert r.status_code == 201, r.text
+    return r.json()["id"]
+
+
+def test_changes_returns_only_new_updated_and_deleted(client):
+    _, _, cursor = _sync(client)
+
+    first = _create(client, "7001", 600)
+    second = _create(client, "7002", 601)
+    changes, deleted, cursor = _sync(client, cursor)
+    assert [c["id"] for c in changes] == [first, second]
+    assert deleted == []
+
+    # Sin cambios: respuesta vacía y el cursor se mantiene válido
+    changes, deleted, same_cursor = _sync(client, cursor)
+    assert changes == [] and deleted == []
+
+    r = client.patch(f"/api/v1/appointments/{first}/cancel")
+    assert r.status_code == 200
+    r = client.delete(f"/api/v1/appointments/{second}")
+    assert r.status_code == 200
+
+    changes, deleted, _ = _sync(client, same_cursor)
+    assert [(c["id"], c["status"]) for c in changes] == [(first, "cancelada")]
+    assert deleted == [second]
+
+
+def test_changes_paginates_with_limit(client):
+    _, _, cursor = _sync(client)
+    ids = [_create(client, f"71{i:02d}", 610 + i) for i in range(5)]
+
+    r = client.get("/api/v1/appointments/changes", params={"since": cursor, "limit": 2})
+    body = r.json()
+    assert len(body["changes"]) == 2 and body["has_more"] is True
+
+    changes, _, _ = _sync(client, cursor, limit=2)
+    assert [c["id"] for c in changes] == ids
+
+
+def test_changes_accepts_iso_timestamp_and_rejects_garbage(client):
+    past = (datetime.now(timezone.utc) - timedelta(days=1)).isoformat()
+    r = client.get("/api/v1/appointments/changes", params={"since": past})
+    assert r.status_code == 200
+    assert r.json()["cursor"]
+
+    r = client.get("/api/v1/appointments/changes", params={"since": "no-es-cursor"})
+    assert r.status_code == 400
+
+
+def test_changes_hold_back_rows_younger_than_safety_lag(client, monkeypatch):
+    _, _, cursor = _sync(client)
+    monkeypatch.setattr(settings, "CHANGES_SAFETY_LAG_SECONDS", 60)
+    recent = _create(client, "7201", 620)
+
+    # Demasiado reciente: no se devuelve y el cursor no lo deja atrás
+    changes, _, held_cursor = _sync(client, cursor)
+    assert recent not in [c["id"] for c in changes]
+
+    monkeypatch.setattr(settings, "CHANGES_SAFETY_LAG_SECONDS", 0)
+    changes, _, _ = _sync(client, held_cursor)
+    assert [c["id"] for c in changes] == [recent]
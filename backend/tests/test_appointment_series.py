@@ -0,0 +1,54 @@
+from datetime import datetime, timedelta, timezone
+
+from app.services.appointments import expand_recurrence
+
+
+def series_start(days_ahead=400, hour=10):
+    base = datetime.now(timezone.utc) + timedelta(days=days_ahead)
+    return base.replace(hour=hour, minute=0, second=0, microsecond=0)
+
+
+def test_expand_recurrence_weekly_and_daily():
+    start = series_start()
+    weekly = expand_recurrence(start, frequency="weekly", interval=1, count=3)
+    assert weekly == [start, start + timedelta(days=7), start + timedelta(days=14)]
+    daily = expand_recurrence(start, frequency="daily", interval=2, count=2)
+    assert daily == [start, start + timedelta(days=2)]
+
+
+def test_create_series_creates_all_occurrences(client):
+    start = series_start()
+    payload = {
+        "patient_id": "9001",
+        "fisio_id": "9002",
+        "start_time": start.isoformat(),
+        "duration_minutes": 45,
+        "appointment_type": "rehabilitacion",
+        "recurrence": {"frequency": "weekly", "interval": 1, "count": 4},
+    }
+    resp = client.post("/api/v1/appointments/series", json=payload)
+    assert resp.status_code == 201, resp.text
+    data = resp.json()
+    assert len(data) == 4
+    assert all(ap["status"] == "programada" for ap in data)
+    assert len({ap["id"] for ap in data}) == 4
+
+
+def test_create_series_conflict_creates_nothing(client):
+    start = series_start(days_ahead=500)
+    payload = {
+        "patient_id": "9101",
+        "fisio_id": "9102",
+        "start_time": start.isoformat(),
+        "duration_minutes": 60,
+        "recurrence": {"frequency": "daily", "interval": 1, "count": 3},
+    }
+    resp = client.post("/api/v1/appointments/series", json=payload)
+    assert resp.status_code == 201, resp.text
+
+    # La segunda serie solapa el tercer día de la primera
+    payload["start_time"] = (start + timedelta(days=2, minutes=30)).isoformat()
+    payload["recurrence"]["count"] = 2
+    resp = client.post("/api/v1/appointments/series", json=payload)
+    assert resp.status_code == 409
+    assert "Conflicto" in resp.json()["detail"]["message"]
@@ -0,0 +1,129 @@
+from datetime import datetime, timedelta, timezone
+
+from app.models.user import User, UserRole
+from app.services.assignment import FisioAgenda, PendingSlot, plan_assignments
+
+DAY = datetime(2030, 6, 3)
+
+
+def _h(hour: int) -> datetime:
+    return DAY.replace(hour=hour)
+
+
+def test_plan_balances_load_and_respects_hours_and_conflicts():
+    agendas = [
+        FisioAgenda("a", [(_h(8), _h(18))], busy=[(_h(8), _h(10))]),
+        FisioAgenda("b", [(_h(8), _h(18))]),
+        FisioAgenda("c", [(_h(8), _h(9))]),
+    ]
+    pending = [
+        PendingSlot(1, _h(9), _h(10)),
+        PendingSlot(2, _h(8), _h(9)),
+        PendingSlot(3, _h(8), _h(9)),
+        PendingSlot(4, _h(20), _h(21)),  # fuera de horario
+    ]
+    plan = plan_assignments(pending, agendas)
+    assert plan == {1: "b", 2: "c", 3: "b"}
+    assert [a.load for a in agendas] == [120, 120, 60]
+
+
+def test_plan_spreads_many_slots_evenly():
+    agendas = [FisioAgenda(str(i), [(_h(8), _h(18))]) for i in range(4)]
+    pending = [PendingSlot(i, _h(8 + i // 4), _h(9 + i // 4)) for i in range(40)]
+    plan = plan_assignments(pending, agendas)
+    assert len(plan) == 40
+    assert sorted(a.load for a in agendas) == [600] * 4
+
+
+def _make_fisios(n: int, prefix: str) -> list[str]:
+    from conftest import TestingSessionLocal
+
+    db = TestingSessionLocal()
+    fisios = [
+        User(
+            email=f"{prefix}{i}@example.com",
+            role=UserRole.fisioterapeuta,
+            hashed_password="!",
+        )
+        for i in range(n)
+    ]
+    db.add_all(fisios)
+    db.commit()
+    ids = [str(f.id) for f in fisios]
+    db.close()
+    return ids
+
+
+def test_assign_pending_endpoint(client):
+    _make_fisios(2, "asignacion.fisio")
+    day = (datetime.now(timezone.utc) + timedelta(days=800)).date()
+    # 15:00 UTC = 10:00 Bogotá; 23:00 UTC = 18:00 Bogotá (fuera de horario)
+    starts = [
+        datetime(day.year, day.month, day.day, 15, 0, tzinfo=timezone.utc),
+        datetime(day.year, day.month, day.day, 16, 0, tzinfo=timezone.utc),
+        datetime(day.year, day.month, day.day, 23, 0, tzinfo=timezone.utc),
+    ]
+    ids = []
+    for i, start in enumerate(starts):
+        r = client.post(
+            "/api/v1/appointments/",
+            json={
+                "patient_id": f"{9100 + i}",
+                "start_time": start.isoformat(),
+                "duration_minutes": 60,
+            },
+        )
+        assert r.status_code == 201, r.text
+        assert r.json()["fisio_id"] is None
+        ids.append(r.json()["id"])
+
+    window = {
+        "date_from": datetime(
+            day.year, day.month, day.day, tzinfo=timezone.utc
+        ).isoformat(),
+        "date_to": (
+            datetime(day.year, day.month, day.day, tzinfo=timezone.utc)
+            + timedelta(days=1)
+        ).isoformat(),
+    }
+    r = client.post(
+        "/api/v1/appointments/assign-pending", params={**window, "dry_run": True}
+    )
+    assert r.status_code == 200, r.text
+    plan = r.json()
+    assert plan["dry_run"] is True
+    assert [a["appointment_id"] for a in plan["assigned"]] == ids[:2]
+    assert plan["unassigned"] == [ids[2]]
+    assert client.get(f"/api/v1/appointments/{ids[0]}").json()["fisio_id"] is None
+
+    r = client.post("/api/v1/appointments/assign-pending", params=window)
+    assert r.status_code == 200, r.text
+    assigned = {a["appointment_id"]: a["fisio_id"] for a in r.json()["assigned"]}
+    # Reparto equilibrado: la segunda va a otro fisio sin carga
+    assert assigned[ids[0]] != assigned[ids[1]]
+    for ap_id in ids[:2]:
+        body = client.get(f"/api/v1/appointments/{ap_id}").json()
+        assert body["fisio_id"] == assigned[ap_id]
+
+    r = client.get(f"/api/v1/notifications/notifications/by-cita/{ids[0]}")
+    assert any(n["type"] == "cita_asignada" for n in r.json())
+
+
+def test_auto_assign_on_create(client, monkeypatch):
+    from app.core.config import settings
+
+    _make_fisios(1, "auto.asignacion.fisio")
+    monkeypatch.setattr(settings, "AUTO_ASSIGN_FISIO", True)
+    day = (datetime.now(timezone.utc) + timedelta(days=810)).date()
+    r = client.post(
+        "/api/v1/appointments/",
+        json={
+            "patient_id": "9200",
+            "start_time": datetime(
+                day.year, day.month, day.day, 16, 0, tzinfo=timezone.utc
+            ).isoformat(),
+            "duration_minutes": 45,
+        },
+    )
+    assert r.status_code == 201, r.text
+    assert r.json()["fisio_id"] is not None
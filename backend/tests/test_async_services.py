@@ -0,0 +1,108 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+from app.services.appointments import list_appointments_async
+from app.services.dashboard import get_dashboard_summary_async
+
+
+def test_availability_excludes_booked_slot(client):
+    day = (datetime.now(timezone.utc) + timedelta(days=600)).date()
+    # 15:00 UTC == 10:00 Bogotá
+    start = datetime(day.year, day.month, day.day, 15, 0, tzinfo=timezone.utc)
+    r = client.post(
+        "/api/v1/appointments/",
+        json={
+            "patient_id": "7001",
+            "fisio_id": "7002",
+            "start_time": start.isoformat(),
+            "duration_minutes": 60,
+        },
+    )
+    assert r.status_code == 201, r.text
+
+    r = client.get(
+        "/api/v1/appointments/availability",
+        params={"date": day.isoformat(), "patient_id": "7001", "duration_minutes": 60},
+    )
+    assert r.status_code == 200
+    slots = [s[11:16] for s in r.json()["available_slots"]]
+    assert "09:00" in slots and "11:00" in slots
+    assert not {"09:30", "10:00", "10:30"} & set(slots)
+
+    r = client.post(
+        "/api/v1/appointments/check-availability",
+        json={
+            "start_time": (start + timedelta(minutes=30)).isoformat(),
+            "duration_minutes": 30,
+            "patient_id": "7001",
+        },
+    )
+    assert r.json() == {"available": False}
+
+
+def test_async_services_read_same_data(client):
+    from conftest import TestingAsyncSessionLocal
+
+    r = client.post(
+        "/api/v1/patients", json={"full_name": "Async Paciente", "dni": "7770001"}
+    )
+    assert r.status_code == 201, r.text
+    r = client.get("/api/v1/patients/search", params={"search": "Async Pac"})
+    assert [p["dni"] for p in r.json()] == ["7770001"]
+
+    async def run():
+        async with TestingAsyncSessionLocal() as db:
+            summary = await get_dashboard_summary_async(db)
+            items = await list_appointments_async(db, user_id="7001")
+            return summary, items
+
+    summary, items = asyncio.run(run())
+    assert summary["total_patients"] >= 1
+    assert all(i.patient_id == "7001" or i.fisio_id == "7001" for i in items)
+
+
+def test_async_routes_do_not_use_the_sync_auth_dependency(client, monkeypatch):
+    from app.main import app
+    from app.services.auth import get_current_user
+
+    # Sin el override síncrono: una ruta async que aún dependiera de él
+    # llamaría a GoTrue y respondería 401
+    monkeypatch.delitem(app.dependency_overrides, get_current_user)
+    assert client.get("/api/v1/patients/").status_code == 200
+    r = client.get("/api/v1/schedules/calendar", params={"date_from": "2031-03-03"})
+    assert r.status_code == 200
+    r = client.get(
+        "/api/v1/appointments/availability",
+        params={"date": "2031-03-03", "patient_id": "1"},
+    )
+    assert r.status_code == 200
+
+
+def test_get_user_from_token_async_against_gotrue(monkeypatch):
+    import httpx
+    import pytest
+    from fastapi.testclient import TestClient
+
+    from benchmarks.fake_gotrue import FakeGoTrueConfig, create_app
+    from supabase_utils import gotrue
+
+    fake = create_app(FakeGoTrueConfig())
+    gotrue_client = TestClient(fake)
+    gotrue_client.post(
+        "/auth/v1/signup", json={"email": "async@example.com", "password": "pw"}
+    )
+    token = gotrue_client.post(
+        "/auth/v1/token",
+        params={"grant_type": "password"},
+        json={"email": "async@example.com", "password": "pw"},
+    ).json()["access_token"]
+
+    async def run():
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=fake)) as c:
+            monkeypatch.setattr(gotrue, "_async_client", lambda: c)
+            user = await gotrue.get_user_from_token_async(token)
+            assert user["email"] == "async@example.com"
+            with pytest.raises(ValueError):
+                await gotrue.get_user_from_token_async("caducado")
+
+    asyncio.run(run())
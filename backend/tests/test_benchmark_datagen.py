@@ -0,0 +1,54 @@
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.db.base import Base
+from app.models.appointment import Appointment
+from benchmarks.datagen import BOGOTA, ClinicSpec, generate_clinic
+
+SPEC = ClinicSpec(
+    patients=50,
+    fisios=5,
+    appointments=400,
+    seed=7,
+    anchor=datetime(2025, 3, 3, tzinfo=BOGOTA),
+)
+
+
+def _seed():
+    engine = create_engine("sqlite:///:memory:")
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+    data = generate_clinic(db, SPEC)
+    rows = db.query(
+        Appointment.start_time,
+        Appointment.duration_minutes,
+        Appointment.patient_id,
+        Appointment.fisio_id,
+        Appointment.status,
+    ).all()
+    db.close()
+    return data, rows
+
+
+def test_generate_clinic_is_deterministic():
+    data_a, rows_a = _seed()
+    data_b, rows_b = _seed()
+    assert len(data_a.appointment_ids) == SPEC.appointments
+    assert len(data_a.fisio_ids) == SPEC.fisios
+    assert rows_a == rows_b
+    assert data_a.notifications == data_b.notifications > 0
+
+
+def test_generated_fisio_agendas_do_not_overlap():
+    _, rows = _seed()
+    by_fisio = defaultdict(list)
+    for start, duration, _, fisio_id, _ in rows:
+        if fisio_id is not None:
+            by_fisio[fisio_id].append((start, start + timedelta(minutes=duration)))
+    for intervals in by_fisio.values():
+        intervals.sort()
+        for (_, prev_end), (next_start, _) in zip(intervals, intervals[1:]):
+            assert next_start >= prev_end
@@ -0,0 +1,113 @@
+import asyncio
+import gzip
+import zlib
+
+import pytest
+from starlette.applications import Starlette
+from starlette.responses import PlainTextResponse, StreamingResponse
+from starlette.routing import Route
+from starlette.testclient import TestClient
+
+from app.compression import CompressionMiddleware, choose_encoding
+
+
+def _mini_app(**kwargs):
+    async def big(request):
+        return PlainTextResponse("fisiomove " * 500)
+
+    async def small(request):
+        return PlainTextResponse("ok")
+
+    app = Starlette(routes=[Route("/big", big), Route("/small", small)])
+    app.add_middleware(CompressionMiddleware, **kwargs)
+    return TestClient(app)
+
+
+def test_choose_encoding_respects_q_weights():
+    assert choose_encoding("gzip, deflate", ("br", "gzip")) == "gzip"
+    assert choose_encoding("br;q=0.5, gzip", ("br", "gzip")) == "gzip"
+    assert choose_encoding("br, gzip", ("br", "gzip")) == "br"
+    assert choose_encoding("gzip;q=0", ("gzip",)) is None
+    assert choose_encoding("*", ("gzip",)) == "gzip"
+    assert choose_encoding("identity", ("gzip",)) is None
+
+
+def test_large_list_is_gzipped(client):
+    for i in range(15):
+        r = client.post(
+            "/api/v1/patients/",
+            json={"full_name": f"Paciente Comprimido {i}", "dni": f"GZ-{i:03d}"},
+        )
+        assert r.status_code == 201, r.text
+
+    r = client.get(
+        "/api/v1/patients/",
+        params={"limit": 100},
+        headers={"Accept-Encoding": "gzip"},
+    )
+    assert r.status_code == 200
+    assert r.headers["content-encoding"] == "gzip"
+    assert "Accept-Encoding" in r.headers["vary"]
+    assert len(r.json()) >= 15
+
+
+def test_small_and_refused_responses_are_not_compressed():
+    client = _mini_app(minimum_size=500)
+    r = client.get("/small", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in r.headers
+    assert r.text == "ok"
+
+    r = client.get("/big", headers={"Accept-Encoding": "gzip;q=0"})
+    assert "content-encoding" not in r.headers
+    r = client.get("/big", headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in r.headers
+
+    r = client.get("/big", headers={"Accept-Encoding": "gzip"})
+    assert r.headers["content-encoding"] == "gzip"
+    assert int(r.headers["content-length"]) < len("fisiomove " * 500)
+    assert r.text == "fisiomove " * 500
+
+
+def test_streaming_chunks_are_flushed_and_decodable():
+    async def stream_app(scope, receive, send):
+        response = StreamingResponse(
+            (f"linea {i};".encode() * 50 for i in range(5)), media_type="text/csv"
+        )
+        await response(scope, receive, send)
+
+    middleware = CompressionMiddleware(stream_app, minimum_size=0)
+    sent = []
+
+    async def receive():
+        # El cliente no se desconecta durante la respuesta
+        await asyncio.Event().wait()
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {
+        "type": "http",
+        "method": "GET",
+        "path": "/",
+        "headers": [(b"accept-encoding", b"gzip")],
+    }
+    asyncio.run(middleware(scope, receive, send))
+
+    start, *bodies = sent
+    headers = dict(start["headers"])
+    assert headers[b"content-encoding"] == b"gzip"
+    assert b"content-length" not in headers
+    # Cada chunk vaciado se puede descomprimir sin esperar al siguiente
+    decoder = zlib.decompressobj(31)
+    for i, message in enumerate(bodies[:5]):
+        assert decoder.decompress(message["body"]) == f"linea {i};".encode() * 50
+    expected = b"".join(f"linea {i};".encode() * 50 for i in range(5))
+    assert gzip.decompress(b"".join(m["body"] for m in bodies)) == expected
+
+
+def test_brotli_is_preferred_when_available():
+    brotli = pytest.importorskip("brotli")
+    client = _mini_app()
+    r = client.get("/big", headers={"Accept-Encoding": "gzip, br"})
+    assert r.headers["content-encoding"] == "br"
+    assert brotli.decompress(r.content) == ("fisiomove " * 500).encode()
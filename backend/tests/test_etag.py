@@ -0,0 +1,175 @@
+from datetime import datetime, timedelta, timezone
+
+from starlette.requests import Request
+
+from app.core.etag import etag_matches
+
+
+def _request(if_none_match):
+    headers = [(b"if-none-match", if_none_match.encode())] if if_none_match else []
+    return Request({"type": "http", "headers": headers, "query_string": b""})
+
+
+def test_etag_matches_weak_lists_and_wildcard():
+    etag = 'W/"abc"'
+    assert etag_matches(_request('W/"abc"'), etag)
+    assert etag_matches(_request('"abc"'), etag)
+    assert etag_matches(_request('"zzz", W/"abc"'), etag)
+    assert etag_matches(_request("*"), etag)
+    assert not etag_matches(_request('W/"zzz"'), etag)
+    assert not etag_matches(_request(None), etag)
+
+
+def test_appointments_list_304_until_data_changes(client):
+    start = datetime.now(timezone.utc) + timedelta(days=500)
+    params = {"user_id": "etag-patient"}
+    r = client.post(
+        "/api/v1/appointments/",
+        json={
+            "patient_id": "etag-patient",
+            "start_time": start.isoformat(),
+            "duration_minutes": 30,
+        },
+    )
+    assert r.status_code == 201, r.text
+    cita_id = r.json()["id"]
+
+    r = client.get("/api/v1/appointments/", params=params)
+    assert r.status_code == 200
+    etag = r.headers["etag"]
+    assert r.headers["cache-control"] == "private, no-cache"
+
+    r = client.get(
+        "/api/v1/appointments/", params=params, headers={"If-None-Match": etag}
+    )
+    assert r.status_code == 304
+    assert r.content == b""
+    assert r.headers["etag"] == etag
+
+    # Otros filtros generan otro ETag
+    r = client.get(
+        "/api/v1/appointments/",
+        params={"user_id": "otro"},
+        headers={"If-None-Match": etag},
+    )
+    assert r.status_code == 200
+
+    r = client.patch(f"/api/v1/appointments/{cita_id}/cancel")
+    assert r.status_code == 200
+    r = client.get(
+        "/api/v1/appointments/", params=params, headers={"If-None-Match": etag}
+    )
+    assert r.status_code == 200
+    assert r.headers["etag"] != etag
+    assert r.json()[0]["status"] == "cancelada"
+
+
+def test_appointments_etag_only_tracks_referenced_patients(client):
+    def new_patient(name, dni):
+        r = client.post("/api/v1/patients/", json={"full_name": name, "dni": dni})
+        assert r.status_code == 201, r.text
+        return r.json()["id"]
+
+    patient_id = new_patient("Paciente Referido", "ETAG-REF-1")
+    start = datetime.now(timezone.utc) + timedelta(days=510)
+    r = client.post(
+        "/api/v1/appointments/",
+        json={
+            "patient_id": str(patient_id),
+            "start_time": start.isoformat(),
+            "duration_minutes": 30,
+        },
+    )
+    assert r.status_code == 201, r.text
+    params = {"user_id": str(patient_id)}
+    etag = client.get("/api/v1/appointments/", params=params).headers["etag"]
+
+    # Un paciente que no aparece en el listado no invalida el ETag
+    new_patient("Paciente Ajeno", "ETAG-REF-2")
+    r = client.get(
+        "/api/v1/appointments/", params=params, headers={"If-None-Match": etag}
+    )
+    assert r.status_code == 304
+
+    # updated_at explícito: func.now() de SQLite sólo tiene resolución de segundos
+    from conftest import TestingSessionLocal
+
+    from app.models.patient import Patient
+
+    with TestingSessionLocal() as db:
+        patient = db.get(Patient, patient_id)
+        patient.full_name = "Paciente Renombrado"
+        patient.updated_at = datetime.now(timezone.utc) + timedelta(minutes=1)
+        db.commit()
+    r = client.get(
+        "/api/v1/appointments/", params=params, headers={"If-None-Match": etag}
+    )
+    assert r.status_code == 200
+    assert r.json()[0]["patient"]["last_name"] == "Renombrado"
+
+
+def test_patients_list_and_detail_304(client):
+    r = client.post(
+        "/api/v1/patients/", json={"full_name": "Paciente ETag", "dni": "ETAG-001"}
+    )
+    assert r.status_code == 201, r.text
+    patient_id = r.json()["id"]
+
+    r = client.get("/api/v1/patients/")
+    etag = r.headers["etag"]
+    r = client.get("/api/v1/patients/", headers={"If-None-Match": etag})
+    assert r.status_code == 304
+
+    r = client.get(f"/api/v1/patients/{patient_id}")
+    detail_etag = r.headers["etag"]
+    r = client.get(
+        f"/api/v1/patients/{patient_id}", headers={"If-None-Match": detail_etag}
+    )
+    assert r.status_code == 304
+
+    r = client.post(
+        "/api/v1/patients/", json={"full_name": "Otro ETag", "dni": "ETAG-002"}
+    )
+    assert r.status_code == 201
+    r = client.get("/api/v1/patients/", headers={"If-None-Match": etag})
+    assert r.status_code == 200
+
+
+def test_dashboard_resumen_304(client):
+    r = client.get("/api/v1/dashboard/resumen")
+    assert r.status_code == 200
+    etag = r.headers["etag"]
+    r = client.get("/api/v1/dashboard/resumen", headers={"If-None-Match": etag})
+    assert r.status_code == 304
+
+
+def test_notifications_etag_changes_when_marked_read(client):
+    from conftest import TestingSessionLocal
+
+    from app.models.notification import Notification
+
+    db = TestingSessionLocal()
+    notification = Notification(
+        type="cita_asignada",
+        message="ETag",
+        user_id=4242,
+        related_appointment_id=4242,
+        is_read=False,
+    )
+    db.add(notification)
+    db.commit()
+    notification_id = notification.id
+    db.close()
+
+    url = "/api/v1/notifications/notifications"
+    r = client.get(f"{url}/by-cita/4242")
+    assert r.status_code == 200
+    etag = r.headers["etag"]
+    r = client.get(f"{url}/by-cita/4242", headers={"If-None-Match": etag})
+    assert r.status_code == 304
+
+    r = client.patch(f"{url}/{notification_id}")
+    assert r.status_code == 200
+    r = client.get(f"{url}/by-cita/4242", headers={"If-None-Match": etag})
+    assert r.status_code == 200
+    assert r.headers["etag"] != etag
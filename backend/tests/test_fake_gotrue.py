@@ -0,0 +1,96 @@
+from fastapi.testclient import TestClient
+
+from benchmarks.fake_gotrue import FakeGoTrueConfig, create_app
+
+ADMIN = {"apikey": "svc", "Authorization": "Bearer svc"}
+
+
+def _client(**config):
+    return TestClient(create_app(FakeGoTrueConfig(**config)))
+
+
+def test_signup_login_user_and_refresh():
+    c = _client()
+    r = c.post(
+        "/auth/v1/signup",
+        json={"email": "Ana@Example.com", "password": "pw", "data": {"role": "admin"}},
+    )
+    assert r.status_code == 200
+
+    r = c.post(
+        "/auth/v1/token",
+        params={"grant_type": "password"},
+        json={"email": "ana@example.com", "password": "pw"},
+    )
+    assert r.status_code == 200
+    session = r.json()
+
+    me = c.get(
+        "/auth/v1/user", headers={"Authorization": f"Bearer {session['access_token']}"}
+    )
+    assert me.status_code == 200
+    assert me.json()["user_metadata"]["role"] == "admin"
+
+    r = c.post(
+        "/auth/v1/token",
+        params={"grant_type": "refresh_token"},
+        json={"refresh_token": session["refresh_token"]},
+    )
+    assert r.status_code == 200
+    # Los refresh tokens son de un solo uso
+    r = c.post(
+        "/auth/v1/token",
+        params={"grant_type": "refresh_token"},
+        json={"refresh_token": session["refresh_token"]},
+    )
+    assert r.status_code == 400
+
+
+def test_invalid_token_and_credentials():
+    c = _client()
+    assert (
+        c.get("/auth/v1/user", headers={"Authorization": "Bearer x"}).status_code == 401
+    )
+    r = c.post(
+        "/auth/v1/token",
+        params={"grant_type": "password"},
+        json={"email": "nadie@example.com", "password": "pw"},
+    )
+    assert r.status_code == 400
+    assert r.json()["error_code"] == "invalid_credentials"
+
+
+def test_admin_users_create_lookup_update_delete():
+    c = _client()
+    r = c.post(
+        "/auth/v1/admin/users",
+        headers=ADMIN,
+        json={
+            "id": "7",
+            "email": "fisio@example.com",
+            "password": "pw",
+            "email_confirm": True,
+        },
+    )
+    assert r.status_code == 200
+    assert r.json()["id"] == "7"
+
+    found = c.get(
+        "/auth/v1/admin/users", headers=ADMIN, params={"email": "fisio@example.com"}
+    )
+    assert [u["id"] for u in found.json()["users"]] == ["7"]
+
+    r = c.patch(
+        "/auth/v1/admin/users/7",
+        headers=ADMIN,
+        json={"user_metadata": {"role": "fisioterapeuta"}},
+    )
+    assert r.json()["user_metadata"]["role"] == "fisioterapeuta"
+
+    assert c.delete("/auth/v1/admin/users/7", headers=ADMIN).status_code == 200
+    assert c.get("/auth/v1/admin/users/7", headers=ADMIN).status_code == 404
+
+
+def test_error_injection():
+    c = _client(error_rate=1.0, seed=1)
+    assert c.get("/auth/v1/settings").status_code == 503
@@ -0,0 +1,120 @@
+def _create_patient(client, dni):
+    r = client.post(
+        "/api/v1/patients",
+        json={"full_name": "Ana Historial", "dni": dni, "email": "ana@example.com"},
+    )
+    assert r.status_code == 201, r.text
+    return r.json()["id"]
+
+
+def _create_historial(client, pid, fecha, diagnostico):
+    r = client.post(
+        "/api/v1/historials/historiales",
+        json={
+            "diagnostico": diagnostico,
+            "notas": None,
+            "fecha": fecha,
+            "paciente_id": pid,
+        },
+    )
+    assert r.status_code == 200, r.text
+    return r.json()["id"]
+
+
+def _create_terapia(client, hid, tipo):
+    r = client.post(
+        "/api/v1/historials/terapias",
+        json={"tipo": tipo, "observaciones": None, "duracion": 30, "historial_id": hid},
+    )
+    assert r.status_code == 200, r.text
+
+
+def test_historial_completo_single_query(client, query_budget):
+    pid = _create_patient(client, "5550001110")
+    h1 = _create_historial(client, pid, "2025-01-10", "Lumbalgia")
+    h2 = _create_historial(client, pid, "2025-03-02", "Esguince")
+    _create_terapia(client, h1, "TENS")
+    _create_terapia(client, h1, "Masaje")
+    _create_terapia(client, h2, "Crioterapia")
+
+    with query_budget(1):
+        r = client.get(f"/api/v1/historials/pacientes/{pid}/historial-completo")
+
+    assert r.status_code == 200, r.text
+    data = r.json()
+    assert [h["diagnostico"] for h in data["historiales"]] == ["Esguince", "Lumbalgia"]
+    assert [t["tipo"] for t in data["historiales"][1]["terapias"]] == ["TENS", "Masaje"]
+
+    r = client.get(f"/api/v1/historials/pacientes/{pid}/terapias")
+    assert r.status_code == 200
+    assert len(r.json()) == 3
+
+
+def test_historial_completo_not_found(client):
+    r = client.get("/api/v1/historials/pacientes/999999/historial-completo")
+    assert r.status_code == 404
+
+
+def test_patient_timeline_cursor_pagination(client):
+    from datetime import datetime
+
+    from app.db.session import get_db
+    from app.main import app
+    from app.models.appointment import Appointment
+
+    pid = _create_patient(client, "5550002220")
+    h1 = _create_historial(client, pid, "2024-05-01", "Tendinitis")
+    h2 = _create_historial(client, pid, "2024-06-01", "Control")
+    _create_terapia(client, h1, "Ultrasonido")
+    _create_terapia(client, h2, "Ejercicio")
+
+    db = next(app.dependency_overrides[get_db]())
+    try:
+        db.add_all(
+            [
+                Appointment(
+                    start_time=datetime(2024, 5, 15, 14, 0),
+                    duration_minutes=30,
+                    patient_id=str(pid),
+                ),
+                Appointment(
+                    start_time=datetime(2024, 6, 1, 9, 0),
+                    duration_minutes=30,
+                    patient_id=str(pid),
+                ),
+            ]
+        )
+        db.commit()
+    finally:
+        db.close()
+
+    seen = []
+    cursor = None
+    while True:
+        params = {"limit": 2}
+        if cursor:
+            params["cursor"] = cursor
+        r = client.get(f"/api/v1/historials/pacientes/{pid}/timeline", params=params)
+        assert r.status_code == 200, r.text
+        page = r.json()
+        assert len(page["items"]) <= 2
+        seen.extend((item["kind"], item["timestamp"][:10]) for item in page["items"])
+        cursor = page["next_cursor"]
+        if not cursor:
+            break
+
+    assert seen == [
+        ("cita", "2024-06-01"),
+        ("historial", "2024-06-01"),
+        ("terapia", "2024-06-01"),
+        ("cita", "2024-05-15"),
+        ("historial", "2024-05-01"),
+        ("terapia", "2024-05-01"),
+    ]
+
+
+def test_patient_timeline_invalid_cursor(client):
+    r = client.get(
+        "/api/v1/historials/pacientes/1/timeline", params={"cursor": "no-valido"}
+    )
+    assert r.status_code == 400
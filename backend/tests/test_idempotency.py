@@ -0,0 +1,97 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+from app.idempotency import MemoryIdempotencyStore
+
+
+def _payload(patient_id: str, hour: int) -> dict:
+    day = (datetime.now(timezone.utc) + timedelta(days=950)).date()
+    start = datetime(day.year, day.month, day.day, hour, tzinfo=timezone.utc)
+    return {
+        "patient_id": patient_id,
+        "fisio_id": "7709",
+        "start_time": start.isoformat(),
+        "duration_minutes": 45,
+    }
+
+
+def test_retry_with_same_key_replays_response(client):
+    payload = _payload("7701", 14)
+    headers = {"Idempotency-Key": "reintento-7701"}
+
+    first = client.post("/api/v1/appointments/", json=payload, headers=headers)
+    assert first.status_code == 201, first.text
+    assert "idempotent-replayed" not in first.headers
+
+    retry = client.post("/api/v1/appointments/", json=payload, headers=headers)
+    assert retry.status_code == 201
+    assert retry.headers["idempotent-replayed"] == "true"
+    assert retry.json() == first.json()
+
+    citas = client.get("/api/v1/appointments/", params={"user_id": "7701"}).json()
+    assert [c["id"] for c in citas] == [first.json()["id"]]
+
+    # Sin clave, el mismo cuerpo vuelve a pasar por la validación (horario ocupado)
+    r = client.post("/api/v1/appointments/", json=payload)
+    assert r.status_code == 409
+
+
+def test_same_key_with_other_body_is_rejected(client):
+    headers = {"Idempotency-Key": "reintento-7702"}
+    r = client.post("/api/v1/appointments/", json=_payload("7702", 16), headers=headers)
+    assert r.status_code == 201, r.text
+
+    r = client.post("/api/v1/appointments/", json=_payload("7702", 18), headers=headers)
+    assert r.status_code == 422
+    assert "Idempotency-Key" in r.json()["detail"]["message"]
+
+
+def test_middleware_answers_carry_cors_headers(client):
+    headers = {"Idempotency-Key": "reintento-7704", "Origin": "http://localhost:4200"}
+    payload = _payload("7704", 12)
+    first = client.post("/api/v1/appointments/", json=payload, headers=headers)
+    assert first.status_code == 201, first.text
+    assert "access-control-allow-origin" in first.headers
+
+    retry = client.post("/api/v1/appointments/", json=payload, headers=headers)
+    assert retry.headers["idempotent-replayed"] == "true"
+    assert "access-control-allow-origin" in retry.headers
+
+    r = client.post("/api/v1/appointments/", json=_payload("7704", 19), headers=headers)
+    assert r.status_code == 422
+    assert "access-control-allow-origin" in r.headers
+
+
+def test_errors_are_not_stored(client):
+    headers = {"Idempotency-Key": "reintento-7703"}
+    past = datetime.now(timezone.utc) - timedelta(days=1)
+    bad = dict(_payload("7703", 15), start_time=past.isoformat())
+    r = client.post("/api/v1/appointments/", json=bad, headers=headers)
+    assert r.status_code == 400
+
+    # La clave quedó libre: el reintento se procesa de nuevo
+    r = client.post("/api/v1/appointments/", json=bad, headers=headers)
+    assert r.status_code == 400
+    assert "idempotent-replayed" not in r.headers
+
+
+def test_memory_store_expires_and_bounds_entries():
+    now = [0.0]
+    store = MemoryIdempotencyStore(max_entries=2, clock=lambda: now[0])
+
+    async def scenario():
+        assert await store.reserve("a", {"fingerprint": "x"}, ttl=10) is None
+        assert await store.reserve("a", {"fingerprint": "y"}, ttl=10) == {
+            "fingerprint": "x"
+        }
+        await store.save("a", {"fingerprint": "x", "status": 201}, ttl=10)
+        assert await store.reserve("b", {"fingerprint": "b"}, ttl=10) is None
+        assert await store.reserve("c", {"fingerprint": "c"}, ttl=10) is None
+        # Con más de `max_entries` se expulsa la más antigua
+        assert await store.reserve("d", {"fingerprint": "d"}, ttl=10) is None
+        assert await store.reserve("a", {"fingerprint": "a2"}, ttl=10) is None
+        now[0] = 11.0
+        assert await store.reserve("d", {"fingerprint": "d2"}, ttl=10) is None
+        assert len(store) == 1
+
+    asyncio.run(scenario())
@@ -0,0 +1,53 @@
+from datetime import datetime, timedelta, timezone
+
+from app.models.user import User, UserRole
+
+
+def test_list_citas_serializes_fisio_info(client):
+    from conftest import TestingSessionLocal
+
+    db = TestingSessionLocal()
+    fisio = User(
+        email="fisio.serial@example.com",
+        first_name="Marta",
+        last_name="Ruiz",
+        role=UserRole.fisioterapeuta,
+        hashed_password="!",
+    )
+    db.add(fisio)
+    db.commit()
+    fisio_id = str(fisio.id)
+    db.close()
+
+    start = datetime.now(timezone.utc) + timedelta(days=400)
+    r = client.post(
+        "/api/v1/appointments/",
+        json={
+            "patient_id": "serial-patient",
+            "fisio_id": fisio_id,
+            "start_time": start.isoformat(),
+            "duration_minutes": 30,
+        },
+    )
+    assert r.status_code == 201, r.text
+
+    r = client.get("/api/v1/appointments/", params={"user_id": "serial-patient"})
+    assert r.status_code == 200
+    assert r.headers["content-type"] == "application/json"
+    (item,) = r.json()
+    assert item["fisio"] == {
+        "id": fisio_id,
+        "first_name": "Marta",
+        "last_name": "Ruiz",
+        "email": "fisio.serial@example.com",
+    }
+
+
+def test_list_pacientes_returns_plain_json_list(client):
+    r = client.post(
+        "/api/v1/patients/", json={"full_name": "Serial Paciente", "dni": "SER-001"}
+    )
+    assert r.status_code == 201, r.text
+    r = client.get("/api/v1/patients/search", params={"search": "Serial Paciente"})
+    assert r.status_code == 200
+    assert [p["dni"] for p in r.json()] == ["SER-001"]
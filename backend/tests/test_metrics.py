@@ -0,0 +1,53 @@
+import pytest
+
+from app.metrics import registry, track_gotrue
+
+
+def test_metrics_endpoint_exposes_route_latency_and_pool(client):
+    client.get("/api/v1/appointments/", params={"user_id": "metrics-user"})
+    r = client.get("/metrics")
+    assert r.status_code == 200
+    assert r.headers["content-type"].startswith("text/plain")
+    body = r.text
+    assert 'route="/api/v1/appointments/"' in body
+    assert "fisiomove_http_request_duration_seconds_bucket" in body
+    assert "fisiomove_http_requests_in_progress" in body
+    assert "fisiomove_db_pool_checkouts" in body
+
+
+def test_track_gotrue_counts_http_and_network_errors():
+    def errors(status):
+        return (
+            registry.get_sample_value(
+                "fisiomove_gotrue_errors_total",
+                {"operation": "test_op", "status": status},
+            )
+            or 0
+        )
+
+    before_http, before_net = errors("401"), errors("network")
+    with track_gotrue("test_op") as call:
+        call["status"] = 200
+    with track_gotrue("test_op") as call:
+        call["status"] = 401
+    with pytest.raises(ConnectionError):
+        with track_gotrue("test_op"):
+            raise ConnectionError("caído")
+
+    assert errors("401") == before_http + 1
+    assert errors("network") == before_net + 1
+    assert (
+        registry.get_sample_value(
+            "fisiomove_gotrue_request_duration_seconds_count", {"operation": "test_op"}
+        )
+        >= 3
+    )
+
+
+def test_metrics_endpoint_requires_token_when_configured(client, monkeypatch):
+    from app.core.config import settings
+
+    monkeypatch.setattr(settings, "METRICS_TOKEN", "scrape-secret")
+    assert client.get("/metrics").status_code == 401
+    headers = {"Authorization": "Bearer scrape-secret"}
+    assert client.get("/metrics", headers=headers).status_code == 200
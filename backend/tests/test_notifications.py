@@ -65,3 +65,9 @@ def test_notification_persistence(db):
     assert notif.user_id == 1
     assert notif.message == "Test message"
     assert notif.related_appointment_id == 123
+
+
+def test_list_notifications_endpoint(client):
+    r = client.get("/api/v1/notifications/notifications")
+    assert r.status_code == 200
+    assert isinstance(r.json(), list)
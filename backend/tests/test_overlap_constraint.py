@@ -0,0 +1,208 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy.exc import IntegrityError
+
+from app.models.appointment import Appointment
+from app.services import appointments as ap_svc
+
+
+class _PgError(Exception):
+    pgcode = "23P01"
+
+
+def test_end_time_is_persisted_and_kept_in_sync():
+    from conftest import TestingSessionLocal
+
+    db = TestingSessionLocal()
+    start = datetime(2031, 5, 6, 14, 0, tzinfo=timezone.utc)
+    ap = Appointment(start_time=start, duration_minutes=45, patient_id="8001")
+    db.add(ap)
+    db.commit()
+    assert ap.end_time.replace(tzinfo=None) == datetime(2031, 5, 6, 14, 45)
+
+    ap.duration_minutes = 90
+    db.commit()
+    db.expire_all()
+    assert ap.end_time.replace(tzinfo=None) == datetime(2031, 5, 6, 15, 30)
+    db.delete(ap)
+    db.commit()
+    db.close()
+
+
+def test_overlap_violation_becomes_value_error():
+    class FakeDB:
+        rolled_back = False
+
+        def commit(self):
+            raise IntegrityError("INSERT", {}, _PgError("conflicting key value"))
+
+        def rollback(self):
+            self.rolled_back = True
+
+    db = FakeDB()
+    with pytest.raises(ValueError, match="Conflicto de horario"):
+        ap_svc._commit_checked(db)
+    assert db.rolled_back
+
+
+def test_other_integrity_errors_are_reraised():
+    class FakeDB:
+        def commit(self):
+            raise IntegrityError("INSERT", {}, Exception("NOT NULL failed"))
+
+        def rollback(self):
+            pass
+
+    with pytest.raises(IntegrityError):
+        ap_svc._commit_checked(FakeDB())
+
+
+def test_constraint_mode_skips_python_precheck(monkeypatch):
+    from conftest import TestingSessionLocal
+
+    def fail_has_conflict(*args, **kwargs):
+        raise AssertionError("no debe consultarse con la restricción activa")
+
+    # Como en Postgres con la migración aplicada
+    monkeypatch.setattr(ap_svc, "overlap_constraint_enforced", lambda db: True)
+    monkeypatch.setattr(ap_svc, "has_conflict", fail_has_conflict)
+    monkeypatch.setattr(ap_svc, "notify_cita_asignada", lambda *a, **k: None)
+
+    db = TestingSessionLocal()
+    ap = ap_svc.create_appointment(
+        db,
+        start_time=datetime.now(timezone.utc) + timedelta(days=700),
+        duration_minutes=30,
+        patient_id="8002",
+        fisio_id="8003",
+    )
+    assert ap.id is not None
+    db.delete(ap)
+    db.commit()
+    db.close()
+
+
+def test_constraint_flag_only_trusted_on_postgres(monkeypatch):
+    from types import SimpleNamespace
+
+    from conftest import TestingSessionLocal
+
+    def fake_db(dialect):
+        bind = SimpleNamespace(dialect=SimpleNamespace(name=dialect))
+        return SimpleNamespace(get_bind=lambda: bind)
+
+    monkeypatch.setattr(ap_svc.settings, "APPOINTMENT_OVERLAP_CONSTRAINT", True)
+    assert ap_svc.overlap_constraint_enforced(fake_db("postgresql"))
+    with TestingSessionLocal() as db:
+        assert not ap_svc.overlap_constraint_enforced(db)
+    monkeypatch.setattr(ap_svc.settings, "APPOINTMENT_OVERLAP_CONSTRAINT", False)
+    assert not ap_svc.overlap_constraint_enforced(fake_db("postgresql"))
+
+
+def test_flag_without_constraint_still_rejects_overlap_with_409(client, monkeypatch):
+    monkeypatch.setattr(ap_svc.settings, "APPOINTMENT_OVERLAP_CONSTRAINT", True)
+    start = datetime.now(timezone.utc) + timedelta(days=720)
+
+    def create(offset_hours):
+        r = client.post(
+            "/api/v1/appointments/",
+            json={
+                "patient_id": f"830{offset_hours}",
+                "fisio_id": "8399",
+                "start_time": (start + timedelta(hours=offset_hours)).isoformat(),
+                "duration_minutes": 60,
+            },
+        )
+        assert r.status_code == 201, r.text
+        return r.json()["id"]
+
+    create(0)
+    second = create(2)
+    r = client.put(
+        f"/api/v1/appointments/{second}",
+        json={"start_time": (start + timedelta(minutes=30)).isoformat()},
+    )
+    assert r.status_code == 409, r.text
+    assert r.json()["detail"]["message"] == ap_svc.CONFLICT_MESSAGE
+
+
+def test_constraint_mode_still_rejects_patient_overlap(client, monkeypatch):
+    # Como en Postgres con la migración: EXCLUDE sólo cubre al mismo fisio
+    monkeypatch.setattr(ap_svc, "overlap_constraint_enforced", lambda db: True)
+    start = datetime.now(timezone.utc) + timedelta(days=725)
+
+    def create(fisio_id, offset_min):
+        return client.post(
+            "/api/v1/appointments/",
+            json={
+                "patient_id": "8350",
+                "fisio_id": fisio_id,
+                "start_time": (start + timedelta(minutes=offset_min)).isoformat(),
+                "duration_minutes": 60,
+            },
+        )
+
+    r = create("8351", 0)
+    assert r.status_code == 201, r.text
+    r = create("8352", 30)
+    assert r.status_code == 409, r.text
+
+
+def test_sql_overlap_checks_ignore_cancelled_and_adjacent():
+    from conftest import TestingSessionLocal
+
+    from app.models.appointment import AppointmentStatus
+
+    db = TestingSessionLocal()
+    start = datetime(2032, 3, 1, 15, 0, tzinfo=timezone.utc)
+    active = Appointment(
+        start_time=start, duration_minutes=60, patient_id="8101", fisio_id="8102"
+    )
+    cancelled = Appointment(
+        start_time=start + timedelta(hours=3),
+        duration_minutes=60,
+        patient_id="8101",
+        fisio_id="8102",
+        status=AppointmentStatus.cancelada,
+    )
+    db.add_all([active, cancelled])
+    db.commit()
+
+    def conflict(offset_min, minutes, fisio_id="8102", exclude_id=None):
+        s = start + timedelta(minutes=offset_min)
+        return ap_svc.has_conflict(
+            db,
+            fisio_id=fisio_id,
+            start=s,
+            end=s + timedelta(minutes=minutes),
+            exclude_id=exclude_id,
+        )
+
+    assert conflict(30, 60)
+    assert conflict(-30, 45)
+    assert not conflict(60, 30)  # justo después
+    assert not conflict(-30, 30)  # justo antes
+    assert not conflict(30, 60, fisio_id="otro")
+    assert not conflict(30, 60, exclude_id=active.id)
+    assert not conflict(180, 60)  # la cita cancelada no bloquea
+
+    available = ap_svc.is_time_slot_available(
+        db,
+        start_time=start + timedelta(minutes=45),
+        duration_minutes=30,
+        patient_id="cualquiera",
+    )
+    assert available is False
+    available = ap_svc.is_time_slot_available(
+        db,
+        start_time=start + timedelta(hours=3),
+        duration_minutes=30,
+        patient_id="cualquiera",
+    )
+    assert available is True
+
+    db.delete(active)
+    db.delete(cancelled)
+    db.commit()
+    db.close()
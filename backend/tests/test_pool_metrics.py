@@ -0,0 +1,79 @@
+import pytest
+from sqlalchemy import create_engine, exc, text
+
+from app.db.pool_metrics import (
+    InstrumentedQueuePool,
+    PoolMetrics,
+    instrument_pool,
+    pool_status,
+)
+
+
+def make_engine(tmp_path, metrics, pre_ping="always"):
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'pool.db'}",
+        poolclass=InstrumentedQueuePool,
+        pool_size=1,
+        max_overflow=0,
+        pool_timeout=0.05,
+    )
+    instrument_pool(engine.pool, metrics=metrics, pre_ping=pre_ping)
+    return engine
+
+
+def test_pool_metrics_checkout_and_pre_ping(tmp_path):
+    metrics = PoolMetrics()
+    engine = make_engine(tmp_path, metrics)
+
+    with engine.connect() as conn:
+        conn.execute(text("SELECT 1"))
+        status = pool_status(engine.pool, metrics)
+        assert status["checked_out"] == 1
+        # pool_size=1 sin overflow: un segundo checkout agota el timeout
+        with pytest.raises(exc.TimeoutError):
+            engine.connect()
+
+    with engine.connect() as conn:
+        conn.execute(text("SELECT 1"))
+
+    status = pool_status(engine.pool, metrics)
+    assert status["checked_out"] == 0
+    assert status["checkouts"] == 2
+    assert status["checkout_timeouts"] == 1
+    # La primera conexión es nueva (sin ping); la reutilizada sí se comprueba
+    assert status["pre_pings"] == 1
+    assert status["pre_ping_failures"] == 0
+
+
+def test_pool_pre_ping_idle_and_never_skip_recent_connections(tmp_path):
+    for strategy in ("idle", "never"):
+        metrics = PoolMetrics()
+        engine = make_engine(tmp_path, metrics, pre_ping=strategy)
+        for _ in range(3):
+            with engine.connect() as conn:
+                conn.execute(text("SELECT 1"))
+        assert metrics.snapshot()["pre_pings"] == 0
+        engine.dispose()
+
+
+def test_instrument_pool_rejects_unknown_strategy(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'pool.db'}")
+    with pytest.raises(ValueError):
+        instrument_pool(engine.pool, metrics=PoolMetrics(), pre_ping="sometimes")
+
+
+def test_db_pool_health_endpoint(client):
+    resp = client.get("/health/db-pool")
+    assert resp.status_code == 200
+    data = resp.json()
+    assert data["configured"]["pre_ping"] in ("always", "idle", "never")
+    assert "checkout_wait_avg_ms" in data
+
+
+def test_db_pool_health_endpoint_requires_admin(client, monkeypatch):
+    from app.main import app
+    from app.services.auth import get_current_user
+
+    paciente = {"id": "p-1", "user_metadata": {"role": "paciente"}}
+    monkeypatch.setitem(app.dependency_overrides, get_current_user, lambda: paciente)
+    assert client.get("/health/db-pool").status_code == 403
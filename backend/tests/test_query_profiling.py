@@ -0,0 +1,39 @@
+import re
+
+import pytest
+
+from app.db.profiling import QueryStats
+
+
+def test_server_timing_header_reports_queries(client):
+    r = client.get("/api/v1/appointments/", params={"user_id": "profiling-user"})
+    assert r.status_code == 200
+    header = r.headers["server-timing"]
+    match = re.match(r'db;dur=[\d.]+;desc="(\d+) queries", app;dur=[\d.]+', header)
+    assert match, header
+    assert int(match.group(1)) >= 1
+
+
+def test_query_stats_keeps_slowest():
+    stats = QueryStats(top_n=2)
+    for sec, sql in [(0.01, "A"), (0.5, "B"), (0.2, "C"), (0.05, "D")]:
+        stats.record(sql, sec)
+    assert stats.count == 4
+    assert [sql for _, sql in stats.slowest_sorted()] == ["B", "C"]
+
+
+def test_query_budget_fails_when_exceeded(client, query_budget):
+    with pytest.raises(AssertionError, match="Presupuesto de consultas excedido"):
+        with query_budget(0):
+            client.get("/api/v1/appointments/", params={"user_id": "profiling-user"})
+
+
+def test_profiling_defaults_to_development_only(monkeypatch):
+    from app.core.config import Settings
+
+    monkeypatch.delenv("QUERY_PROFILING_ENABLED", raising=False)
+    assert Settings(ENV="development").QUERY_PROFILING_ENABLED is True
+    assert Settings(ENV="production").QUERY_PROFILING_ENABLED is False
+    assert Settings(
+        ENV="production", QUERY_PROFILING_ENABLED=True
+    ).QUERY_PROFILING_ENABLED
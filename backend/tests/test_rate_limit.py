@@ -0,0 +1,49 @@
+from types import SimpleNamespace
+
+import pytest
+
+from app.core.config import settings
+from app.limiter import limiter, rate_limit_key
+
+
+@pytest.fixture
+def fresh_limiter():
+    limiter.reset()
+    yield limiter
+    limiter.reset()
+
+
+def _request(user_id=None, authorization=None):
+    headers = {"authorization": authorization} if authorization else {}
+    return SimpleNamespace(
+        state=SimpleNamespace(user_id=user_id),
+        headers=headers,
+        client=SimpleNamespace(host="10.0.0.7"),
+    )
+
+
+def test_rate_limit_key_prefers_user_then_token_then_ip():
+    assert rate_limit_key(_request("u-1", "Bearer a")) == "user:u-1"
+    token_key = rate_limit_key(_request(authorization="Bearer a"))
+    assert token_key.startswith("tok:")
+    assert token_key != rate_limit_key(_request(authorization="Bearer b"))
+    assert rate_limit_key(_request()) == "ip:10.0.0.7"
+
+
+def test_availability_is_limited_per_user(client, fresh_limiter, monkeypatch):
+    monkeypatch.setattr(settings, "AVAILABILITY_RATE_LIMIT", "2/minute")
+    params = {"date": "2031-03-03", "patient_id": "7801"}
+    alice = {"Authorization": "Bearer token-alice"}
+    bob = {"Authorization": "Bearer token-bob"}
+
+    for _ in range(2):
+        r = client.get(
+            "/api/v1/appointments/availability", params=params, headers=alice
+        )
+        assert r.status_code == 200, r.text
+    r = client.get("/api/v1/appointments/availability", params=params, headers=alice)
+    assert r.status_code == 429
+
+    # Otro usuario (aunque comparta IP) tiene su propio contador
+    r = client.get("/api/v1/appointments/availability", params=params, headers=bob)
+    assert r.status_code == 200, r.text
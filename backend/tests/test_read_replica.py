@@ -0,0 +1,105 @@
+import asyncio
+from datetime import datetime, timedelta
+
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.db.base import Base
+from app.db.replica import (
+    ClientTrackingMiddleware,
+    MemoryWriteTracker,
+    build_write_tracker,
+    make_read_db,
+)
+from app.db.session import get_read_db
+from app.main import app
+from app.models.appointment import Appointment
+
+# Como en producción con DATABASE_READ_URL (en tests no hay réplica configurada):
+# dos workers con un almacén de marcas compartido (Redis en producción)
+tracker = MemoryWriteTracker(5)
+worker_a = TestClient(ClientTrackingMiddleware(app, tracker=tracker))
+worker_b = TestClient(ClientTrackingMiddleware(app, tracker=tracker))
+
+
+def test_reads_use_replica_until_same_client_writes(client, tmp_path):
+    from conftest import TestingSessionLocal
+
+    replica_engine = create_engine(
+        f"sqlite:///{tmp_path / 'replica.db'}",
+        connect_args={"check_same_thread": False},
+    )
+    Base.metadata.create_all(bind=replica_engine)
+    ReplicaSession = sessionmaker(
+        autocommit=False, autoflush=False, bind=replica_engine
+    )
+
+    # Fila sólo en el primario: simula una réplica con lag
+    with TestingSessionLocal() as db:
+        db.add(
+            Appointment(
+                start_time=datetime(2031, 1, 1, 10, 0) + timedelta(days=1),
+                duration_minutes=30,
+                patient_id="replica-user",
+            )
+        )
+        db.commit()
+
+    previous = app.dependency_overrides.get(get_read_db)
+    app.dependency_overrides[get_read_db] = make_read_db(
+        TestingSessionLocal, ReplicaSession
+    )
+    tracker.clear()
+    try:
+        params = {"user_id": "replica-user"}
+        assert worker_b.get("/api/v1/appointments/", params=params).json() == []
+
+        # Una escritura del mismo cliente (en otro worker) fuerza lecturas del primario
+        r = worker_a.post(
+            "/api/v1/patients", json={"full_name": "Replica Lag", "dni": "8880001"}
+        )
+        assert r.status_code == 201
+        assert len(worker_b.get("/api/v1/appointments/", params=params).json()) == 1
+
+        # Otro cliente (otro token) sigue leyendo de la réplica
+        other = {"Authorization": "Bearer otro-usuario"}
+        r = worker_b.get("/api/v1/appointments/", params=params, headers=other)
+        assert r.json() == []
+    finally:
+        app.dependency_overrides[get_read_db] = previous
+        tracker.clear()
+        replica_engine.dispose()
+
+
+def test_read_only_post_does_not_mark_write(client):
+    tracker.clear()
+    r = worker_a.post(
+        "/api/v1/appointments/check-availability",
+        json={
+            "start_time": "2031-06-01T10:00:00+00:00",
+            "duration_minutes": 30,
+            "patient_id": "1",
+        },
+    )
+    assert r.status_code == 200
+    assert not asyncio.run(tracker.wrote_recently("ip:testclient"))
+
+
+def test_redis_tracker_marks_with_expiry():
+    class FakeRedis:
+        def __init__(self):
+            self.keys = {}
+
+        def set(self, name, value, px):
+            self.keys[name] = px
+
+        def exists(self, name):
+            return int(name in self.keys)
+
+    redis_tracker = build_write_tracker("redis://localhost:6379/0", 2.5)
+    redis_tracker._client = FakeRedis()
+    assert not asyncio.run(redis_tracker.wrote_recently("tok:abc"))
+    asyncio.run(redis_tracker.mark("tok:abc"))
+    assert asyncio.run(redis_tracker.wrote_recently("tok:abc"))
+    assert redis_tracker._client.keys == {"read-after-write:tok:abc": 2500}
@@ -0,0 +1,92 @@
+import random
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+
+from app.services.scheduling import (
+    busy_arrays,
+    free_mask,
+    free_starts,
+    slot_starts,
+    subtract_intervals,
+    to_epoch_minutes,
+)
+
+BASE = datetime(2030, 6, 3, 13, 0)
+
+
+def test_free_mask_matches_brute_force():
+    rng = random.Random(7)
+    busy = []
+    for _ in range(300):
+        start = BASE + timedelta(minutes=rng.randrange(0, 7 * 24 * 60))
+        busy.append((start, start + timedelta(minutes=rng.choice([15, 30, 90, 600]))))
+    candidates = [BASE + timedelta(minutes=15 * i) for i in range(7 * 96)]
+    durations = np.array([15, 30, 60, 120])
+
+    mask = free_mask(
+        busy_arrays(busy), to_epoch_minutes(candidates)[:, None], durations
+    )
+    assert mask.shape == (len(candidates), len(durations))
+    for i, cand in enumerate(candidates):
+        for j, minutes in enumerate(durations.tolist()):
+            end = cand + timedelta(minutes=minutes)
+            expected = not any(cand < e and end > s for s, e in busy)
+            assert bool(mask[i, j]) is expected
+
+
+def test_busy_is_rounded_outwards_and_adjacent_is_free():
+    busy = [(BASE + timedelta(seconds=90), BASE + timedelta(minutes=30, seconds=1))]
+    arrays = busy_arrays(busy)
+    base = int(to_epoch_minutes([BASE])[0])
+    assert arrays.starts.tolist() == [base + 1]
+    assert arrays.max_ends.tolist() == [base + 31]
+    assert free_mask(arrays, np.array([base - 30, base + 31]), 30).tolist() == [
+        True,
+        True,
+    ]
+    assert free_mask(arrays, np.array([base + 30]), 30).tolist() == [False]
+
+
+def test_free_starts_keeps_candidate_timezone_and_order():
+    bogota = timezone(timedelta(hours=-5))
+    candidates = [datetime(2030, 6, 3, h, 0, tzinfo=bogota) for h in (8, 9, 10)]
+    # 14:00-15:00 UTC = 09:00-10:00 en Bogotá
+    busy = [(datetime(2030, 6, 3, 14, 0), datetime(2030, 6, 3, 15, 0))]
+    assert free_starts(busy, candidates, 60) == [candidates[0], candidates[2]]
+    assert free_starts([], candidates, 60) == candidates
+    assert free_starts(busy, [], 60) == []
+
+
+def test_free_starts_rounds_candidates_with_seconds_outwards():
+    busy = [(BASE + timedelta(minutes=30), BASE + timedelta(minutes=60))]
+    # [10:00:30, 10:30:30) pisa la cita de las 10:30
+    late = BASE + timedelta(seconds=30)
+    assert free_starts(busy, [BASE, late], 30) == [BASE]
+    # Antes del ocupado con margen suficiente sigue libre
+    early = BASE - timedelta(seconds=30)
+    assert free_starts(busy, [early], 30) == [early]
+
+
+def test_subtract_intervals_and_slot_starts():
+    h = lambda hour, minute=0: BASE.replace(hour=hour, minute=minute)  # noqa: E731
+    open_ = [(h(8), h(12)), (h(14), h(18))]
+    busy = [
+        (h(9), h(10)),
+        (h(9, 30), h(10, 15)),
+        (h(11, 50), h(14, 30)),
+        (h(19), h(20)),
+    ]
+    free = subtract_intervals(open_, busy)
+    assert free == [(h(8), h(9)), (h(10, 15), h(11, 50)), (h(14, 30), h(18))]
+    starts = slot_starts(free, 60, 30, anchor=h(0))
+    assert [s.strftime("%H:%M") for s in starts] == [
+        "08:00",
+        "10:30",
+        "14:30",
+        "15:00",
+        "15:30",
+        "16:00",
+        "16:30",
+        "17:00",
+    ]
@@ -0,0 +1,53 @@
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+
+PROBE = """
+import json, sys
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+statements = []
+event.listen(Engine, "before_cursor_execute", lambda *a: statements.append(1))
+import app.main
+import supabase_config, supabase_utils.auth, supabase_utils.client
+print(json.dumps({"statements": len(statements), "sdk": "supabase" in sys.modules}))
+"""
+
+# Scripts de línea de comandos: sólo la parte de la app que necesitan
+CLI_PROBE = """
+import json, sys
+import app.services.assignment, get_fresh_token
+heavy = ("fastapi", "passlib", "requests", "slowapi")
+print(json.dumps(sorted(m for m in heavy if m in sys.modules)))
+"""
+
+
+def _run(probe: str, tmp_path):
+    env = {
+        **os.environ,
+        "DATABASE_URL": f"sqlite:///{tmp_path / 'startup.db'}",
+        "SUPABASE_URL": "http://localhost:9999",
+        "SUPABASE_API_KEY": "x",
+    }
+    out = subprocess.run(
+        [sys.executable, "-c", probe],
+        cwd=BACKEND_DIR,
+        env=env,
+        check=True,
+        capture_output=True,
+        text=True,
+    )
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def test_import_runs_no_sql_and_creates_no_clients(tmp_path):
+    assert _run(PROBE, tmp_path) == {"statements": 0, "sdk": False}
+
+
+def test_cli_imports_skip_web_and_auth_stacks(tmp_path):
+    assert _run(CLI_PROBE, tmp_path) == []
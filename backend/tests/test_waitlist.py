@@ -0,0 +1,298 @@
+from datetime import datetime, timedelta, timezone
+
+
+def _at(day, hour: int, minute: int = 0) -> str:
+    return datetime(
+        day.year, day.month, day.day, hour, minute, tzinfo=timezone.utc
+    ).isoformat()
+
+
+def _join(client, day, patient_id: str, minutes: int, fisio_id=None) -> dict:
+    r = client.post(
+        "/api/v1/waitlist/",
+        json={
+            "patient_id": patient_id,
+            "fisio_id": fisio_id,
+            "window_start": _at(day, 13),
+            "window_end": _at(day, 23),
+            "duration_minutes": minutes,
+        },
+    )
+    assert r.status_code == 201, r.text
+    assert r.json()["status"] == "en_espera"
+    return r.json()
+
+
+def _book(client, day, hour: int, patient_id: str, fisio_id=None) -> int:
+    r = client.post(
+        "/api/v1/appointments/",
+        json={
+            "patient_id": patient_id,
+            "fisio_id": fisio_id,
+            "start_time": _at(day, hour),
+            "duration_minutes": 60,
+        },
+    )
+    assert r.status_code == 201, r.text
+    return r.json()["id"]
+
+
+def _entries(client, patient_id: str) -> list[dict]:
+    return client.get("/api/v1/waitlist/", params={"patient_id": patient_id}).json()
+
+
+def test_cancel_backfills_preferred_fisio_entry(client):
+    day = (datetime.now(timezone.utc) + timedelta(days=900)).date()
+    any_fisio = _join(client, day, "7501", 30)
+    preferred = _join(client, day, "7502", 60, fisio_id="7509")
+
+    cita_id = _book(client, day, 15, "7500", fisio_id="7509")
+    r = client.patch(f"/api/v1/appointments/{cita_id}/cancel")
+    assert r.status_code == 200, r.text
+    assert r.json()["status"] == "cancelada"
+
+    (entry,) = _entries(client, "7502")
+    assert entry["id"] == preferred["id"]
+    assert entry["status"] == "asignada"
+    booked = client.get(f"/api/v1/appointments/{entry['appointment_id']}").json()
+    assert booked["patient_id"] == "7502"
+    assert booked["fisio_id"] == "7509"
+    assert booked["start_time"].startswith(_at(day, 15)[:16])
+    assert booked["duration_minutes"] == 60
+
+    # No queda hueco para la otra entrada
+    assert _entries(client, "7501")[0]["status"] == "en_espera"
+    client.delete(f"/api/v1/waitlist/{any_fisio['id']}")
+
+
+def test_delete_fills_freed_slot_with_several_entries(client):
+    day = (datetime.now(timezone.utc) + timedelta(days=905)).date()
+    first = _join(client, day, "7601", 30)
+    second = _join(client, day, "7602", 30)
+    too_long = _join(client, day, "7603", 90)
+
+    cita_id = _book(client, day, 17, "7600")
+    assert client.delete(f"/api/v1/appointments/{cita_id}").status_code == 200
+
+    starts = []
+    for entry in (first, second):
+        (current,) = _entries(client, entry["patient_id"])
+        assert current["status"] == "asignada"
+        ap = client.get(f"/api/v1/appointments/{current['appointment_id']}").json()
+        starts.append(ap["start_time"][11:16])
+    assert starts == ["17:00", "17:30"]
+    assert _entries(client, "7603")[0]["status"] == "en_espera"
+
+    r = client.delete(f"/api/v1/waitlist/{too_long['id']}")
+    assert r.status_code == 200
+    assert r.json()["status"] == "cancelada"
+    assert client.delete(f"/api/v1/waitlist/{too_long['id']}").status_code == 409
+    assert client.delete("/api/v1/waitlist/999999").status_code == 404
+
+
+def test_waitlist_rejects_window_shorter_than_duration(client):
+    day = (datetime.now(timezone.utc) + timedelta(days=906)).date()
+    r = client.post(
+        "/api/v1/waitlist/",
+        json={
+            "patient_id": "7701",
+            "window_start": _at(day, 14),
+            "window_end": _at(day, 14, 30),
+            "duration_minutes": 60,
+        },
+    )
+    assert r.status_code == 400
+
+
+def test_naive_window_uses_clinic_timezone(monkeypatch):
+    from app.api.v1.endpoints.waitlist import _clinic_time
+    from app.core.config import settings
+
+    from app.services.working_hours import clinic_tz
+
+    monkeypatch.setattr(settings, "CLINIC_TIMEZONE", "Europe/Madrid")
+    clinic_tz.cache_clear()
+    try:
+        # Verano en Madrid: +02:00
+        local = _clinic_time(datetime(2031, 7, 1, 9, 0))
+    finally:
+        monkeypatch.undo()
+        clinic_tz.cache_clear()
+    assert local.utcoffset() == timedelta(hours=2)
+    aware = datetime(2031, 7, 1, 9, 0, tzinfo=timezone.utc)
+    assert _clinic_time(aware) is aware
+
+
+def test_best_match_found_past_many_entries_that_do_not_fit():
+    from conftest import TestingSessionLocal
+
+    from app.models.waitlist import WaitlistEntry
+    from app.services.waitlist import find_best_match
+
+    start = datetime(2031, 8, 4, 15, 0, tzinfo=timezone.utc)
+    db = TestingSessionLocal()
+    # Ventanas que contienen `start` pero donde 60 minutos ya no caben
+    db.add_all(
+        WaitlistEntry(
+            patient_id=f"79{i:03d}",
+            window_start=start - timedelta(hours=1),
+            window_end=start + timedelta(minutes=30),
+            duration_minutes=60,
+        )
+        for i in range(250)
+    )
+    fitting = WaitlistEntry(
+        patient_id="7999",
+        window_start=start - timedelta(hours=1),
+        window_end=start + timedelta(hours=2),
+        duration_minutes=30,
+    )
+    db.add(fitting)
+    db.commit()
+    try:
+        match = find_best_match(db, start=start, end=start + timedelta(hours=1))
+        assert match is not None and match.id == fitting.id
+    finally:
+        db.query(WaitlistEntry).filter(WaitlistEntry.patient_id.like("79%")).delete(
+            synchronize_session=False
+        )
+        db.commit()
+        db.close()
+
+
+def test_backfill_skips_entry_claimed_by_another_worker(monkeypatch):
+    from conftest import TestingSessionLocal
+
+    from app.models.appointment import Appointment
+    from app.models.waitlist import WaitlistEntry, WaitlistStatus
+    from app.services import waitlist as waitlist_svc
+
+    start = datetime(2031, 9, 1, 15, 0, tzinfo=timezone.utc)
+    db = TestingSessionLocal()
+    entry = WaitlistEntry(
+        patient_id="7951",
+        window_start=start - timedelta(hours=1),
+        window_end=start + timedelta(hours=2),
+        duration_minutes=30,
+    )
+    db.add(entry)
+    db.commit()
+    stale = db.get(WaitlistEntry, entry.id)
+
+    # Otro worker la reserva entre la búsqueda y la reclamación
+    with TestingSessionLocal() as other:
+        other.get(WaitlistEntry, entry.id).status = WaitlistStatus.asignada
+        other.commit()
+    matches = iter([stale])
+    monkeypatch.setattr(
+        waitlist_svc, "find_best_match", lambda *a, **k: next(matches, None)
+    )
+    try:
+        booked = waitlist_svc.backfill_slot(
+            db, start=start, end=start + timedelta(hours=1)
+        )
+        assert booked == []
+        assert db.query(Appointment).filter_by(patient_id="7951").count() == 0
+    finally:
+        db.query(WaitlistEntry).filter_by(patient_id="7951").delete()
+        db.commit()
+        db.close()
+
+
+def test_backfill_fits_shorter_entry_before_other_appointment(client):
+    from conftest import TestingSessionLocal
+
+    from app.models.appointment import Appointment
+
+    day = (datetime.now(timezone.utc) + timedelta(days=910)).date()
+    longer = _join(client, day, "7801", 60)
+    shorter = _join(client, day, "7802", 30)
+    cita_id = _book(client, day, 15, "7800", fisio_id="7809")
+
+    # Cita de otro fisio en la segunda mitad del hueco (regla global: ocupa).
+    # Se inserta directamente: la API rechazaría el solape con la cita a cancelar
+    with TestingSessionLocal() as db:
+        other = Appointment(
+            start_time=datetime.fromisoformat(_at(day, 15, 30)),
+            duration_minutes=30,
+            patient_id="7803",
+            fisio_id="7808",
+        )
+        db.add(other)
+        db.commit()
+    r = client.patch(f"/api/v1/appointments/{cita_id}/cancel")
+    assert r.status_code == 200, r.text
+
+    (entry,) = _entries(client, "7802")
+    assert entry["id"] == shorter["id"]
+    assert entry["status"] == "asignada"
+    ap = client.get(f"/api/v1/appointments/{entry['appointment_id']}").json()
+    assert ap["start_time"][11:16] == "15:00"
+    assert _entries(client, "7801")[0]["status"] == "en_espera"
+    client.delete(f"/api/v1/waitlist/{longer['id']}")
+
+
+def test_expire_waitlist_marks_entries_past_their_window():
+    from conftest import TestingSessionLocal
+
+    from app.models.waitlist import WaitlistEntry, WaitlistStatus
+    from app.services.waitlist import expire_waitlist
+
+    now = datetime(2031, 10, 1, 12, 0, tzinfo=timezone.utc)
+    with TestingSessionLocal() as db:
+        past = WaitlistEntry(
+            patient_id="7851",
+            window_start=now - timedelta(hours=3),
+            window_end=now - timedelta(minutes=30),
+            duration_minutes=30,
+        )
+        # Aún cabe: último inicio 12:30
+        current = WaitlistEntry(
+            patient_id="7852",
+            window_start=now - timedelta(hours=1),
+            window_end=now + timedelta(hours=1),
+            duration_minutes=30,
+        )
+        db.add_all([past, current])
+        db.commit()
+
+        assert expire_waitlist(db, now=now) >= 1
+        db.refresh(past)
+        db.refresh(current)
+        assert past.status == WaitlistStatus.caducada
+        assert current.status == WaitlistStatus.en_espera
+        db.delete(past)
+        db.delete(current)
+        db.commit()
+
+
+def test_patients_only_manage_their_own_entries(client, monkeypatch):
+    from app.main import app
+    from app.services.auth import get_current_user
+
+    day = (datetime.now(timezone.utc) + timedelta(days=915)).date()
+    own = _join(client, day, "7901", 30)
+    other = _join(client, day, "7902", 30)
+
+    patient = {"id": "7901", "user_metadata": {"role": "paciente"}}
+    monkeypatch.setitem(app.dependency_overrides, get_current_user, lambda: patient)
+
+    listed = client.get("/api/v1/waitlist/").json()
+    assert {e["patient_id"] for e in listed} == {"7901"}
+    r = client.get("/api/v1/waitlist/", params={"patient_id": "7902"})
+    assert r.status_code == 403
+    assert client.delete(f"/api/v1/waitlist/{other['id']}").status_code == 403
+    r = client.post(
+        "/api/v1/waitlist/",
+        json={
+            "patient_id": "7902",
+            "window_start": _at(day, 13),
+            "window_end": _at(day, 23),
+            "duration_minutes": 30,
+        },
+    )
+    assert r.status_code == 403
+    assert client.delete(f"/api/v1/waitlist/{own['id']}").status_code == 200
+
+    monkeypatch.undo()
+    assert client.delete(f"/api/v1/waitlist/{other['id']}").status_code == 200
@@ -0,0 +1,162 @@
+from datetime import date, datetime, time, timedelta, timezone
+
+from app.models.working_hours import ScheduleException, WorkingHours
+from app.services.working_hours import resolve_open_intervals
+
+BOGOTA = timezone(timedelta(hours=-5))
+MONDAY = date(2030, 6, 3)
+
+
+def _utc(hour: int, minute: int = 0, day: date = MONDAY) -> datetime:
+    # Hora local de Bogotá -> naive UTC
+    return datetime(day.year, day.month, day.day, hour, minute) + timedelta(hours=5)
+
+
+def test_open_intervals_clinic_fisio_and_exceptions():
+    weekly = [
+        WorkingHours(fisio_id=None, weekday=0, start_time=time(8), end_time=time(12)),
+        WorkingHours(fisio_id=None, weekday=0, start_time=time(14), end_time=time(18)),
+        WorkingHours(fisio_id="9", weekday=0, start_time=time(10), end_time=time(16)),
+    ]
+    assert resolve_open_intervals(MONDAY, weekly, [], tz=BOGOTA) == [
+        (_utc(8), _utc(12)),
+        (_utc(14), _utc(18)),
+    ]
+    # El horario del fisio se intersecta con el de la clínica
+    assert resolve_open_intervals(MONDAY, weekly, [], fisio_id="9", tz=BOGOTA) == [
+        (_utc(10), _utc(12)),
+        (_utc(14), _utc(16)),
+    ]
+    # Sin franjas ese día de la semana (martes): cerrado
+    assert (
+        resolve_open_intervals(MONDAY + timedelta(days=1), weekly, [], tz=BOGOTA) == []
+    )
+
+    exceptions = [
+        ScheduleException(
+            fisio_id="9",
+            date=MONDAY,
+            start_time=time(11),
+            end_time=time(11, 30),
+            is_open=False,
+        ),
+        ScheduleException(
+            fisio_id=None,
+            date=MONDAY,
+            start_time=time(12),
+            end_time=time(13),
+            is_open=True,
+        ),
+        # De otro fisio: no aplica
+        ScheduleException(fisio_id="8", date=MONDAY, is_open=False),
+    ]
+    assert resolve_open_intervals(
+        MONDAY, weekly, exceptions, fisio_id="9", tz=BOGOTA
+    ) == [(_utc(10), _utc(11)), (_utc(11, 30), _utc(13)), (_utc(14), _utc(16))]
+
+    holiday = [ScheduleException(fisio_id=None, date=MONDAY, is_open=False)]
+    assert (
+        resolve_open_intervals(MONDAY, weekly, holiday, fisio_id="9", tz=BOGOTA) == []
+    )
+
+
+def test_default_hours_without_rules():
+    assert resolve_open_intervals(MONDAY, [], [], tz=BOGOTA) == [(_utc(8), _utc(18))]
+
+
+def test_calendar_endpoint_and_availability(client):
+    day = (datetime.now(timezone.utc) + timedelta(days=700)).date()
+    fisio = "7301"
+    r = client.put(
+        "/api/v1/schedules/working-hours",
+        json={
+            "fisio_id": fisio,
+            "slots": [
+                {"weekday": day.weekday(), "start_time": "09:00", "end_time": "12:00"},
+                {"weekday": day.weekday(), "start_time": "13:00", "end_time": "15:00"},
+            ],
+        },
+    )
+    assert r.status_code == 200, r.text
+    assert len(r.json()) == 2
+    r = client.get("/api/v1/schedules/working-hours", params={"fisio_id": fisio})
+    assert [s["start_time"] for s in r.json()] == ["09:00:00", "13:00:00"]
+
+    r = client.post(
+        "/api/v1/schedules/exceptions",
+        json={
+            "fisio_id": fisio,
+            "date": day.isoformat(),
+            "start_time": "14:00",
+            "end_time": "15:00",
+            "reason": "Capacitación",
+        },
+    )
+    assert r.status_code == 201, r.text
+    exception_id = r.json()["id"]
+
+    # Cita ocupada 10:00-11:00 Bogotá (15:00 UTC)
+    start = datetime(day.year, day.month, day.day, 15, 0, tzinfo=timezone.utc)
+    r = client.post(
+        "/api/v1/appointments/",
+        json={
+            "patient_id": "7302",
+            "fisio_id": fisio,
+            "start_time": start.isoformat(),
+            "duration_minutes": 60,
+        },
+    )
+    assert r.status_code == 201, r.text
+
+    r = client.get(
+        "/api/v1/schedules/calendar",
+        params={"date_from": day.isoformat(), "fisio_id": fisio},
+    )
+    assert r.status_code == 200, r.text
+    (cal,) = r.json()
+    hhmm = lambda v: v[11:16]  # noqa: E731
+    assert [(hhmm(i["start"]), hhmm(i["end"])) for i in cal["free"]] == [
+        ("09:00", "10:00"),
+        ("11:00", "12:00"),
+        ("13:00", "14:00"),
+    ]
+    assert [hhmm(s) for s in cal["slots"]] == ["09:00", "11:00", "13:00"]
+
+    r = client.get(
+        "/api/v1/appointments/availability",
+        params={
+            "date": day.isoformat(),
+            "patient_id": "7302",
+            "fisio_id": fisio,
+            "duration_minutes": 30,
+        },
+    )
+    assert r.status_code == 200
+    body = r.json()
+    assert [s[11:16] for s in body["available_slots"]] == [
+        "09:00",
+        "09:30",
+        "11:00",
+        "11:30",
+        "13:00",
+        "13:30",
+    ]
+    assert body["available_slots"][0].endswith("-05:00")
+    assert len(body["free_intervals"]) == 3
+
+    r = client.get(
+        "/api/v1/schedules/calendar",
+        params={
+            "date_from": day.isoformat(),
+            "date_to": (day + timedelta(days=40)).isoformat(),
+        },
+    )
+    assert r.status_code == 400
+
+    assert (
+        client.delete(f"/api/v1/schedules/exceptions/{exception_id}").status_code == 204
+    )
+    assert (
+        client.delete(f"/api/v1/schedules/exceptions/{exception_id}").status_code == 404
+    )
+    client.put("/api/v1/schedules/working-hours", json={"fisio_id": fisio, "slots": []})